@@ -1,11 +1,25 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import ccxt
+import numpy as np
+import os
 import pandas as pd
-import plotly.graph_objects as go
 import time
-import random
-from datetime import datetime, timedelta
+from datetime import timedelta
+from correlation import CorrelationEngine
+from data_source import exchange_symbol, get_data_source, store_key
+from exchanges import get_exchange
+from history import iter_history
+from market_assets import SPARKLINE_CANDLES, SPARKLINE_TIMEFRAME, cached_logo, sparkline_uri
+from ohlcv_store import to_frame
+from orderbook import BookRecorder
+from pyramid import load_window, update_pyramid
+from screener import FILTERS, screen
+from signal_bus import recent_signals
+from signals import BUY, SELL
+from snapshot import SnapshotRefresher
+
+# plotly, streamlit.components and ccxt are imported on first use (analysis
+# page / exchange requests) so the market page paints from the last snapshot.
+# Run `python profile_startup.py` to see the import-time breakdown.
 
 # -------------------------------------------------------
 # PAGE CONFIG
@@ -18,100 +32,138 @@ if "selected_asset" not in st.session_state:
 # -------------------------------------------------------
 # MARKET DATA
 # -------------------------------------------------------
-@st.cache_data(ttl=60)
+# Kraken first (it keeps multi-year daily history), Binance when Kraken is
+# slow or down; then stored candles, then synthetic prices (see data_source.py)
+COINIFY_SOURCES = ("kraken", "binance")
+MARKET_SOURCE = get_data_source(COINIFY_SOURCES, enableRateLimit=True)
+MARKET_SYMBOLS = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "BNB/USDT",
+                  "XRP/USDT", "DOGE/USDT", "ADA/USDT", "AVAX/USDT"]
+
+# Opt-in: the recorder polls every market's book in the background for the
+# life of the server, out of the same rate-limit budget as the tickers
+ORDER_BOOKS = os.environ.get("COINIFY_ORDER_BOOKS", "") not in ("", "0")
+
+@st.cache_resource
+def order_book_recorder():
+    # Snapshots every market's book in the background (bounded ring buffers)
+    return BookRecorder(MARKET_SYMBOLS, MARKET_SOURCE).start()
+
+
+def fetch_market_rows():
+    tickers = MARKET_SOURCE.fetch_tickers(MARKET_SYMBOLS)
+    books = order_book_recorder() if ORDER_BOOKS else None
+    since_ms = int(time.time() * 1000) - SPARKLINE_CANDLES * 3_600_000
+
+    data = []
+    rank = 1
+    for symbol, ticker in tickers.items():
+        name = symbol.split("/")[0]
+        if ticker["source"] not in ("local", "synthetic"):
+            # Hourly closes for the 7-day sparklines (only new candles are downloaded)
+            MARKET_SOURCE.sync(symbol, SPARKLINE_TIMEFRAME, since_ms)
+        stored = MARKET_SOURCE.store_symbol(symbol, SPARKLINE_TIMEFRAME)
+        volume = ticker.get("quoteVolume") or 0.0
+        book = books.latest(symbol) if books else None
+        if books and book is None and ticker["source"] not in ("local", "synthetic"):
+            books.record([symbol])
+            book = books.latest(symbol)
+        data.append({
+            "Rank": rank,
+            "Symbol": symbol,
+            "Name": name,
+            "Price": ticker["last"],
+            "Change": ticker.get("percentage") or 0.0,
+            "Volume": volume,
+            "Depth": book["depth_100bp"] if book else None,  # $ within ±1% of mid
+            "Spread": book["spread_bps"] if book else None,
+            "Logo": cached_logo(name),
+            "Sparkline": sparkline_uri(stored) if stored else None,
+            "Source": ticker["source"],
+        })
+        rank += 1
+
+    return data
+
+
+@st.cache_resource
+def market_snapshot():
+    return SnapshotRefresher("coinify_market", fetch_market_rows, max_age=60)
+
+
 def get_market_data():
-    try:
-        exchange = ccxt.kraken()
-        symbols = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "BNB/USDT",
-                   "XRP/USDT", "DOGE/USDT", "ADA/USDT", "AVAX/USDT"]
-
-        kraken_symbols = [s.replace("USDT", "USD") for s in symbols]
-        tickers = exchange.fetch_tickers(kraken_symbols)
-
-        data = []
-        rank = 1
-        for symbol, ticker in tickers.items():
-            name = symbol.split("/")[0]
-            data.append({
-                "Rank": rank,
-                "Symbol": symbol,
-                "Name": name,
-                "Price": ticker["last"],
-                "Change": ticker["percentage"],
-                "Volume": ticker["quoteVolume"],
-                "MarketCap": ticker["quoteVolume"] * random.uniform(20, 50),
-                "Logo": f"https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/{name.lower()}.png",
-                "Sparkline": f"https://www.coingecko.com/coins/{rank}/sparkline.svg"
-            })
-            rank += 1
-
-        return pd.DataFrame(data)
-
-    except:
-        data = []
-        mock_coins = [
-            ("BTC/USDT", 67000), ("ETH/USDT", 2500), ("SOL/USDT", 140),
-            ("BNB/USDT", 600), ("XRP/USDT", 0.60), ("DOGE/USDT", 0.15),
-            ("ADA/USDT", 0.45), ("AVAX/USDT", 35)
-        ]
-
-        rank = 1
-        for symbol, price in mock_coins:
-            name = symbol.split("/")[0]
-            price = price * random.uniform(0.98, 1.02)
-            change = random.uniform(-5, 5)
-            data.append({
-                "Rank": rank,
-                "Symbol": symbol,
-                "Name": name,
-                "Price": price,
-                "Change": change,
-                "Volume": random.uniform(1e6, 1e9),
-                "MarketCap": random.uniform(1e9, 5e10),
-                "Logo": f"https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/{name.lower()}.png",
-                "Sparkline": f"https://www.coingecko.com/coins/{rank}/sparkline.svg"
-            })
-            rank += 1
-
-        return pd.DataFrame(data)
+    return pd.DataFrame(market_snapshot().get())
+
+
+@st.cache_data(ttl=300)
+def run_screener(filters, max_symbols):
+    # Every Kraken USD pair; daily history comes from the local store after the first run
+    exchange = get_exchange("kraken", enableRateLimit=True)
+    return screen(exchange, filters, quote="USD", max_symbols=max_symbols)
 
 
 # -------------------------------------------------------
 # PRICE HISTORY
 # -------------------------------------------------------
+# Kraken only serves the latest 720 candles per timeframe, so the daily
+# base keeps multi-year depth; 1w is resampled from it locally.
+HISTORY_BASE_TIMEFRAME = "1d"
+
 @st.cache_data(ttl=3600)
 def fetch_history(symbol, timeframe):
+    # frame.attrs: which source answered and the store key its candles live under
+    return MARKET_SOURCE.history(symbol, timeframe, base_timeframe=HISTORY_BASE_TIMEFRAME)
+
+
+# The chart reads a pre-aggregated level (1d or 1w) sized to the zoom window,
+# so reruns draw a few hundred candles whatever the history length.
+ZOOM_WINDOWS = {"1M": 30, "3M": 90, "1Y": 365, "3Y": 3 * 365, "All": None}
+CHART_LEVELS = ("1d", "1w")
+CHART_MAX_POINTS = 400
+CHART_WARMUP = 20  # candles before the window so the bands start on screen
+
+@st.cache_data(ttl=3600)
+def chart_candles(store_symbol, zoom, version):
+    """(level, candles) for the zoom window; `version` is the newest candle's
+    (time, close), so the still-forming candle's updates aren't cached away."""
+    update_pyramid(store_symbol, HISTORY_BASE_TIMEFRAME, CHART_LEVELS)
+    end_ms = version[0]
+    days = ZOOM_WINDOWS[zoom]
+    start_ms = None if days is None else end_ms - days * 86_400_000
+    level, arr = load_window(store_symbol, start_ms, end_ms, HISTORY_BASE_TIMEFRAME, CHART_LEVELS,
+                             max_points=CHART_MAX_POINTS, warmup=CHART_WARMUP)
+    return level, to_frame(arr)
+
+
+def preview_first_download(symbol, placeholder):
+    """On an asset's first visit, draws closes page by page while history streams in.
+
+    Later visits skip this: the local store already has the candles and
+    fetch_history only catches up on the newest ones.
+    """
+    if MARKET_SOURCE.store_symbol(symbol, HISTORY_BASE_TIMEFRAME):
+        return
     try:
-        exchange = ccxt.kraken({"enableRateLimit": True})
-        kraken_symbol = symbol.replace("USDT", "USD")
-
-        since_ms = exchange.parse8601("2017-01-01T00:00:00Z")
-        all_candles = []
-
-        while True:
-            candles = exchange.fetch_ohlcv(kraken_symbol, timeframe, since=since_ms, limit=1000)
-            if not candles:
-                break
-
-            all_candles.extend(candles)
-            since_ms = candles[-1][0] + 1
-            if len(candles) < 1000:
-                break
-            time.sleep(0.1)
-
-        df = pd.DataFrame(all_candles, columns=["timestamp", "open", "high", "low", "close", "volume"])
-        df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
-        return df
-
-    except:
-        dates = pd.date_range(end=datetime.now(), periods=200, freq="D")
-        df = pd.DataFrame({"timestamp": dates})
-        df["close"] = [60000 + (i * random.uniform(-50, 50)) for i in range(len(dates))]
-        df["open"] = df["close"] * random.uniform(0.99, 1.01)
-        df["high"] = df["close"] * 1.05
-        df["low"] = df["close"] * 0.95
-        df["volume"] = random.uniform(1e3, 1e6)
-        return df
+        name = MARKET_SOURCE.ranked()[0]
+        chunks = []
+        for chunk in iter_history(MARKET_SOURCE.exchange(name), exchange_symbol(symbol, name),
+                                  HISTORY_BASE_TIMEFRAME, key=store_key(symbol, name)):
+            chunks.append(chunk)
+            arr = np.sort(np.concatenate(chunks), order="timestamp")
+            placeholder.line_chart(to_frame(arr).set_index("timestamp")["close"], height=250)
+    except Exception:
+        pass  # fetch_history below retries and falls back
+    placeholder.empty()
+
+
+# -------------------------------------------------------
+# CORRELATION
+# -------------------------------------------------------
+# Hourly closes in the local store (kept current by the market refresh)
+CORRELATION_WINDOWS = {24: "1 Day", 168: "1 Week", 720: "30 Days"}
+
+@st.cache_resource
+def correlation_engine(symbols):
+    return CorrelationEngine(symbols, windows=tuple(CORRELATION_WINDOWS))
 
 
 # -------------------------------------------------------
@@ -178,6 +230,68 @@ def create_indicator_status_table(last):
     })
 
 
+# -------------------------------------------------------
+# ANALYSIS VIEWS (built once per session)
+# -------------------------------------------------------
+# Each built view is kept in session state under (asset, timeframe/zoom,
+# data version), so going Back to the market and reopening an asset (or
+# flipping zooms) redraws without recomputing. The version is the newest
+# candle's time and close: the daily candle keeps forming all day, and each
+# new price for it rebuilds the view just like a new candle does.
+ANALYSIS_CACHE_SIZE = 16
+
+def session_view(key, build):
+    views = st.session_state.setdefault("analysis_views", {})
+    if key not in views:
+        views[key] = build()
+        while len(views) > ANALYSIS_CACHE_SIZE:
+            views.pop(next(iter(views)))  # oldest first
+    return views[key]
+
+
+def build_technicals(df):
+    from strategies import get_strategy  # numba (if installed) loads on first use
+    df = add_indicators(df)
+    last = df.iloc[-1]
+    bb_signal = get_strategy("bb_reversion").kernel(df, {"exit_band": "upper"})[-1]
+    score = sum([bb_signal == BUY, last["RSI"] < 30, last["MACD"] > last["Signal"], last["close"] > last["SMA200"]])
+    return {"last": last, "ath": df["high"].max(), "bb_signal": bb_signal, "score": score,
+            "table": create_indicator_status_table(last)}
+
+
+def build_chart(asset, zoom, version, df):
+    import plotly.graph_objects as go
+    store_symbol = df.attrs.get("symbol")
+    level, chart_df = chart_candles(store_symbol, zoom, version) if store_symbol else (None, pd.DataFrame())
+    if chart_df.empty:
+        # Synthetic data isn't in the local store
+        level, chart_df = HISTORY_BASE_TIMEFRAME, df
+    chart_df = chart_df.copy()
+    chart_df["middle"] = chart_df["close"].rolling(20).mean()
+    chart_df["upper"] = chart_df["middle"] + chart_df["close"].rolling(20).std() * 2.0
+    chart_df["lower"] = chart_df["middle"] - chart_df["close"].rolling(20).std() * 2.0
+
+    days = ZOOM_WINDOWS[zoom]
+    end_view = chart_df["timestamp"].iloc[-1]
+    start_view = chart_df["timestamp"].iloc[0] if days is None else end_view - timedelta(days=days)
+
+    fig = go.Figure()
+    fig.add_trace(go.Candlestick(
+        x=chart_df["timestamp"],
+        open=chart_df["open"], high=chart_df["high"],
+        low=chart_df["low"], close=chart_df["close"],
+        name="Price"
+    ))
+
+    fig.add_trace(go.Scatter(x=chart_df["timestamp"], y=chart_df["upper"], line=dict(color="gray", width=1), name="Upper"))
+    fig.add_trace(go.Scatter(x=chart_df["timestamp"], y=chart_df["lower"], line=dict(color="gray", width=1), name="Lower"))
+    fig.add_trace(go.Scatter(x=chart_df["timestamp"], y=chart_df["middle"], line=dict(color="orange", width=1), name="Middle"))
+
+    fig.update_xaxes(range=[start_view, end_view], rangeslider_visible=True, type="date")
+    fig.update_layout(height=500, template="plotly_dark", title=f"{asset} – {zoom} View ({level} candles)")
+    return fig
+
+
 # -------------------------------------------------------
 # MAIN UI
 # -------------------------------------------------------
@@ -203,30 +317,61 @@ if st.session_state.selected_asset is None:
         with m1:
             st.caption("🚀 Top Gainer")
             st.image(top_gainer["Logo"], width=50)
-            st.image(top_gainer["Sparkline"])
+            if top_gainer["Sparkline"]:
+                st.image(top_gainer["Sparkline"])
 
         with m2:
             st.caption("📉 Top Loser")
             st.image(top_loser["Logo"], width=50)
             st.metric(top_loser["Name"], f"${top_loser['Price']:,.2f}", f"{top_loser['Change']:.2f}%")
-            st.image(top_loser["Sparkline"])
+            if top_loser["Sparkline"]:
+                st.image(top_loser["Sparkline"])
 
         with m3:
             st.caption("💰 Market Leader")
             st.image(btc_data["Logo"], width=50)
             st.metric(btc_data["Name"], f"${btc_data['Price']:,.2f}", f"{btc_data['Change']:.2f}%")
-            st.image(btc_data["Sparkline"])
+            if btc_data["Sparkline"]:
+                st.image(btc_data["Sparkline"])
 
         st.write("")
 
-        h_cols = st.columns([0.4, 1.8, 1.2, 1.0, 1.5, 1.5, 1.5])
-        headers = ["#", "Coin", "Price", "24h", "Volume", "Mkt Cap", "Trend"]
+        # Published by live_bot through the signal bus's dashboard sink
+        signals = recent_signals()
+        if signals:
+            with st.expander(f"🔔 Live Signals ({len(signals)})"):
+                recent = pd.DataFrame(signals[:20])
+                recent["ts"] = pd.to_datetime(recent["ts"], unit="ms")
+                st.dataframe(recent, hide_index=True, use_container_width=True)
+
+        with st.expander("📡 Data Sources"):
+            served = df["Source"].iloc[0] if "Source" in df else "unknown"
+            st.caption(f"Prices above from: {served}")
+            st.dataframe(pd.DataFrame(MARKET_SOURCE.report()), hide_index=True, use_container_width=True)
+
+        with st.expander("🔍 Market Screener"):
+            chosen = st.multiselect("Filters", list(FILTERS), default=["rsi_oversold"],
+                                    format_func=lambda k: FILTERS[k][0])
+            max_pairs = st.slider("Pairs to scan", 50, 500, 100, step=50)
+            if st.button("Run Screener"):
+                with st.spinner("Screening markets (the first run downloads daily history)..."):
+                    try:
+                        matches = run_screener(tuple(chosen), max_pairs)
+                        st.caption(f"{len(matches)} pairs match")
+                        st.dataframe(matches, hide_index=True, use_container_width=True)
+                    except Exception as e:
+                        st.error(f"Screener unavailable: {e}")
+
+        # The Depth column only exists with the order-book recorder on
+        widths = [0.4, 1.8, 1.2, 1.0, 1.5] + ([1.5] if ORDER_BOOKS else []) + [1.5]
+        headers = ["#", "Coin", "Price", "24h", "Volume"] + (["Depth ±1%"] if ORDER_BOOKS else []) + ["Trend"]
+        h_cols = st.columns(widths)
         for i, h in enumerate(headers):
             h_cols[i].markdown(f"##### {h}")
         st.divider()
 
         for _, row in df.iterrows():
-            cols = st.columns([0.4, 1.8, 1.2, 1.0, 1.5, 1.5, 1.5])
+            cols = st.columns(widths)
             cols[0].write(f"**{row['Rank']}**")
 
             with cols[1]:
@@ -244,10 +389,17 @@ if st.session_state.selected_asset is None:
             vol_str = f"${vol/1e9:.2f}B" if vol > 1e9 else f"${vol/1e6:.2f}M"
             cols[4].write(vol_str)
 
-            cap = row["MarketCap"]
-            cols[5].write(f"${cap/1e9:.2f}B")
-
-            if cols[6].button("🔎", key=row["Symbol"]):
+            if ORDER_BOOKS:
+                # Snapshots saved before order-book metrics have no Depth column
+                depth, spread = row.get("Depth"), row.get("Spread")
+                if pd.notna(depth):
+                    depth_str = f"${depth/1e6:.2f}M" if depth > 1e6 else f"${depth/1e3:.0f}K"
+                    cols[5].markdown(f"{depth_str}<br><span style='color:gray;font-size:0.8em'>"
+                                     f"spread {spread:.1f} bps</span>", unsafe_allow_html=True)
+                else:
+                    cols[5].write("—")
+
+            if cols[-1].button("🔎", key=row["Symbol"]):
                 st.session_state.selected_asset = row["Symbol"]
                 st.rerun()
 
@@ -255,6 +407,9 @@ if st.session_state.selected_asset is None:
 
 
 else:
+    import plotly.graph_objects as go
+    import streamlit.components.v1 as components
+
     if st.button("⬅️ Back to Coinify Market"):
         st.session_state.selected_asset = None
         st.rerun()
@@ -262,87 +417,99 @@ else:
     asset = st.session_state.selected_asset
     st.header(f"{asset} Analysis")
 
-    tab1, tab2 = st.tabs(["📊 Technicals", "🕯️ TradingView"])
+    # Only the open tab runs: switching tabs reruns the script with
+    # `.open` set, so the hidden ones cost nothing.
+    tab1, tab2, tab3 = st.tabs(["📊 Technicals", "🕯️ TradingView", "🧮 Correlation"],
+                               key="analysis_tab", on_change="rerun")
 
     # ---------------------------------------------------
     # TAB 1 – Python Analyzer
     # ---------------------------------------------------
     with tab1:
-        try:
-            with st.spinner("Loading History..."):
-                df = fetch_history(asset, "1d")
-                df = add_indicators(df)
-
-            last = df.iloc[-1]
-
-            bb_buy = last["close"] < last["lower"]
-            rsi_buy = last["RSI"] < 30
-            macd_buy = last["MACD"] > last["Signal"]
-            sma_buy = last["close"] > last["SMA200"]
-
-            score = sum([bb_buy, rsi_buy, macd_buy, sma_buy])
-
-            m1, m2, m3 = st.columns(3)
-            m1.metric("Current Price", f"${last['close']:,.2f}")
-            m2.metric("All Time High", f"${df['high'].max():,.2f}")
-
-            if score >= 3:
-                m3.metric("Bot Signal", "🔥 STRONG BUY", "High Confluence")
-            elif last["close"] > last["upper"] and last["RSI"] > 70:
-                m3.metric("Bot Signal", "🔴 SELL ZONE", "Overbought")
-            else:
-                m3.metric("Bot Signal", "💤 NEUTRAL", "Hold")
-
-            start_view = df["timestamp"].iloc[-365]
-            end_view = df["timestamp"].iloc[-1]
-
-            fig = go.Figure()
-            fig.add_trace(go.Candlestick(
-                x=df["timestamp"],
-                open=df["open"], high=df["high"],
-                low=df["low"], close=df["close"],
-                name="Price"
-            ))
-
-            fig.add_trace(go.Scatter(x=df["timestamp"], y=df["upper"], line=dict(color="gray", width=1), name="Upper"))
-            fig.add_trace(go.Scatter(x=df["timestamp"], y=df["lower"], line=dict(color="gray", width=1), name="Lower"))
-            fig.add_trace(go.Scatter(x=df["timestamp"], y=df["middle"], line=dict(color="orange", width=1), name="Middle"))
-
-            fig.update_xaxes(range=[start_view, end_view], rangeslider_visible=True, type="date")
-            fig.update_layout(height=500, template="plotly_dark", title=f"{asset} – 3 Year View")
-
-            st.plotly_chart(fig, use_container_width=True)
-
-            st.markdown("---")
-            st.subheader("🔎 Indicator Confluence Breakdown")
-
-            st.dataframe(create_indicator_status_table(last), use_container_width=True, hide_index=True)
-
-        except Exception as e:
-            st.error(f"Error loading chart: {e}")
+        if tab1.open:
+            try:
+                preview_first_download(asset, st.empty())
+                with st.spinner("Loading History..."):
+                    df = fetch_history(asset, HISTORY_BASE_TIMEFRAME)
+                version = (int(df["timestamp"].iloc[-1].value // 1_000_000), float(df["close"].iloc[-1]))
+                view = session_view((asset, HISTORY_BASE_TIMEFRAME, version), lambda: build_technicals(df))
+                last = view["last"]
+
+                m1, m2, m3 = st.columns(3)
+                m1.metric("Current Price", f"${last['close']:,.2f}")
+                m2.metric("All Time High", f"${view['ath']:,.2f}")
+
+                if view["score"] >= 3:
+                    m3.metric("Bot Signal", "🔥 STRONG BUY", "High Confluence")
+                elif view["bb_signal"] == SELL and last["RSI"] > 70:
+                    m3.metric("Bot Signal", "🔴 SELL ZONE", "Overbought")
+                else:
+                    m3.metric("Bot Signal", "💤 NEUTRAL", "Hold")
+
+                zoom = st.radio("Zoom", list(ZOOM_WINDOWS), index=3, horizontal=True)
+                fig = session_view((asset, zoom, version), lambda: build_chart(asset, zoom, version, df))
+                st.plotly_chart(fig, use_container_width=True)
+
+                st.markdown("---")
+                st.subheader("🔎 Indicator Confluence Breakdown")
+
+                st.dataframe(view["table"], use_container_width=True, hide_index=True)
+
+            except Exception as e:
+                st.error(f"Error loading chart: {e}")
 
     # ---------------------------------------------------
     # TAB 2 – TradingView Widget
     # ---------------------------------------------------
     with tab2:
-        tv_symbol = f"KRAKEN:{asset.replace('/USDT', 'USD')}"
-        components.html(f"""
-        <div class="tradingview-widget-container" style="height:100%;width:100%">
-          <div class="tradingview-widget-container__widget" style="height:calc(100% - 32px);width:100%"></div>
-          <script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-advanced-chart.js" async>
-          {{
-            "width": "100%",
-            "height": "600",
-            "symbol": "{tv_symbol}",
-            "interval": "D",
-            "timezone": "Etc/UTC",
-            "theme": "dark",
-            "style": "1",
-            "locale": "en",
-            "enable_publishing": false,
-            "allow_symbol_change": true,
-            "support_host": "https://www.tradingview.com"
-          }}
-          </script>
-        </div>
-        """, height=600)
+        if tab2.open:
+            tv_symbol = f"KRAKEN:{exchange_symbol(asset, 'kraken').replace('/', '')}"
+            components.html(f"""
+            <div class="tradingview-widget-container" style="height:100%;width:100%">
+              <div class="tradingview-widget-container__widget" style="height:calc(100% - 32px);width:100%"></div>
+              <script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-advanced-chart.js" async>
+              {{
+                "width": "100%",
+                "height": "600",
+                "symbol": "{tv_symbol}",
+                "interval": "D",
+                "timezone": "Etc/UTC",
+                "theme": "dark",
+                "style": "1",
+                "locale": "en",
+                "enable_publishing": false,
+                "allow_symbol_change": true,
+                "support_host": "https://www.tradingview.com"
+              }}
+              </script>
+            </div>
+            """, height=600)
+
+    # ---------------------------------------------------
+    # TAB 3 – Correlation Heatmap
+    # ---------------------------------------------------
+    with tab3:
+        if tab3.open:
+            try:
+                market = list(get_market_data()["Symbol"])
+                symbols = tuple(MARKET_SOURCE.store_symbol(s, "1h") or store_key(s, COINIFY_SOURCES[0])
+                                for s in market)
+                window = st.radio("Return window", list(CORRELATION_WINDOWS),
+                                  format_func=CORRELATION_WINDOWS.get, horizontal=True, index=1)
+                engine = correlation_engine(symbols)
+                engine.update()  # only candles closed since the last render
+                corr = engine.correlation(window)
+                names = [s.split("/")[0] for s in market]
+
+                fig = go.Figure(go.Heatmap(
+                    z=corr, x=names, y=names, zmin=-1, zmax=1, colorscale="RdBu",
+                    text=np.round(corr, 2), texttemplate="%{text}",
+                ))
+                fig.update_layout(height=600, template="plotly_dark",
+                                  title=f"Hourly Return Correlation – {CORRELATION_WINDOWS[window]}")
+                st.plotly_chart(fig, use_container_width=True)
+
+                a, b, c = engine.top_pairs(window, 1)[0]
+                st.caption(f"Most correlated: {a} / {b} ({c:.2f})")
+            except Exception as e:
+                st.error(f"Error loading correlations: {e}")
@@ -0,0 +1,205 @@
+import json
+import os
+import numpy as np
+from jit import as_kernel_input, njit
+from metrics import compute_metrics, periods_per_year
+from ohlcv_store import DATA_DIR
+from signals import BUY, SELL
+
+# -----------------------------
+# 1. Exit Codes
+# -----------------------------
+EXIT_SIGNAL = 0
+EXIT_STOP_LOSS = 1
+EXIT_TAKE_PROFIT = 2
+EXIT_END_OF_DATA = 3
+EXIT_REASONS = {
+    EXIT_SIGNAL: "signal",
+    EXIT_STOP_LOSS: "stop_loss",
+    EXIT_TAKE_PROFIT: "take_profit",
+    EXIT_END_OF_DATA: "end_of_data",
+}
+
+
+# -----------------------------
+# 2. The Event Loop (compiled when numba is installed)
+# -----------------------------
+@njit
+def _simulate(open_, high, low, close, signals, start, trade_amount,
+              stop_loss_pct, take_profit_pct, fee_rate, slippage_pct, start_balance, mark_open):
+    n = len(close)
+    max_trades = n // 2 + 1
+    entry_idx = np.empty(max_trades, dtype=np.int64)
+    exit_idx = np.empty(max_trades, dtype=np.int64)
+    entry_px = np.empty(max_trades, dtype=np.float64)
+    exit_px = np.empty(max_trades, dtype=np.float64)
+    pnl = np.empty(max_trades, dtype=np.float64)
+    reason = np.empty(max_trades, dtype=np.int8)
+    equity = np.empty(n, dtype=np.float64)
+
+    balance = start_balance
+    in_position = False
+    qty = 0.0
+    cost = 0.0
+    stop = 0.0
+    take = 0.0
+    t = 0
+
+    for i in range(min(start, n)):
+        equity[i] = start_balance
+
+    for i in range(start, n):
+        if in_position:
+            exit_price = -1.0
+            code = EXIT_SIGNAL
+            # Intrabar exits first. A gap through the level fills at the open;
+            # if one bar touches both levels, assume the stop was hit first.
+            if low[i] <= stop:
+                exit_price = min(open_[i], stop)
+                code = EXIT_STOP_LOSS
+            elif high[i] >= take:
+                exit_price = max(open_[i], take)
+                code = EXIT_TAKE_PROFIT
+            elif signals[i] == SELL:
+                exit_price = close[i]
+                code = EXIT_SIGNAL
+
+            if exit_price > 0:
+                exit_price *= 1.0 - slippage_pct
+                proceeds = qty * exit_price * (1.0 - fee_rate)
+                balance += proceeds
+                exit_idx[t] = i
+                exit_px[t] = exit_price
+                pnl[t] = proceeds - cost
+                reason[t] = code
+                t += 1
+                in_position = False
+                equity[i] = balance
+                continue
+
+        elif signals[i] == BUY:
+            cost = min(trade_amount, balance)
+            if cost > 0:
+                price = close[i] * (1.0 + slippage_pct)
+                qty = cost * (1.0 - fee_rate) / price
+                balance -= cost
+                stop = price * (1.0 - stop_loss_pct)
+                take = price * (1.0 + take_profit_pct)
+                entry_idx[t] = i
+                entry_px[t] = price
+                in_position = True
+
+        # Mark to market at the close, net of the fee and slippage an exit would pay
+        if in_position:
+            equity[i] = balance + qty * close[i] * (1.0 - slippage_pct) * (1.0 - fee_rate)
+        else:
+            equity[i] = balance
+
+    if in_position and not mark_open:
+        # Left out of balance and trade count; the equity curve still marks it
+        balance += cost
+    elif in_position:
+        # Mark the open position to the last close so the balance is comparable
+        exit_price = close[n - 1] * (1.0 - slippage_pct)
+        proceeds = qty * exit_price * (1.0 - fee_rate)
+        balance += proceeds
+        exit_idx[t] = n - 1
+        exit_px[t] = exit_price
+        pnl[t] = proceeds - cost
+        reason[t] = EXIT_END_OF_DATA
+        t += 1
+
+    return balance, t, entry_idx, exit_idx, entry_px, exit_px, pnl, reason, equity
+
+
+# -----------------------------
+# 3. Public Entry Point
+# -----------------------------
+def run_backtest(df, signals, trade_amount=100.0, stop_loss_pct=0.02, take_profit_pct=0.04,
+                 fee_rate=0.001, start_balance=1000.0, start=1, with_metrics=True,
+                 periods=periods_per_year("1h"), slippage_pct=0.0, mark_open=True):
+    """Simulates long-only trades over OHLC arrays.
+
+    Entries fill at the close of a BUY bar with `trade_amount` of quote currency
+    (capped by the balance); exits come from the stop-loss / take-profit levels
+    checked against each later bar's low/high, or from a SELL signal at close.
+    Fees are charged on both sides as a fraction of notional, and every fill
+    is `slippage_pct` worse than its reference price (see
+    orderbook.fill_cost_pct for an estimate from the order book). `equity` holds
+    the marked-to-market balance at every candle's close; `metrics` scores it
+    (see metrics.compute_metrics, `periods` = candles per year). Batch callers
+    can skip it and score many curves at once instead.
+
+    A position still open at the end is closed at the last close and counted
+    as an "end_of_data" trade; with `mark_open=False` it is left out of
+    `balance` and the trade counts instead.
+    """
+    result = _simulate(
+        as_kernel_input(df["open"]), as_kernel_input(df["high"]),
+        as_kernel_input(df["low"]), as_kernel_input(df["close"]),
+        as_kernel_input(signals, np.int8), start, float(trade_amount),
+        float(stop_loss_pct), float(take_profit_pct), float(fee_rate), float(slippage_pct),
+        float(start_balance), bool(mark_open),
+    )
+    balance, n, entry_idx, exit_idx, entry_px, exit_px, pnl, reason, equity = result
+    wins = int((pnl[:n] > 0).sum())
+
+    result = {
+        "balance": float(balance),
+        "trades": int(n),
+        "wins": wins,
+        "win_rate": (wins / n * 100) if n > 0 else 0,
+        "trade_log": {
+            "entry_idx": entry_idx[:n],
+            "exit_idx": exit_idx[:n],
+            "entry_price": entry_px[:n],
+            "exit_price": exit_px[:n],
+            "pnl": pnl[:n],
+            "exit_reason": reason[:n],
+        },
+        "equity": equity,
+    }
+    if with_metrics and len(equity) > 1:
+        result["metrics"] = compute_metrics(equity, periods)
+    return result
+
+
+# -----------------------------
+# 4. Result Files
+# -----------------------------
+# One .npz per run: every trade-log field and the equity curve is its own
+# column, so a million-candle run is written in one shot and reloads without
+# re-running the strategy.
+RESULTS_DIR = os.path.join(DATA_DIR, "backtests")
+SUMMARY_FIELDS = ("balance", "trades", "wins", "win_rate")
+
+
+def results_path(name):
+    return os.path.join(RESULTS_DIR, f"{name}.npz")
+
+
+def save_results(name, result, timestamps=None, params=None):
+    """Writes a run_backtest result (plus candle timestamps and params) to RESULTS_DIR."""
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    meta = {k: result[k] for k in SUMMARY_FIELDS}
+    meta["metrics"] = result.get("metrics")
+    meta["params"] = params if params is not None else result.get("params")
+    columns = {f"trade_{k}": v for k, v in result["trade_log"].items()}
+    if timestamps is not None:
+        columns["timestamp"] = np.asarray(timestamps).astype("datetime64[ms]").astype(np.int64)
+    path = results_path(name)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, equity=result["equity"], meta=np.array(json.dumps(meta, default=float)), **columns)
+    os.replace(tmp, path)
+    return path
+
+
+def load_results(name):
+    """Inverse of save_results: the run_backtest dict, with `timestamp`/`params` when saved."""
+    with np.load(results_path(name)) as f:
+        result = json.loads(str(f["meta"]))
+        result["equity"] = f["equity"]
+        result["trade_log"] = {k[len("trade_"):]: f[k] for k in f.files if k.startswith("trade_")}
+        if "timestamp" in f.files:
+            result["timestamp"] = f["timestamp"]
+    return result
@@ -0,0 +1,199 @@
+import argparse
+import numpy as np
+import pandas as pd
+from ohlcv_store import OHLCV_DTYPE, append_candles, empty_candles, load_candles, to_frame
+from rate_limit import call_with_retry
+from resample import TIMEFRAME_MS
+
+# -----------------------------
+# 1. Trade Prints
+# -----------------------------
+TRADE_DTYPE = np.dtype([("timestamp", "i8"), ("price", "f8"), ("amount", "f8")])
+TRADES_PAGE_LIMIT = 1000
+WRITE_EVERY_BARS = 10_000  # completed bars buffered before hitting the store
+
+
+def trades_to_array(trades):
+    """ccxt fetch_trades dicts -> structured array."""
+    arr = np.empty(len(trades), dtype=TRADE_DTYPE)
+    arr["timestamp"] = [t["timestamp"] for t in trades]
+    arr["price"] = [t["price"] for t in trades]
+    arr["amount"] = [t["amount"] for t in trades]
+    return arr
+
+
+def iter_exchange_trades(exchange, symbol, since_ms, until_ms=None):
+    """Pages through `fetch_trades`, yielding one array per page."""
+    seen_at_edge = set()
+    while until_ms is None or since_ms < until_ms:
+        raw = call_with_retry(exchange, "fetch_trades", symbol, since=since_ms, limit=TRADES_PAGE_LIMIT)
+        # Trades sharing the boundary millisecond come back again on the next page
+        page = [t for t in raw if t.get("id") is None or t["id"] not in seen_at_edge]
+        if not page:
+            return
+        chunk = trades_to_array(page)
+        if until_ms is not None:
+            chunk = chunk[chunk["timestamp"] < until_ms]
+        if len(chunk):
+            yield chunk
+        if len(raw) < TRADES_PAGE_LIMIT:
+            return
+        last_ts = raw[-1]["timestamp"]
+        seen_at_edge = {t["id"] for t in raw if t["timestamp"] == last_ts and t.get("id") is not None}
+        # Without trade ids the boundary millisecond can't be deduplicated; skip past it
+        since_ms = last_ts if seen_at_edge else last_ts + 1
+
+
+def iter_trade_file(path, chunk_size=1_000_000):
+    """Replays a CSV of timestamp,price,amount (ms timestamps) in fixed-size chunks."""
+    for df in pd.read_csv(path, usecols=["timestamp", "price", "amount"], chunksize=chunk_size):
+        chunk = np.empty(len(df), dtype=TRADE_DTYPE)
+        for col in TRADE_DTYPE.names:
+            chunk[col] = df[col].to_numpy()
+        yield chunk
+
+
+# -----------------------------
+# 2. Streaming Bar Aggregator
+# -----------------------------
+class BarAggregator:
+    """Turns a stream of trade chunks into time, volume or dollar bars.
+
+    Each chunk is aggregated in one vectorized pass. Only the bar that is still
+    forming is carried between chunks (a single row plus how full it is), so
+    memory stays bounded no matter how many trades flow through.
+
+    kind="time"   -> size is a timeframe ("1m", "5m", ...)
+    kind="volume" -> size is base-currency amount per bar
+    kind="dollar" -> size is quote-currency notional per bar
+    """
+
+    def __init__(self, kind, size):
+        if kind not in ("time", "volume", "dollar"):
+            raise ValueError(f"Unknown bar kind: {kind}")
+        self.kind = kind
+        self.size = TIMEFRAME_MS[size] if kind == "time" else float(size)
+        self.name = f"{kind}-{size}"
+        self.partial = empty_candles()  # 0 or 1 rows
+        self.filled = 0.0               # volume/dollar already in the partial bar
+
+    def _bar_ids(self, trades):
+        if self.kind == "time":
+            return trades["timestamp"] // self.size, None
+        measure = trades["amount"] if self.kind == "volume" else trades["amount"] * trades["price"]
+        cum = self.filled + np.cumsum(measure)
+        # A trade belongs to the bar that was open before it; the trade that
+        # crosses the threshold closes that bar
+        return np.floor((cum - measure) / self.size).astype(np.int64), cum
+
+    def update(self, trades):
+        """Feeds one chunk; returns the bars it completed."""
+        if not len(trades):
+            return empty_candles()
+
+        ids, cum = self._bar_ids(trades)
+        starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+        ends = np.r_[starts[1:] - 1, len(trades) - 1]
+
+        bars = np.empty(len(starts), dtype=OHLCV_DTYPE)
+        if self.kind == "time":
+            bars["timestamp"] = ids[starts] * self.size
+        else:
+            bars["timestamp"] = trades["timestamp"][starts]
+        bars["open"] = trades["price"][starts]
+        bars["high"] = np.maximum.reduceat(trades["price"], starts)
+        bars["low"] = np.minimum.reduceat(trades["price"], starts)
+        bars["close"] = trades["price"][ends]
+        bars["volume"] = np.add.reduceat(trades["amount"], starts)
+
+        # Fold the bar carried over from the previous chunk into the first one
+        if len(self.partial) and (self.kind != "time" or self.partial["timestamp"][0] == bars["timestamp"][0]):
+            first, prev = bars[0], self.partial[0]
+            first["timestamp"] = prev["timestamp"]
+            first["open"] = prev["open"]
+            first["high"] = max(first["high"], prev["high"])
+            first["low"] = min(first["low"], prev["low"])
+            first["volume"] += prev["volume"]
+        elif len(self.partial):
+            bars = np.concatenate([self.partial, bars])
+
+        if self.kind == "time":
+            last_complete = False  # a later trade has to arrive to close the bucket
+        else:
+            last_complete = cum[-1] >= (ids[-1] + 1) * self.size
+            self.filled = cum[-1] - np.floor(cum[-1] / self.size) * self.size
+
+        if last_complete:
+            self.partial = empty_candles()
+            return bars
+        self.partial = bars[-1:].copy()
+        return bars[:-1]
+
+    def flush(self):
+        """Returns the forming bar (if any) and resets it."""
+        bars, self.partial, self.filled = self.partial, empty_candles(), 0.0
+        return bars
+
+
+# -----------------------------
+# 3. Pipeline Into the Local Store
+# -----------------------------
+def build_bars(trade_chunks, symbol, kind, size, include_partial=False):
+    """Aggregates trade chunks and appends the bars to the store under e.g.
+    "volume-100", which optimizer.get_data / trading_bot can load by name."""
+    agg = BarAggregator(kind, size)
+    # Time bars are identified by their bucket; volume/dollar bars only by
+    # order, so none of them may be dropped as a timestamp duplicate
+    dedupe = kind == "time"
+    buffered, pending, total = [], 0, 0
+
+    for chunk in trade_chunks:
+        bars = agg.update(chunk)
+        if len(bars):
+            buffered.append(bars)
+            pending += len(bars)
+        if pending >= WRITE_EVERY_BARS:
+            append_candles(symbol, agg.name, np.concatenate(buffered), dedupe)
+            total += pending
+            buffered, pending = [], 0
+
+    if include_partial:
+        buffered.append(agg.flush())
+    if buffered:
+        out = np.concatenate(buffered)
+        append_candles(symbol, agg.name, out, dedupe)
+        total += len(out)
+
+    print(f"📦 {symbol}: {total} {agg.name} bars stored")
+    return agg.name
+
+
+def load_bars(symbol, name, limit=None):
+    """Stored custom bars as the same DataFrame shape the backtesters use for OHLCV."""
+    arr = load_candles(symbol, name)
+    if limit is not None:
+        arr = arr[-limit:]
+    return to_frame(arr)
+
+
+def is_custom_bar(timeframe):
+    return timeframe not in TIMEFRAME_MS
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aggregate trades into custom bars")
+    parser.add_argument("symbol")
+    parser.add_argument("--kind", choices=["time", "volume", "dollar"], default="volume")
+    parser.add_argument("--size", default="100", help="timeframe for time bars, threshold otherwise")
+    parser.add_argument("--file", help="replay a timestamp,price,amount CSV instead of the exchange")
+    parser.add_argument("--since", default="2024-01-01T00:00:00Z")
+    parser.add_argument("--exchange", default="binance")
+    args = parser.parse_args()
+
+    if args.file:
+        chunks = iter_trade_file(args.file)
+    else:
+        from exchanges import get_exchange
+        exchange = get_exchange(args.exchange, enableRateLimit=True)
+        chunks = iter_exchange_trades(exchange, args.symbol, exchange.parse8601(args.since))
+    build_bars(chunks, args.symbol, args.kind, args.size)
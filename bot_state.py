@@ -0,0 +1,94 @@
+import json
+import sqlite3
+import time
+from collections import deque
+import numpy as np
+from signals import BUY, SIGNAL_NAMES
+from strategies import get_strategy
+
+# -----------------------------
+# 1. Incremental Bollinger Bands
+# -----------------------------
+class RollingBands:
+    """Bollinger bands over the last `period` closes, updated one candle at a time.
+
+    Only the window itself is kept, so the state is a few hundred bytes and
+    restoring it skips refetching/recomputing history on restart. Signals
+    follow bb_reversion with the given `exit_band` ("middle" or "upper").
+    """
+
+    def __init__(self, period=20, std_dev=2.0, closes=(), last_ts=None, exit_band="middle"):
+        self.period = period
+        self.std_dev = std_dev
+        self.exit_band = exit_band
+        self.closes = deque(closes, maxlen=period)
+        self.last_ts = last_ts
+
+    def update(self, ts, close):
+        if self.last_ts is not None and ts < self.last_ts:
+            return  # already folded in
+        if ts == self.last_ts and self.closes:
+            self.closes[-1] = close  # the forming candle was revised
+        else:
+            self.closes.append(close)
+        self.last_ts = ts
+
+    def ready(self):
+        return len(self.closes) == self.period
+
+    def bands(self):
+        window = np.fromiter(self.closes, dtype=np.float64)
+        middle = window.mean()
+        std = window.std(ddof=1)  # matches pandas rolling().std()
+        return middle - std * self.std_dev, middle, middle + std * self.std_dev
+
+    def params(self):
+        return get_strategy("bb_reversion").resolve(
+            {"bb_period": self.period, "bb_std_dev": self.std_dev, "exit_band": self.exit_band})
+
+    def signal(self):
+        """bb_reversion on the newest close: (signal, price, band it was judged against)."""
+        lower, middle, upper = self.bands()
+        price = self.closes[-1]
+        ind = {"close": price, "lower": lower, "middle": middle, "upper": upper}
+        signal = get_strategy("bb_reversion").kernel(ind, self.params())[0]
+        exit_level = upper if self.exit_band == "upper" else middle
+        return SIGNAL_NAMES[int(signal)], price, lower if signal == BUY else exit_level
+
+    def to_state(self):
+        return {"period": self.period, "std_dev": self.std_dev, "exit_band": self.exit_band,
+                "closes": list(self.closes), "last_ts": self.last_ts}
+
+    @classmethod
+    def from_state(cls, state):
+        return cls(state["period"], state["std_dev"], state["closes"], state["last_ts"],
+                   state.get("exit_band", "middle"))
+
+
+# -----------------------------
+# 2. SQLite Snapshot
+# -----------------------------
+class BotState:
+    """Key/value snapshot of the bot in one SQLite file (WAL, so a crash mid-write
+    leaves the previous snapshot intact)."""
+
+    def __init__(self, path="data/live_bot_state.db"):
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT, updated REAL)")
+
+    def save(self, **values):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO state (key, value, updated) VALUES (?, ?, ?)",
+                [(k, json.dumps(v), now) for k, v in values.items()],
+            )
+
+    def load(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def close(self):
+        self.conn.close()
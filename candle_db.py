@@ -0,0 +1,182 @@
+import argparse
+import os
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+from ohlcv_store import BASE_TIMEFRAME, DATA_DIR, COLUMNS
+from resample import get_candles
+
+# -----------------------------
+# 1. Schema
+# -----------------------------
+# One row per candle with the usual indicators precomputed. The table is
+# clustered on (symbol, timeframe, ts), so a time range for one series is a
+# single contiguous index scan and predicates run inside SQLite.
+DB_PATH = os.path.join(DATA_DIR, "candles.db")
+INDICATOR_COLUMNS = ["rsi", "sma20", "bb_upper", "bb_lower", "sma200", "ema12", "ema26", "macd", "macd_signal"]
+ALL_COLUMNS = COLUMNS + INDICATOR_COLUMNS
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS candles (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    {", ".join(f"{c} INTEGER NOT NULL" if c == "timestamp" else f"{c} REAL" for c in ALL_COLUMNS)},
+    PRIMARY KEY (symbol, timeframe, timestamp)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS ingested (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    last_ts INTEGER NOT NULL,
+    PRIMARY KEY (symbol, timeframe)
+);
+"""
+
+
+# -----------------------------
+# 2. Indicators (same definitions as the dashboards)
+# -----------------------------
+def compute_indicators(df):
+    close = df["close"]
+    out = pd.DataFrame(index=df.index)
+    delta = close.diff()
+    avg_gain = delta.where(delta > 0, 0).ewm(com=13, adjust=False).mean()
+    avg_loss = (-delta.where(delta < 0, 0)).ewm(com=13, adjust=False).mean()
+    out["rsi"] = 100 - 100 / (1 + avg_gain / avg_loss)
+    out["sma20"] = close.rolling(20).mean()
+    std20 = close.rolling(20).std()
+    out["bb_upper"] = out["sma20"] + 2 * std20
+    out["bb_lower"] = out["sma20"] - 2 * std20
+    out["sma200"] = close.rolling(200).mean()
+    out["ema12"] = close.ewm(span=12, adjust=False).mean()
+    out["ema26"] = close.ewm(span=26, adjust=False).mean()
+    out["macd"] = out["ema12"] - out["ema26"]
+    out["macd_signal"] = out["macd"].ewm(span=9, adjust=False).mean()
+    return out
+
+
+def _to_ms(value):
+    """Accepts ms ints (or all-digit strings, as the CLI passes them), ISO
+    strings or datetimes (naive ones are taken as UTC)."""
+    if value is None or isinstance(value, (int, np.integer)):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is not None:
+        ts = ts.tz_convert("UTC").tz_localize(None)
+    return int(ts.value // 1_000_000)
+
+
+# -----------------------------
+# 3. Query Layer
+# -----------------------------
+class CandleDB:
+    """Embedded SQL over the local candle store.
+
+    `ingest` copies new candles (and their indicators) from the .npy store;
+    `query` filters by symbol, timeframe, time range and a SQL predicate,
+    e.g. db.query("BTC/USDT", "1d", where="close < bb_lower AND rsi < 30").
+    """
+
+    def __init__(self, path=DB_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+
+    def last_ingested(self, symbol, timeframe):
+        row = self.conn.execute("SELECT last_ts FROM ingested WHERE symbol = ? AND timeframe = ?",
+                                (symbol, timeframe)).fetchone()
+        return row[0] if row else None
+
+    def ingest(self, symbol, timeframe, base_timeframe=BASE_TIMEFRAME):
+        """Adds candles newer than the last ingest; returns how many rows were written.
+
+        Indicators are recomputed over the whole series (they are recursive), but
+        only rows from the last ingested candle onwards are written; that candle
+        was probably still forming last time.
+        """
+        arr = get_candles(symbol, timeframe, base_timeframe)
+        if not len(arr):
+            return 0
+        last = self.last_ingested(symbol, timeframe)
+        start = 0 if last is None else int(np.searchsorted(arr["timestamp"], last))
+
+        df = pd.DataFrame({c: arr[c] for c in COLUMNS})
+        df = pd.concat([df, compute_indicators(df)], axis=1).iloc[start:]
+        df = df.astype(object).where(df.notna(), None)  # NaN warm-up values -> NULL
+        rows = [(symbol, timeframe, *r) for r in df.itertuples(index=False, name=None)]
+
+        placeholders = ", ".join("?" * (len(ALL_COLUMNS) + 2))
+        with self.conn:
+            self.conn.executemany(
+                f"INSERT OR REPLACE INTO candles (symbol, timeframe, {', '.join(ALL_COLUMNS)}) VALUES ({placeholders})",
+                rows,
+            )
+            self.conn.execute("INSERT OR REPLACE INTO ingested VALUES (?, ?, ?)",
+                              (symbol, timeframe, int(arr["timestamp"][-1])))
+        return len(rows)
+
+    def query(self, symbol, timeframe, start=None, end=None, where=None, columns=None, limit=None):
+        """Rows of one series as a DataFrame (timestamps as datetimes).
+
+        `start`/`end` (ms, ISO strings or datetimes) bound the primary-key scan;
+        `where` is a SQL expression over the column names in ALL_COLUMNS.
+        """
+        cols = ", ".join(columns or ALL_COLUMNS)
+        sql = f"SELECT {cols} FROM candles WHERE symbol = ? AND timeframe = ?"
+        params = [symbol, timeframe]
+        if start is not None:
+            sql += " AND timestamp >= ?"
+            params.append(_to_ms(start))
+        if end is not None:
+            sql += " AND timestamp <= ?"
+            params.append(_to_ms(end))
+        if where:
+            sql += f" AND ({where})"
+        sql += " ORDER BY timestamp"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        df = pd.read_sql_query(sql, self.conn, params=params)
+        if "timestamp" in df:
+            df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+        return df
+
+    def sql(self, text, params=()):
+        """Any read query against the `candles` table."""
+        return pd.read_sql_query(text, self.conn, params=list(params))
+
+    def close(self):
+        self.conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the local candle store with SQL")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ing = sub.add_parser("ingest", help="copy new candles + indicators into the database")
+    ing.add_argument("symbols", nargs="+")
+    ing.add_argument("--timeframe", default=BASE_TIMEFRAME)
+    ing.add_argument("--base", default=BASE_TIMEFRAME)
+    q = sub.add_parser("query", help="filter one series")
+    q.add_argument("symbol")
+    q.add_argument("--timeframe", default=BASE_TIMEFRAME)
+    q.add_argument("--start", help="ms timestamp or ISO date")
+    q.add_argument("--end", help="ms timestamp or ISO date")
+    q.add_argument("--where", help='SQL predicate, e.g. "close < bb_lower AND rsi < 30"')
+    q.add_argument("--limit", type=int)
+    raw = sub.add_parser("sql", help="run a raw SELECT")
+    raw.add_argument("text")
+    args = parser.parse_args()
+
+    db = CandleDB()
+    t0 = time.perf_counter()
+    if args.command == "ingest":
+        for symbol in args.symbols:
+            print(f"📥 {symbol} {args.timeframe}: {db.ingest(symbol, args.timeframe, args.base)} rows")
+    elif args.command == "query":
+        print(db.query(args.symbol, args.timeframe, args.start, args.end, args.where, limit=args.limit).to_string())
+    else:
+        print(db.sql(args.text).to_string())
+    print(f"⏱️ {(time.perf_counter() - t0) * 1000:.1f} ms")
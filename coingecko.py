@@ -1,11 +1,9 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import ccxt
 import pandas as pd
-import plotly.graph_objects as go
-import time
-import os
-from datetime import datetime
+from data_source import get_data_source
+from snapshot import SnapshotRefresher
+from signals import BUY, SELL
+from strategies import get_strategy
 
 # -------------------------------------------
 # 1. PAGE CONFIGURATION
@@ -18,25 +16,31 @@ if 'selected_asset' not in st.session_state:
 # -------------------------------------------
 # 2. DATA ENGINE
 # -------------------------------------------
-def get_market_data():
+# Fastest of Binance/Kraken, falling back to stored candles (never random numbers)
+MARKET_SOURCE = get_data_source(synthetic=False, enableRateLimit=True)
+
+def fetch_market_rows():
     """Fetches live data and sorts it for the UI."""
-    exchange = ccxt.binance()
     symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT', 
                'DOGE/USDT', 'ADA/USDT', 'AVAX/USDT', 'DOT/USDT', 'MATIC/USDT']
-    try:
-        tickers = exchange.fetch_tickers(symbols)
-        data = []
-        for symbol, ticker in tickers.items():
-            data.append({
-                "Symbol": symbol,
-                "Name": symbol.split('/')[0],
-                "Price": ticker['last'],
-                "Change": ticker['percentage'],
-                "Volume": ticker['quoteVolume']
-            })
-        return pd.DataFrame(data)
-    except:
-        return pd.DataFrame()
+    data = []
+    for symbol, ticker in MARKET_SOURCE.fetch_tickers(symbols).items():
+        data.append({
+            "Symbol": symbol,
+            "Name": symbol.split('/')[0],
+            "Price": ticker['last'],
+            "Change": ticker['percentage'],
+            "Volume": ticker['quoteVolume']
+        })
+    return data
+
+@st.cache_resource
+def market_snapshot():
+    return SnapshotRefresher("coingecko_market", fetch_market_rows, max_age=60)
+
+def get_market_data():
+    # Last snapshot renders immediately; stale ones refresh in the background
+    return pd.DataFrame(market_snapshot().get())
 
 # History logic (Same as before)
 DEFAULT_TIMEFRAME = "1d"
@@ -45,27 +49,10 @@ BB_STD = 2.0
 
 @st.cache_data(ttl=3600)
 def fetch_history_cached(symbol, timeframe):
-    filename = f"{symbol.replace('/', '_')}_{timeframe}.csv"
-    exchange = ccxt.binance({'enableRateLimit': True})
-    
-    if os.path.exists(filename):
-        df = pd.read_csv(filename)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        return df
-    else:
-        since = exchange.parse8601('2017-01-01T00:00:00Z')
-        all_candles = []
-        while True:
-            candles = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
-            if not candles: break
-            all_candles += candles
-            since = candles[-1][0] + 1
-            if len(candles) < 1000: break
-            time.sleep(0.1)
-        df = pd.DataFrame(all_candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.to_csv(filename, index=False)
-        return df
+    # Paginates back to 2017 with retries, from whichever exchange answers;
+    # pages are checkpointed into the local store, so an interrupted download
+    # resumes where it stopped and later calls only fetch the newest candles
+    return MARKET_SOURCE.history(symbol, timeframe, base_timeframe=timeframe)
 
 def calculate_bands(df, period, std):
     df['middle'] = df['close'].rolling(window=period).mean()
@@ -146,6 +133,9 @@ if st.session_state.selected_asset is None:
 
 # === SCENE 2: MISSION CONTROL (Detailed View) ===
 else:
+    import plotly.graph_objects as go
+    import streamlit.components.v1 as components
+
     # Top Bar
     c_back, c_title = st.columns([1, 6])
     with c_back:
@@ -167,13 +157,14 @@ else:
                 df = calculate_bands(df, BB_PERIOD, BB_STD)
             
             last = df.iloc[-1]
+            signal = get_strategy('bb_reversion').kernel(df, {'exit_band': 'upper'})[-1]
             # Metrics
             met1, met2, met3 = st.columns(3)
             met1.metric("Price", f"${last['close']:,.2f}")
             
-            if last['close'] < last['lower']:
+            if signal == BUY:
                 met2.metric("Bot Signal", "BUY", "Oversold", delta_color="normal")
-            elif last['close'] > last['upper']:
+            elif signal == SELL:
                 met2.metric("Bot Signal", "SELL", "Overbought", delta_color="inverse")
             else:
                 met2.metric("Bot Signal", "HOLD", "Neutral", delta_color="off")
@@ -0,0 +1,155 @@
+import threading
+import time
+import numpy as np
+from resample import TIMEFRAME_MS, bucket_start
+from screener import close_matrix
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+CORRELATION_TIMEFRAME = "1h"
+WINDOWS = (24, 168, 720)  # 1 day, 1 week, 30 days of hourly returns
+
+
+# -----------------------------
+# 2. Rolling Co-Moments (one window)
+# -----------------------------
+class RollingCovariance:
+    """Covariance/correlation of the last `window` return vectors, updated in O(N²).
+
+    Keeps the window's returns in a ring buffer plus their running sum and
+    cross-product matrix. A new row adds its outer product and subtracts the
+    one leaving the window, so a candle costs O(N²) instead of the O(N²·T) of
+    recomputing from scratch. The sums are rebuilt from the buffer once per
+    window length to stop floating-point drift from accumulating.
+    """
+
+    def __init__(self, n_symbols, window):
+        self.window = window
+        self.buffer = np.zeros((window, n_symbols))
+        self.sum = np.zeros(n_symbols)
+        self.cross = np.zeros((n_symbols, n_symbols))
+        self.count = 0   # rows seen, capped at window
+        self.pos = 0     # next ring slot
+        self._since_rebuild = 0
+
+    def extend(self, returns):
+        """Feeds rows of returns (time x symbols), oldest first."""
+        returns = np.atleast_2d(returns)
+        if len(returns) >= self.window:
+            # Bulk load: only the last `window` rows matter
+            self.buffer[:] = returns[-self.window:]
+            self.pos, self.count = 0, self.window
+            self._rebuild()
+            return
+        for row in returns:
+            old = self.buffer[self.pos]
+            if self.count == self.window:
+                self.sum -= old
+                self.cross -= np.outer(old, old)
+            self.buffer[self.pos] = row
+            self.sum += row
+            self.cross += np.outer(row, row)
+            self.pos = (self.pos + 1) % self.window
+            self.count = min(self.count + 1, self.window)
+            self._since_rebuild += 1
+        if self._since_rebuild >= self.window:
+            self._rebuild()
+
+    def _rebuild(self):
+        rows = self.buffer if self.count == self.window else self.buffer[:self.count]
+        self.sum = rows.sum(axis=0)
+        self.cross = rows.T @ rows
+        self._since_rebuild = 0
+
+    def covariance(self):
+        n = self.count
+        if n < 2:
+            return np.full(self.cross.shape, np.nan)
+        return (self.cross - np.outer(self.sum, self.sum) / n) / (n - 1)
+
+    def correlation(self):
+        cov = self.covariance()
+        std = np.sqrt(np.clip(np.diag(cov), 0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            corr = cov / np.outer(std, std)
+        corr = np.clip(corr, -1.0, 1.0)
+        np.fill_diagonal(corr, np.where(std > 0, 1.0, np.nan))
+        return corr
+
+
+# -----------------------------
+# 3. Engine Over the Local Store
+# -----------------------------
+class CorrelationEngine:
+    """Pairwise return correlations for a symbol universe over several windows.
+
+    Reads completed candles from the local OHLCV store; each `update` only
+    pulls the candles closed since the previous one. Log returns are used, and
+    a candle missing for a symbol counts as no move.
+    """
+
+    def __init__(self, symbols, windows=WINDOWS, timeframe=CORRELATION_TIMEFRAME, base_timeframe=None):
+        self.symbols = list(symbols)
+        self.timeframe = timeframe
+        self.base_timeframe = base_timeframe
+        self.windows = {w: RollingCovariance(len(self.symbols), w) for w in windows}
+        self.last_ts = None          # open time of the newest candle folded in
+        self._last_close = None
+        self._lock = threading.Lock()  # shared between Streamlit sessions
+
+    def update(self, now_ms=None):
+        """Folds in newly completed candles; returns how many were added."""
+        with self._lock:
+            return self._update(now_ms)
+
+    def _update(self, now_ms):
+        ms = TIMEFRAME_MS[self.timeframe]
+        now_ms = int(time.time() * 1000) if now_ms is None else now_ms
+        last_complete = int(bucket_start(np.int64(now_ms), self.timeframe)) - ms
+        if self.last_ts is not None and last_complete <= self.last_ts:
+            return 0
+
+        if self.last_ts is None:
+            length = max(self.windows) + 1
+        else:
+            length = (last_complete - self.last_ts) // ms + 1
+        closes, grid = close_matrix(self.symbols, self.timeframe, length, self.base_timeframe, last_complete)
+        if self._last_close is not None:
+            # First column is the candle we already have; reuse its close
+            closes[:, 0] = np.where(np.isnan(closes[:, 0]), self._last_close, closes[:, 0])
+
+        # Skip the stretch before any symbol has history
+        has_data = ~np.isnan(closes).all(axis=0)
+        first = int(np.argmax(has_data)) if has_data.any() else closes.shape[1]
+        closes, grid = closes[:, first:], grid[first:]
+        if len(grid) < 2:
+            return 0
+
+        # Carry the last known close forward so gaps don't produce NaN returns
+        filled = closes.copy()
+        for t in range(1, filled.shape[1]):
+            gap = np.isnan(filled[:, t])
+            filled[gap, t] = filled[gap, t - 1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.nan_to_num(np.diff(np.log(filled), axis=1).T, nan=0.0, posinf=0.0, neginf=0.0)
+
+        for roller in self.windows.values():
+            roller.extend(returns)
+        self.last_ts = int(grid[-1])
+        self._last_close = filled[:, -1]
+        return len(returns)
+
+    def correlation(self, window):
+        return self.windows[window].correlation()
+
+    def covariance(self, window):
+        return self.windows[window].covariance()
+
+    def top_pairs(self, window, n=10):
+        """Most correlated distinct pairs as (symbol_a, symbol_b, corr)."""
+        corr = self.correlation(window)
+        i, j = np.triu_indices(len(self.symbols), k=1)
+        values = corr[i, j]
+        order = np.argsort(-np.nan_to_num(values, nan=-np.inf))[:n]
+        return [(self.symbols[i[k]], self.symbols[j[k]], float(values[k])) for k in order]
@@ -1,11 +1,8 @@
 import streamlit as st
-import streamlit.components.v1 as components
-import ccxt
 import pandas as pd
-import plotly.graph_objects as go
-import time
-import os
-from datetime import datetime
+from data_source import exchange_symbol, get_data_source
+from signals import BUY, SELL
+from strategies import get_strategy
 
 # -------------------------------------------
 # 1. PAGE CONFIGURATION
@@ -33,29 +30,12 @@ BB_STD = 2.0
 
 @st.cache_data(ttl=3600)
 def fetch_history_cached(symbol, timeframe):
-    filename = f"{symbol.replace('/', '_')}_{timeframe}.csv"
-    exchange = ccxt.binance({'enableRateLimit': True})
-    
-    if os.path.exists(filename):
-        df = pd.read_csv(filename)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        return df
-    else:
-        # First time download (Loops back to 2017)
-        since = exchange.parse8601('2017-01-01T00:00:00Z')
-        all_candles = []
-        while True:
-            candles = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
-            if not candles: break
-            all_candles += candles
-            since = candles[-1][0] + 1
-            if len(candles) < 1000: break
-            time.sleep(0.1)
-            
-        df = pd.DataFrame(all_candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.to_csv(filename, index=False)
-        return df
+    # Paginates back to 2017 with retries on the first visit, from whichever
+    # exchange answers (see data_source.py); pages are checkpointed into the
+    # local store, so later visits (and interrupted downloads) only fetch
+    # the candles that are missing
+    return get_data_source(synthetic=False, enableRateLimit=True).history(symbol, timeframe,
+                                                                          base_timeframe=timeframe)
 
 def calculate_bands(df, period, std):
     df['middle'] = df['close'].rolling(window=period).mean()
@@ -86,15 +66,17 @@ with tab1:
         c2.metric("All-Time High", f"${df['high'].max():,.2f}")
         c3.metric("All-Time Low", f"${df['low'].min():,.2f}")
         
-        # Signal Logic
-        if last_row['close'] < last_row['lower']:
+        # Signal Logic (shared with the bots)
+        signal = get_strategy('bb_reversion').kernel(df, {'exit_band': 'upper'})[-1]
+        if signal == BUY:
             c4.metric("Bot Signal", "🟢 BUY ZONE", delta="Oversold")
-        elif last_row['close'] > last_row['upper']:
+        elif signal == SELL:
             c4.metric("Bot Signal", "🔴 SELL ZONE", delta="Overbought", delta_color="inverse")
         else:
             c4.metric("Bot Signal", "💤 NEUTRAL", delta="Holding", delta_color="off")
 
-        # Plotly Chart
+        # Plotly Chart (imported here so the metrics above paint first)
+        import plotly.graph_objects as go
         fig = go.Figure()
         fig.add_trace(go.Candlestick(x=df['timestamp'], open=df['open'], high=df['high'], low=df['low'], close=df['close'], name='Price'))
         fig.add_trace(go.Scatter(x=df['timestamp'], y=df['upper'], line=dict(color='gray', width=1), name='Upper'))
@@ -110,9 +92,10 @@ with tab1:
 # === TAB 2: TRADINGVIEW WIDGET ===
 with tab2:
     st.subheader(f"{selected_symbol} // Professional Terminal")
+    import streamlit.components.v1 as components
     
     # Convert symbol for TradingView (e.g., "BTC/USDT" -> "BINANCE:BTCUSDT")
-    tv_symbol = f"BINANCE:{selected_symbol.replace('/', '')}"
+    tv_symbol = f"BINANCE:{exchange_symbol(selected_symbol, 'binance').replace('/', '')}"
 
     # Embed Widget
     html_code = f"""
@@ -139,382 +122,3 @@ with tab2:
     
     # --- FIXED LINE BELOW ---
     components.html(html_code, height=800)
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-
-    import streamlit as st
-import streamlit.components.v1 as components
-import ccxt
-import pandas as pd
-import plotly.graph_objects as go
-import time
-import os
-import random 
-from datetime import datetime, timedelta
-
-# -------------------------------------------
-# 1. PAGE CONFIGURATION
-# -------------------------------------------
-st.set_page_config(page_title="Coinify", layout="wide", page_icon="⚡")
-
-if 'selected_asset' not in st.session_state:
-    st.session_state.selected_asset = None
-
-# -------------------------------------------
-# 2. DATA ENGINE (CLOUD SAFE VERSION)
-# -------------------------------------------
-@st.cache_data(ttl=60)
-def get_market_data():
-    # --- LIVE PRICE FIX: Use Kraken (Cloud-friendly exchange) ---
-    try:
-        exchange = ccxt.kraken() # Switching from blocked Binance to Kraken
-        symbols = ['BTC/USDT', 'ETH/USDT', 'SOL/USDT', 'BNB/USDT', 'XRP/USDT', 'DOGE/USDT', 'ADA/USDT', 'AVAX/USDT']
-        # Kraken symbols are slightly different
-        kraken_symbols = [s.replace('USDT', 'USD') for s in symbols] 
-        tickers = exchange.fetch_tickers(kraken_symbols)
-        
-        data = []
-        rank = 1
-        for symbol, ticker in tickers.items():
-            name = symbol.split('/')[0]
-            data.append({
-                "Rank": rank, "Symbol": symbol, "Name": name,
-                "Price": ticker['last'], "Change": ticker['percentage'],
-                "Volume": ticker['quoteVolume'], 
-                "MarketCap": ticker['quoteVolume'] * random.uniform(20, 50),
-                "Logo": f"https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/{name.lower()}.png", 
-                "Sparkline": f"https://www.coingecko.com/coins/{rank}/sparkline.svg"
-            })
-            rank += 1
-        return pd.DataFrame(data)
-    
-    # 2. Fallback to Demo Data (If Kraken also fails)
-    except Exception as e:
-        # Fallback ensures the site is never blank for recruiters
-        data = []
-        mock_coins = [
-            ("BTC/USDT", 67000), ("ETH/USDT", 2500), ("SOL/USDT", 140), ("BNB/USDT", 600),
-            ("XRP/USDT", 0.60), ("DOGE/USDT", 0.15), ("ADA/USDT", 0.45), ("AVAX/USDT", 35)
-        ]
-        rank = 1
-        for symbol, price in mock_coins:
-            name = symbol.split('/')[0]
-            price = price * random.uniform(0.98, 1.02)
-            change = random.uniform(-5, 5)
-            data.append({
-                "Rank": rank, "Symbol": symbol, "Name": name,
-                "Price": price, "Change": change,
-                "Volume": random.uniform(1000000, 1000000000), 
-                "MarketCap": random.uniform(1000000000, 50000000000),
-                "Logo": f"https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/{name.lower()}.png", 
-                "Sparkline": f"https://www.coingecko.com/coins/{rank}/sparkline.svg"
-            })
-            rank += 1
-        return pd.DataFrame(data)
-
-DEFAULT_TIMEFRAME = "1d"
-BB_PERIOD = 20
-BB_STD = 2.0
-
-@st.cache_data(ttl=3600)
-def fetch_history_cached(symbol, timeframe):
-    # --- FIX: RESTORED FULL HISTORY FETCHING (Paginates back to 2017) ---
-    
-    try:
-        exchange = ccxt.kraken({'enableRateLimit': True})
-        
-        # Start fetching from Kraken's earliest available date (approx 2017)
-        since_ms = exchange.parse8601('2017-01-01T00:00:00Z') 
-        
-        all_candles = []
-        while True:
-            # Fetch data in batches of 1000
-            candles = exchange.fetch_ohlcv(symbol, timeframe, since=since_ms, limit=1000)
-            if not candles:
-                break
-            
-            all_candles.extend(candles)
-            
-            # Update 'since' to the last timestamp found + 1ms to get next batch
-            since_ms = candles[-1][0] + 1
-            
-            # If we fetched less than the limit, we're done
-            if len(candles) < 1000:
-                break
-            time.sleep(0.1) 
-            
-        df = pd.DataFrame(all_candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
-    
-    except Exception as e:
-        # Fallback ensures the chart is never blank
-        dates = pd.date_range(end=datetime.now(), periods=200, freq='D')
-        df = pd.DataFrame({'timestamp': dates})
-        df['close'] = [60000 + (i * random.uniform(-50, 50)) for i in range(len(dates))]
-        df['open'] = df['close'] * random.uniform(0.99, 1.01)
-        df['high'] = df['close'] * 1.05
-        df['low'] = df['close'] * 0.95
-        return df
-
-def add_indicators(df, period, std):
-    def add_indicators(df, period, std):
-    # --- 1. Bollinger Bands (BB) - Volatility ---
-     df['middle'] = df['close'].rolling(window=period).mean()
-    std_dev = df['close'].rolling(window=period).std()
-    df['upper'] = df['middle'] + (std_dev * std)
-    df['lower'] = df['middle'] - (std_dev * std)
-
-    # --- 2. Relative Strength Index (RSI) - Momentum ---
-    # Calculates the 14-period RSI
-    delta = df['close'].diff()
-    gain = delta.where(delta > 0, 0)
-    loss = -delta.where(delta < 0, 0)
-    avg_gain = gain.ewm(com=14-1, adjust=False).mean() # Exponentially weighted smoothing
-    avg_loss = loss.ewm(com=14-1, adjust=False).mean()
-    rs = avg_gain / avg_loss
-    df['RSI'] = 100 - (100 / (1 + rs)) # RSI calculation
-    
-    # --- 3. MACD - Trend Following Momentum ---
-    # MACD standard settings: 12 (fast), 26 (slow), 9 (signal)
-    df['EMA12'] = df['close'].ewm(span=12, adjust=False).mean()
-    df['EMA26'] = df['close'].ewm(span=26, adjust=False).mean()
-    df['MACD'] = df['EMA12'] - df['EMA26'] # MACD Line
-    df['Signal'] = df['MACD'].ewm(span=9, adjust=False).mean() # Signal Line
-    
-    # --- 4. Simple Moving Average (SMA) - Trend Filter ---
-    df['SMA200'] = df['close'].rolling(window=200).mean() # 200-day SMA
-    
-    # Drop rows with NaN values created by rolling/ewm calculation for clean signals
-    df = df.dropna()
-    return df
-def create_indicator_status_table(last_row):
-    """Creates a DataFrame showing the current status of each indicator."""
-    
-    # 1. Define the status for each indicator based on the last row of data
-    
-    # Bollinger Bands
-    if last_row['close'] < last_row['lower']:
-        bb_status = "Oversold (BUY)"
-    elif last_row['close'] > last_row['upper']:
-        bb_status = "Overbought (SELL)"
-    else:
-        bb_status = "Neutral"
-
-    # RSI
-    if last_row['RSI'] < 30:
-        rsi_status = "Oversold (BUY)"
-    elif last_row['RSI'] > 70:
-        rsi_status = "Overbought (SELL)"
-    else:
-        rsi_status = "Neutral"
-        
-    # MACD
-    if last_row['MACD'] > last_row['Signal']:
-        macd_status = "Bullish Cross (BUY)"
-    elif last_row['MACD'] < last_row['Signal']:
-        macd_status = "Bearish Cross (SELL)"
-    else:
-        macd_status = "Neutral"
-
-    # SMA200
-    if last_row['close'] > last_row['SMA200']:
-        sma_status = "Uptrend (BUY)"
-    else:
-        sma_status = "Downtrend (SELL)"
-        
-    # 2. Compile the status into a DataFrame
-    data = {
-        'Indicator': ['BBands', 'RSI', 'MACD', 'SMA200'],
-        'Value': [
-            f"Close vs. Lower: {last_row['lower']:.2f}",
-            f"{last_row['RSI']:.2f}",
-            f"MACD vs. Signal: {macd_status}",
-            f"Close vs. SMA200: {last_row['SMA200']:.2f}"
-        ],
-        'Signal': [bb_status, rsi_status, macd_status, sma_status]
-    }
-    
-    return pd.DataFrame(data)
-
-# -------------------------------------------
-# 3. APP NAVIGATION
-# -------------------------------------------
-if st.session_state.selected_asset is None:
-    # BRANDING HEADER
-    col_logo, col_title = st.columns([1, 10])
-    with col_logo:
-        st.image("https://cdn-icons-png.flaticon.com/512/217/217853.png", width=70)
-    with col_title:
-        st.title("Coinify")
-    st.markdown("### The Modern Crypto Tracker")
-
-    with st.spinner("Syncing Market Data..."):
-        df = get_market_data()
-
-    if not df.empty:
-        # Highlights
-        top_gainer = df.loc[df['Change'].idxmax()]
-        top_loser = df.loc[df['Change'].idxmin()]
-        btc_rows = df.loc[df['Name'] == 'BTC']
-        btc_data = btc_rows.iloc[0] if not btc_rows.empty else df.iloc[0]
-
-        m1, m2, m3 = st.columns(3)
-        with m1:
-            with st.container(border=True):
-                st.caption("🚀 Top Gainer")
-                c_head, c_metric = st.columns([1, 2])
-                c_head.image(top_gainer['Logo'], width=50)
-                st.image(top_gainer['Sparkline'], use_container_width=True)
-        with m2:
-            with st.container(border=True):
-                st.caption("📉 Top Loser")
-                c_head, c_metric = st.columns([1, 2])
-                c_head.image(top_loser['Logo'], width=50)
-                c_metric.metric(top_loser['Name'], f"${top_loser['Price']:,.2f}", f"{top_loser['Change']:.2f}%")
-                st.image(top_loser['Sparkline'], use_container_width=True)
-        with m3:
-            with st.container(border=True):
-                st.caption("💰 Market Leader")
-                c_head, c_metric = st.columns([1, 2])
-                c_head.image(btc_data['Logo'], width=50)
-                c_metric.metric(btc_data['Name'], f"${btc_data['Price']:,.2f}", f"{btc_data['Change']:.2f}%")
-                st.image(btc_data['Sparkline'], use_container_width=True)
-
-        st.write("") 
-
-        # TABLE
-        h_cols = st.columns([0.4, 1.8, 1.2, 1.0, 1.5, 1.5, 1.5])
-        h_cols[0].markdown("##### #")
-        h_cols[1].markdown("##### Coin")
-        h_cols[2].markdown("##### Price")
-        h_cols[3].markdown("##### 24h")
-        h_cols[4].markdown("##### Volume")
-        h_cols[5].markdown("##### Mkt Cap")
-        h_cols[6].markdown("##### Trend (7d)")
-        st.divider()
-
-        for index, row in df.iterrows():
-            cols = st.columns([0.4, 1.8, 1.2, 1.0, 1.5, 1.5, 1.5])
-            cols[0].write(f"**{row['Rank']}**")
-            with cols[1]:
-                c_img, c_txt = st.columns([0.5, 1.5])
-                c_img.image(row['Logo'], width=50)
-                c_txt.markdown(f"**{row['Name']}**\n<span style='color:gray;font-size:0.8em'>{row['Symbol'].split('/')[0]}</span>", unsafe_allow_html=True)
-            cols[2].write(f"${row['Price']:,.2f}")
-            color = "green" if row['Change'] > 0 else "red"
-            cols[3].markdown(f":{color}[{row['Change']:.2f}%]")
-            vol_str = f"${row['Volume']/1_000_000_000:.2f}B" if row['Volume'] > 1_000_000_000 else f"${row['Volume']/1_000_000:.2f}M"
-            cols[4].write(vol_str)
-            cap_str = f"${row['MarketCap']/1_000_000_000:.2f}B"
-            cols[5].write(cap_str)
-            with cols[6]:
-                sc1, sc2 = st.columns([3, 1])
-                sc1.image(row['Sparkline'])
-                if sc2.button("🔎", key=row['Symbol'], help=f"Analyze {row['Name']}"):
-                    st.session_state.selected_asset = row['Symbol']
-                    st.rerun()
-            st.markdown("---")
-
-else:
-    if st.button("⬅️ Back to Coinify Market"):
-        st.session_state.selected_asset = None
-        st.rerun()
-    asset = st.session_state.selected_asset
-    st.header(f"{asset} Analysis")
-    tab1, tab2 = st.tabs(["📊 Technicals", "🕯️ TradingView"])
-  # --- TAB 1: PYTHON ANALYZER (FINAL OPTIMIZED CHART) ---
-    with tab1:
-       # Loading historical data (now filtered to 1 year max in function)
-        with st.spinner("Loading History..."):
-            # 1. NEW FUNCTION CALL: Now calculates 4 indicators
-            df = add_indicators(df, BB_PERIOD, BB_STD) 
-            last_row = df.iloc[-1]
-            
-            # --- SIGNAL CONFLUENCE LOGIC ---
-            
-            # BB Buy: Price < Lower Band (Extreme Oversold)
-            bb_buy = last_row['close'] < last_row['lower']
-            # RSI Buy: RSI < 30 (Classic Oversold)
-            rsi_buy = last_row['RSI'] < 30
-            # MACD Buy: MACD Line is above Signal Line (Bullish momentum is building)
-            macd_buy = last_row['MACD'] > last_row['Signal']
-            # SMA Buy: Close price is above 200 SMA (Confirms the long-term trend is UP)
-            sma_buy = last_row['close'] > last_row['SMA200']
-
-            # Total Score for Buy Signal
-            buy_score = sum([bb_buy, rsi_buy, macd_buy, sma_buy])
-            
-            # Metrics
-            m1, m2, m3 = st.columns(3)
-            m1.metric("Current Price", f"${last_row['close']:,.2f}")
-            m2.metric("All Time High", f"${df['high'].max():,.2f}") 
-            
-            # 2. NEW DECISION BLOCK (Requires 3 out of 4 to agree)
-            if buy_score >= 3:
-                m3.metric("Bot Signal", "🔥 STRONG BUY", "High Confluence")
-            elif last_row['close'] > last_row['upper'] and last_row['RSI'] > 70:
-                # Less strict SELL signal (BB + RSI Overbought)
-                m3.metric("Bot Signal", "🔴 SELL ZONE", "Overbought")
-            else:
-                m3.metric("Bot Signal", "💤 NEUTRAL", "Hold")
-            
-            # Chart drawing logic follows here...
-
-            # Plotly Chart (Uses full DF but sets initial zoom range)
-            fig = go.Figure()
-            fig.add_trace(go.Candlestick(x=df['timestamp'], open=df['open'], high=df['high'], low=df['low'], close=df['close'], name='Price'))
-            fig.add_trace(go.Scatter(x=df['timestamp'], y=df['upper'], line=dict(color='gray', width=1), name='Upper'))
-            fig.add_trace(go.Scatter(x=df['timestamp'], y=df['lower'], line=dict(color='gray', width=1), name='Lower'))
-            fig.add_trace(go.Scatter(x=df['timestamp'], y=df['middle'], line=dict(color='orange', width=1), name='Avg'))
-            
-            # Set the initial view range to the last 3 years
-            fig.update_xaxes(range=[start_date_view, end_date], rangeslider_visible=True, type='date')
-            fig.update_layout(height=500, template="plotly_dark", title=f"{asset} Full History (3-Year View)")
-            st.plotly_chart(fig, use_container_width=True)
-            # Plotly chart drawing logic is here...
-        st.plotly_chart(fig, use_container_width=True)
-
-        # --- NEW CODE BLOCK BELOW THE CHART ---
-        st.markdown("---")
-        st.subheader("🔎 Indicator Confluence Breakdown")
-        
-        # Call the new function to get the analysis table
-        indicator_df = create_indicator_status_table(last_row)
-        
-        # Display the table using st.dataframe for an interactive view
-        st.dataframe(indicator_df, use_container_width=True, hide_index=True)
-        # --- END NEW CODE BLOCK ---
-
-        except Exception as e:
-    st.error(f"Error loading chart: {e}")
-
-        except Exception as e:
-    st.error(f"Error loading chart: {e}") 
-    with tab2:
-        tv_symbol = f"KRAKEN:{asset.replace('/USDT', 'USD')}" # Adjusted symbol for Kraken in TradingView
-        components.html(f"""
-        <div class="tradingview-widget-container" style="height:100%;width:100%">
- 
-          <div class="tradingview-widget-container__widget" style="height:calc(100% - 32px);width:100%"></div>
-          <script type="text/javascript" src="https://s3.tradingview.com/external-embedding/embed-widget-advanced-chart.js" async>
-          {{"width": "100%", "height": "600", "symbol": "{tv_symbol}", "interval": "D", "timezone": "Etc/UTC", "theme": "dark", "style": "1", "locale": "en", "enable_publishing": false, "allow_symbol_change": true, "support_host": "https://www.tradingview.com"}}
-          </script>
-        </div>
-        """, height=600)
\ No newline at end of file
@@ -1,10 +1,7 @@
 import streamlit as st
-import ccxt
-import pandas as pd
 import plotly.graph_objects as go
-import time
-import os
-from datetime import datetime, timedelta
+from datetime import datetime
+from data_source import get_data_source
 
 # -------------------------------------------
 # 1. PAGE CONFIGURATION
@@ -44,31 +41,12 @@ with st.sidebar:
 # -------------------------------------------
 @st.cache_data(ttl=3600) # Cache data for 1 hour to make it fast
 def fetch_all_history(symbol, timeframe):
-    filename = f"{symbol.replace('/', '_')}_{timeframe}.csv"
-    exchange = ccxt.binance({'enableRateLimit': True})
-    
-    if os.path.exists(filename):
-        df = pd.read_csv(filename)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        return df
-    else:
-        # Download data if file doesn't exist
-        # Using a safer, smaller batch for immediate testing if file missing
-        # For full history, this block runs once
-        since = exchange.parse8601('2017-01-01T00:00:00Z')
-        all_candles = []
-        while True:
-            candles = exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=1000)
-            if not candles: break
-            all_candles += candles
-            since = candles[-1][0] + 1
-            if len(candles) < 1000: break
-            time.sleep(0.1)
-            
-        df = pd.DataFrame(all_candles, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df.to_csv(filename, index=False)
-        return df
+    # Paginates back to 2017 with retries on the first visit, from whichever
+    # exchange answers (see data_source.py); pages are checkpointed into the
+    # local store, so later visits (and interrupted downloads) only fetch
+    # the candles that are missing
+    return get_data_source(synthetic=False, enableRateLimit=True).history(symbol, timeframe,
+                                                                          base_timeframe=timeframe)
 
 def calculate_bands(df, period, std):
     df['middle'] = df['close'].rolling(window=period).mean()
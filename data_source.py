@@ -0,0 +1,361 @@
+import argparse
+import os
+import threading
+import time
+from exchanges import get_exchange
+from history import sync_recent
+from ohlcv_store import BASE_TIMEFRAME, candles_to_array, load_candles, to_frame, venue_key
+from rate_limit import call_with_retry, get_limiter
+from resample import TIMEFRAME_MS, get_candles
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+# Exchanges in order of preference; COINIFY_SOURCES=kraken,binance flips it.
+SOURCES = tuple(s.strip() for s in os.environ.get("COINIFY_SOURCES", "binance,kraken").split(",") if s.strip())
+LATENCY_ALPHA = 0.3    # weight of the newest sample in the latency average
+FAILURE_COOLDOWN = 30  # seconds a failing exchange is skipped; doubles per consecutive failure
+MAX_COOLDOWN = 600
+PROBE_INTERVAL = 300   # seconds between background latency probes of every exchange
+PROBE_SYMBOL = "BTC/USDT"
+SWITCH_FACTOR = 3.0    # history stays on the exchange it came from unless that one is this much slower
+SYNTHETIC_SEED = 42
+SYNTHETIC_CANDLES = 500
+
+# Symbols are written once, as "BASE/USDT"; each exchange gets its own quote.
+QUOTE_ALIASES = {"kraken": {"USDT": "USD"}}
+
+
+# -----------------------------
+# 2. Symbol Normalization
+# -----------------------------
+def canonical_symbol(symbol, exchange_name=None):
+    """'btc-usdt', 'BTC_USDT' -> 'BTC/USDT'; an exchange's own symbol maps back too
+    (Kraken's 'BTC/USD' -> 'BTC/USDT')."""
+    parts = symbol.strip().upper().replace("-", "/").replace("_", "/").split("/")
+    if len(parts) != 2:
+        return symbol.strip().upper()
+    base, quote = parts
+    for canonical, alias in QUOTE_ALIASES.get(exchange_name, {}).items():
+        if quote == alias:
+            quote = canonical
+    return f"{base}/{quote}"
+
+
+def exchange_symbol(symbol, exchange_name):
+    """The symbol `exchange_name` lists the pair under."""
+    base, quote = canonical_symbol(symbol).split("/")
+    return f"{base}/{QUOTE_ALIASES.get(exchange_name, {}).get(quote, quote)}"
+
+
+def store_key(symbol, exchange_name):
+    """Local store key of the pair's candles from `exchange_name` ("kraken:BTC/USD")."""
+    return venue_key(exchange_name, exchange_symbol(symbol, exchange_name))
+
+
+# -----------------------------
+# 3. Per-Source Health
+# -----------------------------
+class SourceStats:
+    """Latency and error counts for one exchange.
+
+    Latency is an exponential moving average of single round trips (probes
+    and ticker requests; history syncs vary with how much is missing, so
+    they only count as calls). After a failure the source sits out a
+    cooldown that doubles with each further consecutive failure, so a dead
+    exchange isn't retried on every request.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.latency_ms = None
+        self.last_error = None
+        self.cooldown_until = 0.0
+
+    def record(self, seconds=None, error=None):
+        self.calls += 1
+        if error is None:
+            if seconds is not None:
+                ms = seconds * 1000
+                self.latency_ms = ms if self.latency_ms is None else (
+                    LATENCY_ALPHA * ms + (1 - LATENCY_ALPHA) * self.latency_ms)
+            self.consecutive_failures = 0
+            self.cooldown_until = 0.0
+        else:
+            self.errors += 1
+            self.consecutive_failures += 1
+            self.last_error = f"{type(error).__name__}: {error}"
+            cooldown = min(MAX_COOLDOWN, FAILURE_COOLDOWN * 2 ** (self.consecutive_failures - 1))
+            self.cooldown_until = time.monotonic() + cooldown
+
+    def available(self):
+        return time.monotonic() >= self.cooldown_until
+
+    def as_dict(self):
+        return {
+            "source": self.name,
+            "calls": self.calls,
+            "errors": self.errors,
+            "error_rate": self.errors / self.calls if self.calls else 0.0,
+            "latency_ms": self.latency_ms,
+            "available": self.available(),
+            "last_error": self.last_error,
+        }
+
+
+# -----------------------------
+# 4. Routed Data Source
+# -----------------------------
+class DataSource:
+    """Market data from whichever configured exchange is answering fastest.
+
+    Requests take canonical symbols and go to the available exchange with the
+    lowest observed latency (unmeasured ones follow, in configured order); a
+    background probe re-times every exchange each PROBE_INTERVAL. On error
+    the next exchange is tried; when all of them fail, candles come from the
+    local store and, if that is empty too, deterministic synthetic data
+    (unless `synthetic=False`). Frames and tickers say which source served
+    them. Candles are stored per exchange (see store_key).
+
+    With `pin=True` the first exchange that delivers a symbol's history keeps
+    serving it for the life of the process (or its stored candles, when it is
+    down), so a bot's indicators or an optimizer run never mix venues.
+    """
+
+    def __init__(self, sources=SOURCES, synthetic=True, pin=False, **options):
+        self.sources = tuple(sources)
+        self.synthetic = synthetic
+        self.pin = pin
+        self.pinned = {}  # canonical symbol -> exchange its history comes from
+        self.options = options
+        self.stats = {name: SourceStats(name) for name in self.sources}
+        self._lock = threading.Lock()
+        self._last_probe = -float("inf")
+
+    def exchange(self, name):
+        return get_exchange(name, **self.options)
+
+    def ranked(self):
+        """Available exchanges, fastest first; all of them if none is available."""
+        with self._lock:
+            order = {name: k for k, name in enumerate(self.sources)}
+            up = [s for s in self.stats.values() if s.available()] or list(self.stats.values())
+            up.sort(key=lambda s: (s.latency_ms is None, s.latency_ms or 0.0, order[s.name]))
+            stale = len(self.sources) > 1 and time.monotonic() - self._last_probe > PROBE_INTERVAL
+            if stale:
+                self._last_probe = time.monotonic()
+        if stale:
+            threading.Thread(target=self.probe, daemon=True).start()
+        return [s.name for s in up]
+
+    def probe(self, symbol=PROBE_SYMBOL):
+        """Times one ticker request per exchange (in parallel) to refresh the routing."""
+        def one(name):
+            exchange = self.exchange(name)
+            get_limiter(exchange).acquire()
+            t0 = time.perf_counter()
+            try:
+                exchange.fetch_ticker(exchange_symbol(symbol, name))
+                self._record(name, time.perf_counter() - t0)
+            except Exception as e:
+                self._record(name, error=e)
+
+        threads = [threading.Thread(target=one, args=(name,), daemon=True) for name in self.sources]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def _record(self, name, seconds=None, error=None):
+        with self._lock:
+            self.stats[name].record(seconds, error)
+
+    def _route(self, request, timed=True, order=None):
+        """Runs request(name, exchange) -> (result, called) on each ranked exchange
+        until one succeeds. `called` is False when nothing reached the network
+        (e.g. a throttled sync); `timed` adds the call to the latency average."""
+        errors = []
+        for name in order or self.ranked():
+            t0 = time.perf_counter()
+            try:
+                result, called = request(name, self.exchange(name))
+            except Exception as e:
+                self._record(name, error=e)
+                errors.append(f"{name}: {e}")
+                continue
+            if called:
+                self._record(name, time.perf_counter() - t0 if timed else None)
+            return name, result
+        raise ConnectionError("; ".join(errors) or "no data sources configured")
+
+    # --- Candles ---
+    def store_symbol(self, symbol, timeframe=BASE_TIMEFRAME):
+        """Store key holding `symbol`'s candles (the pinned exchange's, else the
+        first source that has some), or None."""
+        pinned = self.pinned.get(canonical_symbol(symbol))
+        for name in [pinned] if pinned else self.sources:
+            candidate = store_key(symbol, name)
+            if len(load_candles(candidate, timeframe)):
+                return candidate
+        return None
+
+    def sync(self, symbol, base_timeframe=BASE_TIMEFRAME, since_ms=None):
+        """Brings the local store up to date from the best exchange.
+
+        Returns (source, store symbol); source is "local" when every exchange
+        failed but candles are stored, and (None, None) when there are none.
+        """
+        def request(name, exchange):
+            key = store_key(symbol, name)
+            return key, sync_recent(exchange, exchange_symbol(symbol, name), base_timeframe, since_ms,
+                                    strict=True, key=key)
+
+        pinned = self.pinned.get(canonical_symbol(symbol))
+        if pinned:
+            order = [pinned]
+        else:
+            # Switching exchanges means downloading the history again under another
+            # store key, so one that already has it keeps it unless it is far slower
+            ranked = self.ranked()
+            fastest = self.stats[ranked[0]].latency_ms
+            keep = [name for name in ranked
+                    if len(load_candles(store_key(symbol, name), base_timeframe))
+                    and (fastest is None or self.stats[name].latency_ms is None
+                         or self.stats[name].latency_ms <= SWITCH_FACTOR * max(fastest, 1.0))]
+            order = keep + [name for name in ranked if name not in keep]
+        try:
+            name, key = self._route(request, timed=False, order=order)
+            if self.pin:
+                self.pinned.setdefault(canonical_symbol(symbol), name)
+            return name, key
+        except ConnectionError as e:
+            stored = self.store_symbol(symbol, base_timeframe)
+            print(f"⚠️ No exchange answered for {symbol} ({e}); "
+                  f"{'using stored candles' if stored else 'no stored candles'}")
+            return ("local", stored) if stored else (None, None)
+
+    def history(self, symbol, timeframe, base_timeframe=BASE_TIMEFRAME, limit=None):
+        """Returns `timeframe` candles as a DataFrame, resampled from the stored base.
+
+        Only the base timeframe ever hits an exchange, so 4h/1d/1w on top of an
+        already synced 1h store cost no extra API calls. `frame.attrs` has
+        "source" (exchange, "local" or "synthetic") and "symbol" (the store key).
+        """
+        since_ms = None
+        if limit is not None:
+            since_ms = int(time.time() * 1000) - (limit + 1) * TIMEFRAME_MS[timeframe]
+        source, key = self.sync(symbol, base_timeframe, since_ms)
+        if key is not None:
+            arr = get_candles(key, timeframe, base_timeframe)
+        elif self.synthetic:
+            source, key = "synthetic", None
+            arr = synthetic_history(symbol, timeframe, limit or SYNTHETIC_CANDLES)
+        else:
+            raise ConnectionError(f"No data for {symbol}: every exchange failed and nothing is stored")
+        if limit is not None:
+            arr = arr[-limit:]
+        frame = to_frame(arr)
+        frame.attrs.update(source=source, symbol=key)
+        return frame
+
+    # --- Tickers ---
+    def fetch_tickers(self, symbols):
+        """{canonical symbol: ticker}; each ticker has a "source" field."""
+        def request(name, exchange):
+            wanted = {exchange_symbol(s, name): canonical_symbol(s) for s in symbols}
+            tickers = call_with_retry(exchange, "fetch_tickers", list(wanted), retries=1)
+            return {wanted[k]: {**t, "symbol": wanted[k]} for k, t in tickers.items() if k in wanted}, True
+
+        try:
+            name, tickers = self._route(request)
+            return {s: {**t, "source": name} for s, t in tickers.items()}
+        except ConnectionError as e:
+            print(f"⚠️ No exchange answered for tickers ({e}); using stored candles")
+        tickers = {}
+        for symbol in symbols:
+            ticker = self._stored_ticker(symbol)
+            if ticker is None and self.synthetic:
+                ticker = synthetic_ticker(symbol)
+            if ticker is not None:
+                tickers[canonical_symbol(symbol)] = ticker
+        return tickers
+
+    def _stored_ticker(self, symbol, timeframe="1h"):
+        # Last close vs. the close 24 candles earlier, from the local store
+        key = self.store_symbol(symbol, timeframe)
+        if key is None:
+            return None
+        day = load_candles(key, timeframe)[-25:]
+        last, prev = float(day["close"][-1]), float(day["close"][0])
+        return {"symbol": canonical_symbol(symbol), "timestamp": int(day["timestamp"][-1]), "last": last,
+                "close": last, "open": prev, "percentage": (last / prev - 1) * 100,
+                "quoteVolume": float((day["volume"][1:] * day["close"][1:]).sum()), "source": "local"}
+
+    # --- Order Books ---
+    def fetch_order_book(self, symbol, limit=100):
+        """L2 book from the best exchange, tagged with its "source". There is no
+        stored or synthetic fallback: raises ConnectionError when none answers
+        (orderbook.BookRecorder keeps the last good snapshots)."""
+        def request(name, exchange):
+            return call_with_retry(exchange, "fetch_order_book", exchange_symbol(symbol, name), limit, retries=1), True
+
+        name, book = self._route(request)
+        return {**book, "symbol": canonical_symbol(symbol), "source": name}
+
+    def report(self):
+        return [self.stats[name].as_dict() for name in self.sources]
+
+
+# -----------------------------
+# 5. Synthetic Last Resort
+# -----------------------------
+# The fake exchange's deterministic price paths: stable across reruns, unlike
+# random numbers, and plausibly priced for the majors.
+def synthetic_history(symbol, timeframe, count=SYNTHETIC_CANDLES):
+    from fake_exchange import synthetic_candles
+    ms = TIMEFRAME_MS[timeframe]
+    start = (int(time.time() * 1000) // ms - count + 1) * ms
+    return candles_to_array(synthetic_candles(SYNTHETIC_SEED, canonical_symbol(symbol), timeframe, start, count))
+
+
+def synthetic_ticker(symbol):
+    from fake_exchange import FakeExchange
+    ticker = FakeExchange(seed=SYNTHETIC_SEED).fetch_ticker(canonical_symbol(symbol))
+    return {**ticker, "source": "synthetic"}
+
+
+_sources = {}
+
+
+def get_data_source(sources=SOURCES, synthetic=True, pin=False, **options):
+    """Shared per process (like exchanges.get_exchange), so stats accumulate."""
+    key = (tuple(sources), synthetic, pin, tuple(sorted(options.items())))
+    if key not in _sources:
+        _sources[key] = DataSource(sources, synthetic, pin, **options)
+    return _sources[key]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fetch through the routed data source and show per-source stats")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--timeframe", default=BASE_TIMEFRAME)
+    parser.add_argument("--limit", type=int, default=200)
+    parser.add_argument("--sources", default=",".join(SOURCES))
+    parser.add_argument("--rounds", type=int, default=1)
+    args = parser.parse_args()
+
+    source = DataSource(args.sources.split(","), enableRateLimit=True)
+    for _ in range(args.rounds):
+        for symbol in args.symbols:
+            df = source.history(symbol, args.timeframe, limit=args.limit)
+            print(f"📈 {symbol}: {len(df)} candles from {df.attrs['source']} ({df.attrs['symbol']})")
+        tickers = source.fetch_tickers(args.symbols)
+        print("💱 " + " | ".join(f"{s} ${t['last']:,.2f} ({t['source']})" for s, t in tickers.items()))
+    print("\n📡 Sources")
+    for row in source.report():
+        latency = f"{row['latency_ms']:.0f} ms" if row["latency_ms"] is not None else "n/a"
+        print(f"  {row['source']:<10} calls {row['calls']:>4} | errors {row['errors']:>3} | latency {latency} | "
+              f"{'up' if row['available'] else 'cooling down'}" + (f" | {row['last_error']}" if row["last_error"] else ""))
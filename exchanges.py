@@ -0,0 +1,48 @@
+import importlib
+import os
+
+# -----------------------------
+# Shared, Lazily Created Exchanges
+# -----------------------------
+# Importing ccxt loads its whole exchange catalog, which is the slowest import
+# in the apps. It is deferred until the first request that needs an exchange,
+# and each configured exchange is created once per process instead of per render.
+#
+# COINIFY_EXCHANGE redirects every exchange to the offline fake (see
+# fake_exchange.py) for reproducible load tests:
+#   COINIFY_EXCHANGE=fake                    in-process fake, seeded
+#   COINIFY_EXCHANGE=http://127.0.0.1:8765   shared `python fake_exchange.py` server
+# The in-process fake takes the server's fault injection from the environment:
+# COINIFY_FAKE_LATENCY / _JITTER (seconds), _RATE_LIMIT (req/s), _ERROR_RATE.
+# Candles then go to data/fake unless COINIFY_DATA_DIR says otherwise.
+EXCHANGE_OVERRIDE = os.environ.get("COINIFY_EXCHANGE", "")
+FAKE_SEED = int(os.environ.get("COINIFY_FAKE_SEED", "42"))
+
+
+def _fake_setting(name, default=None):
+    value = os.environ.get(f"COINIFY_FAKE_{name}")
+    return float(value) if value else default
+
+_exchanges = {}
+
+
+def _create(name, options):
+    if EXCHANGE_OVERRIDE == "fake":
+        from fake_exchange import FakeExchange
+        return FakeExchange(seed=FAKE_SEED,
+                            latency=_fake_setting("LATENCY", 0.0),
+                            jitter=_fake_setting("JITTER", 0.0),
+                            rate_limit=_fake_setting("RATE_LIMIT"),
+                            error_rate=_fake_setting("ERROR_RATE", 0.0))
+    if EXCHANGE_OVERRIDE.startswith("http"):
+        from fake_exchange import FakeExchangeClient
+        return FakeExchangeClient(EXCHANGE_OVERRIDE)
+    ccxt = importlib.import_module("ccxt")
+    return getattr(ccxt, name)(options)
+
+
+def get_exchange(name, **options):
+    key = (name, tuple(sorted(options.items())))
+    if key not in _exchanges:
+        _exchanges[key] = _create(name, options)
+    return _exchanges[key]
@@ -0,0 +1,303 @@
+import asyncio
+import hashlib
+import threading
+import time
+from rate_limit import RETRYABLE_ERRORS, call_with_retry, is_error
+
+ORDER_RETRIES = 3  # resubmissions of an order the exchange has no record of
+
+# -----------------------------
+# 1. Idempotent Client Order IDs
+# -----------------------------
+def client_order_id(symbol, side, signal_ts):
+    """Same signal on the same candle -> same ID, so a retried or replayed
+    signal can never place a second order."""
+    raw = f"{symbol}|{side}|{int(signal_ts)}".encode()
+    return "cf-" + hashlib.sha1(raw).hexdigest()[:24]
+
+
+class OrderNotFound(Exception):
+    """PaperBroker's stand-in for ccxt's error of the same name (matched by name)."""
+
+
+# -----------------------------
+# 2. Paper Fills (mode="simulation")
+# -----------------------------
+class PaperBroker:
+    """ccxt-style create_order that fills market orders locally.
+
+    Prices come from `price_source.fetch_ticker` (a real or fake exchange)
+    unless the caller passes one; fills pay `slippage_bps` against the taker
+    and `fee_rate` of notional. Duplicate client order IDs return the
+    original order, mirroring how exchanges reject duplicates.
+    """
+
+    def __init__(self, price_source, balance=1000.0, fee_rate=0.001, slippage_bps=5, quote="USDT"):
+        self.price_source = price_source
+        self.fee_rate = fee_rate
+        self.slippage_bps = slippage_bps
+        self.quote = quote
+        self.balances = {quote: float(balance)}
+        self.orders = {}
+        self._lock = threading.Lock()
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        cid = (params or {}).get("clientOrderId")
+        with self._lock:
+            if cid and cid in self.orders:
+                return self.orders[cid]
+
+        if price is None:
+            price = self.price_source.fetch_ticker(symbol)["last"]
+        slip = self.slippage_bps / 10_000
+        fill = price * (1 + slip) if side == "buy" else price * (1 - slip)
+        base, quote = symbol.split("/")
+        cost = amount * fill
+        fee = cost * self.fee_rate
+
+        with self._lock:
+            if side == "buy":
+                if cost + fee > self.balances.get(quote, 0.0):
+                    raise ValueError(f"Insufficient {quote} for {amount} {base}")
+                self.balances[quote] = self.balances.get(quote, 0.0) - cost - fee
+                self.balances[base] = self.balances.get(base, 0.0) + amount
+            else:
+                amount = min(amount, self.balances.get(base, 0.0))
+                cost = amount * fill
+                fee = cost * self.fee_rate
+                self.balances[base] = self.balances.get(base, 0.0) - amount
+                self.balances[quote] = self.balances.get(quote, 0.0) + cost - fee
+
+            order = {
+                "id": f"paper-{len(self.orders) + 1}",
+                "clientOrderId": cid,
+                "timestamp": int(time.time() * 1000),
+                "symbol": symbol,
+                "type": type,
+                "side": side,
+                "amount": amount,
+                "filled": amount,
+                "average": fill,
+                "cost": cost,
+                "fee": {"cost": fee, "currency": quote},
+                "status": "closed",
+            }
+            self.orders[cid or order["id"]] = order
+        return order
+
+    def fetch_order(self, id, symbol=None, params=None):
+        cid = (params or {}).get("clientOrderId", id)
+        with self._lock:
+            order = self.orders.get(cid)
+        if order is None:
+            raise OrderNotFound(f"No paper order {cid}")
+        return order
+
+    def fetch_balance(self):
+        with self._lock:
+            return {"free": dict(self.balances), "total": dict(self.balances)}
+
+    def restore_balances(self, balances):
+        with self._lock:
+            self.balances = {k: float(v) for k, v in balances.items()}
+
+
+# -----------------------------
+# 3. Position / Order State
+# -----------------------------
+class PositionBook:
+    """In-memory view of what the bot holds and which orders it has sent."""
+
+    def __init__(self):
+        self.positions = {}  # symbol -> {"amount", "entry_price"}
+        self.orders = {}     # client order id -> order
+
+    def is_long(self, symbol):
+        return self.positions.get(symbol, {}).get("amount", 0) > 0
+
+    def apply_fill(self, order):
+        self.orders[order["clientOrderId"]] = order
+        pos = self.positions.setdefault(order["symbol"], {"amount": 0.0, "entry_price": 0.0})
+        if order["side"] == "buy":
+            total = pos["amount"] + order["filled"]
+            pos["entry_price"] = (pos["amount"] * pos["entry_price"] + order["filled"] * order["average"]) / total
+            pos["amount"] = total
+        else:
+            pos["amount"] = max(0.0, pos["amount"] - order["filled"])
+            if pos["amount"] == 0:
+                pos["entry_price"] = 0.0
+
+
+# -----------------------------
+# 4. Async Order Pipeline
+# -----------------------------
+class ExecutionEngine:
+    """Turns signals into orders on a background asyncio loop.
+
+    `submit` is thread-safe and returns immediately, so signal evaluation never
+    waits on the exchange. Orders go out one at a time per engine (keeps the
+    position book consistent), exchange calls run in a worker thread, and the
+    signal-to-ack latency of every order is recorded. `book`, `_sent` and
+    `_in_flight` are shared by both threads and only touched under `_lock`.
+    """
+
+    def __init__(self, broker, trade_amount=100.0, queue_size=1000):
+        self.broker = broker
+        self.trade_amount = trade_amount
+        self.book = PositionBook()
+        self.latencies = []
+        self.errors = []
+        self._sent = set()       # client order IDs already queued
+        self._in_flight = set()  # symbols with an order not yet acknowledged
+        self._lock = threading.Lock()
+        self._queue_size = queue_size
+        self._loop = asyncio.new_event_loop()
+        self._queue = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    # --- lifecycle ---
+    def start(self):
+        self._thread.start()
+        self._ready.wait()
+        return self
+
+    def stop(self, timeout=10):
+        """Drains queued orders, then stops the loop."""
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        self._loop.close()
+
+    async def _shutdown(self):
+        await self._queue.join()
+        self._worker_task.cancel()
+        try:
+            await self._worker_task
+        except asyncio.CancelledError:
+            pass
+
+    def _run(self):
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue(self._queue_size)
+        self._worker_task = self._loop.create_task(self._worker())
+        self._ready.set()
+        self._loop.run_forever()
+
+    # --- producer side ---
+    def submit(self, symbol, signal, price, signal_ts):
+        """Queues a "buy"/"sell" signal. Returns the client order ID, or None if
+        the signal needs no order (already long / nothing to sell)."""
+        if signal not in ("buy", "sell"):
+            return None
+        cid = client_order_id(symbol, signal, signal_ts)
+        with self._lock:
+            if self.book.is_long(symbol) == (signal == "buy"):
+                return None
+            if cid in self._sent or symbol in self._in_flight:
+                return None
+            self._sent.add(cid)
+            self._in_flight.add(symbol)
+        event = {"symbol": symbol, "side": signal, "price": price, "cid": cid, "t0": time.perf_counter()}
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, event)
+        return cid
+
+    # --- consumer side ---
+    async def _worker(self):
+        while True:
+            event = await self._queue.get()
+            try:
+                await self._execute(event)
+            except Exception as e:
+                self.errors.append((event["cid"], repr(e)))
+                print(f"❌ Order {event['cid']} failed: {e}")
+            finally:
+                with self._lock:
+                    self._in_flight.discard(event["symbol"])
+                self._queue.task_done()
+
+    async def _execute(self, event):
+        symbol, side = event["symbol"], event["side"]
+        if side == "buy":
+            amount = self.trade_amount / event["price"]
+        else:
+            with self._lock:
+                amount = self.book.positions[symbol]["amount"]
+
+        order = await asyncio.to_thread(self._place_order, symbol, side, amount, event["cid"])
+        latency_ms = (time.perf_counter() - event["t0"]) * 1000
+        self.latencies.append(latency_ms)
+        with self._lock:
+            self.book.apply_fill(order)
+        print(f"📨 {side.upper()} {order['filled']:.6f} {symbol} @ {order['average']:.2f} "
+              f"({latency_ms:.1f} ms signal-to-fill)")
+
+    def _place_order(self, symbol, side, amount, cid):
+        """create_order that never opens a second order for one signal.
+
+        A repeated clientOrderId is only rejected while the first order is
+        still open, and a filled market order isn't, so a request that timed
+        out after the exchange accepted it must not simply be resent. Each
+        unconfirmed attempt is looked up by its ID first and only resubmitted
+        if the exchange has no record of it.
+        """
+        params = {"clientOrderId": cid}
+        for attempt in range(ORDER_RETRIES + 1):
+            try:
+                return call_with_retry(self.broker, "create_order", symbol, "market", side, amount,
+                                       None, params, retries=0)
+            except Exception as e:
+                if not is_error(e, RETRYABLE_ERRORS) or attempt == ORDER_RETRIES:
+                    raise
+                print(f"⚠️ Order {cid} unconfirmed ({type(e).__name__}); checking before resubmitting")
+            time.sleep(min(30, 0.5 * 2 ** attempt))
+            order = self._find_order(symbol, cid)
+            if order is not None:
+                return order
+
+    def _find_order(self, symbol, cid):
+        """The order sent under `cid`, or None if the exchange has none. Lookups
+        are reads, so they retry freely; if the answer stays unknown the error
+        is raised rather than risking a duplicate."""
+        try:
+            return call_with_retry(self.broker, "fetch_order", cid, symbol, {"clientOrderId": cid})
+        except Exception as e:
+            if is_error(e, {"OrderNotFound"}):
+                return None
+            raise
+
+    # --- persistence (see bot_state.py) ---
+    def to_state(self):
+        with self._lock:
+            state = {"positions": {k: dict(v) for k, v in self.book.positions.items()},
+                     "sent": sorted(self._sent)}
+        # Paper fills live only in this process; a real account keeps its own
+        if isinstance(self.broker, PaperBroker):
+            state["balances"] = self.broker.fetch_balance()["total"]
+        return state
+
+    def restore(self, state):
+        with self._lock:
+            self.book.positions = {k: dict(v) for k, v in state.get("positions", {}).items()}
+            self._sent = set(state.get("sent", []))
+            positions = {k: dict(v) for k, v in self.book.positions.items()}
+        if isinstance(self.broker, PaperBroker):
+            balances = state.get("balances")
+            if balances is None:
+                # Snapshot from before balances were saved: the base holdings
+                # are what the book says; the quote balance is kept as is
+                balances = self.broker.fetch_balance()["total"]
+                for symbol, pos in positions.items():
+                    balances[symbol.split("/")[0]] = pos["amount"]
+            self.broker.restore_balances(balances)
+
+    def latency_report(self):
+        if not self.latencies:
+            return {"orders": 0}
+        lat = sorted(self.latencies)
+        return {
+            "orders": len(lat),
+            "p50_ms": lat[len(lat) // 2],
+            "p95_ms": lat[min(len(lat) - 1, int(len(lat) * 0.95))],
+            "max_ms": lat[-1],
+        }
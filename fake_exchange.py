@@ -0,0 +1,399 @@
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+from resample import TIMEFRAME_MS
+
+# -----------------------------
+# 1. Errors (ccxt's own classes when ccxt is installed)
+# -----------------------------
+try:
+    from ccxt.base.errors import BadSymbol, NetworkError, OrderNotFound, RateLimitExceeded
+except ImportError:
+    class NetworkError(Exception):
+        pass
+
+    class RateLimitExceeded(NetworkError):
+        pass
+
+    class BadSymbol(Exception):
+        pass
+
+    class OrderNotFound(Exception):
+        pass
+
+ERRORS = {cls.__name__: cls for cls in (BadSymbol, NetworkError, OrderNotFound, RateLimitExceeded)}
+
+# A few majors at realistic prices, padded with synthetic pairs for screener-sized tests
+BASE_PRICES = {
+    "BTC": 67000, "ETH": 2500, "SOL": 140, "BNB": 600, "XRP": 0.60,
+    "DOGE": 0.15, "ADA": 0.45, "AVAX": 35, "DOT": 6.5, "MATIC": 0.55,
+}
+TRADES_PER_MINUTE = 30
+DEFAULT_SYMBOLS = (
+    [f"{base}/USDT" for base in BASE_PRICES]
+    + [f"{base}/USD" for base in BASE_PRICES]
+    + [f"SYN{i:03d}/USDT" for i in range(190)]
+)
+
+
+# -----------------------------
+# 2. Deterministic Price Paths
+# -----------------------------
+# Prices are a pure function of (seed, symbol, time), so any page of any
+# timeframe can be generated without state and every run sees the same data.
+def _mix(x):
+    """splitmix64 finalizer over uint64 arrays -> floats in [0, 1)."""
+    with np.errstate(over="ignore"):
+        x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        x = x ^ (x >> np.uint64(31))
+    return (x >> np.uint64(11)).astype(np.float64) / float(1 << 53)
+
+
+def _symbol_seed(seed, symbol):
+    h = seed & 0xFFFFFFFF
+    for ch in symbol.split("/")[0]:
+        h = (h * 1_000_003 + ord(ch)) & 0xFFFFFFFF
+    return h
+
+
+def _base_price(symbol, sym_seed):
+    base = symbol.split("/")[0]
+    if base in BASE_PRICES:
+        return BASE_PRICES[base]
+    return 10 ** (sym_seed % 500 / 100 - 2)  # 0.01 .. 1000
+
+
+def price_at(seed, symbol, ts_ms):
+    """Synthetic mid price at the given millisecond timestamps."""
+    sym_seed = _symbol_seed(seed, symbol)
+    t = np.asarray(ts_ms, dtype=np.float64) / 3_600_000  # hours
+    phase = sym_seed % 1000
+    # Slow trend + weekly/daily cycles + per-minute noise
+    log_move = (0.25 * np.sin((t + phase) / 2000)
+                + 0.05 * np.sin((t + phase) / 27)
+                + 0.01 * np.sin((t + phase) / 3.8))
+    minute = np.asarray(ts_ms, dtype=np.int64) // 60_000
+    salt = np.uint64((sym_seed * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF)
+    noise = _mix(minute.astype(np.uint64) + salt) - 0.5
+    return _base_price(symbol, sym_seed) * np.exp(log_move + 0.004 * noise)
+
+
+def synthetic_candles(seed, symbol, timeframe, start_ms, count):
+    """`count` candles of `timeframe` starting at the bucket containing start_ms."""
+    ms = TIMEFRAME_MS[timeframe]
+    opens = (start_ms // ms) * ms + np.arange(count, dtype=np.int64) * ms
+    o = price_at(seed, symbol, opens)
+    c = price_at(seed, symbol, opens + ms - 60_000)
+    sym_seed = np.uint64(_symbol_seed(seed, symbol))
+    wick = _mix(opens.astype(np.uint64) ^ sym_seed)
+    h = np.maximum(o, c) * (1 + 0.01 * wick)
+    l = np.minimum(o, c) * (1 - 0.01 * _mix(opens.astype(np.uint64) + sym_seed))
+    v = 1e3 * (1 + 9 * _mix(opens.astype(np.uint64) * np.uint64(3) + sym_seed)) * (ms / 3_600_000)
+    rows = np.column_stack([opens, o, h, l, c, v]).tolist()
+    for row in rows:
+        row[0] = int(row[0])
+    return rows
+
+
+# -----------------------------
+# 3. The Fake Exchange (ccxt-compatible subset)
+# -----------------------------
+class FakeExchange:
+    """Offline stand-in for a ccxt exchange.
+
+    `latency` (seconds, +/- `jitter`) is slept on every call, more than
+    `rate_limit` calls per second raise RateLimitExceeded, and `error_rate`
+    of calls raise NetworkError. All randomness is seeded.
+    """
+
+    id = "fake"
+
+    def __init__(self, seed=42, latency=0.0, jitter=0.0, rate_limit=None,
+                 error_rate=0.0, symbols=DEFAULT_SYMBOLS, paper_balance=10_000.0):
+        self.seed = seed
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.error_rate = error_rate
+        self.symbols = list(symbols)
+        self.markets = None
+        self.calls = 0
+        self.paper_balance = paper_balance
+        self._broker = None
+        self.last_response_headers = {}
+        self._rng = random.Random(seed)
+        self._window = []
+        self._lock = threading.Lock()
+
+    # --- ccxt helpers the apps rely on ---
+    def parse8601(self, text):
+        return int(datetime.fromisoformat(text.replace("Z", "+00:00")).timestamp() * 1000)
+
+    def milliseconds(self):
+        return int(time.time() * 1000)
+
+    def _call(self, name):
+        with self._lock:
+            self.calls += 1
+            now = time.monotonic()
+            if self.rate_limit:
+                self._window = [t for t in self._window if now - t < 1.0]
+                if len(self._window) >= self.rate_limit:
+                    # Like a real 429: say when the window frees up
+                    retry_after = f"{1.0 - (now - self._window[0]):.3f}"
+                    self.last_response_headers = {"Retry-After": retry_after}
+                    error = RateLimitExceeded(f"fake {name}: more than {self.rate_limit} requests/s")
+                    error.retry_after = retry_after
+                    raise error
+                self._window.append(now)
+            self.last_response_headers = {}
+            fail = self._rng.random() < self.error_rate
+            delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        if delay:
+            time.sleep(delay)
+        if fail:
+            raise NetworkError(f"fake {name}: injected failure")
+
+    def _check_symbol(self, symbol):
+        if "/" not in symbol:
+            raise BadSymbol(f"fake does not have market symbol {symbol}")
+
+    # --- Market data ---
+    def load_markets(self, reload=False):
+        if self.markets is None or reload:
+            self._call("load_markets")
+            self.markets = {
+                s: {"symbol": s, "base": s.split("/")[0], "quote": s.split("/")[1], "active": True, "spot": True}
+                for s in self.symbols
+            }
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        self._call("fetch_ohlcv")
+        self._check_symbol(symbol)
+        ms = TIMEFRAME_MS[timeframe]
+        limit = limit or 500
+        now = self.milliseconds()
+        last_open = now // ms * ms
+        if since is None:
+            since = last_open - (limit - 1) * ms
+        first_open = -(-since // ms) * ms  # first candle opening at or after `since`
+        count = min(limit, (last_open - first_open) // ms + 1)
+        if count <= 0:
+            return []
+        return synthetic_candles(self.seed, symbol, timeframe, first_open, int(count))
+
+    def fetch_trades(self, symbol, since=None, limit=None, params=None):
+        """Synthetic prints, TRADES_PER_MINUTE of them evenly spaced each minute."""
+        self._call("fetch_trades")
+        self._check_symbol(symbol)
+        limit = limit or 1000
+        step = 60_000 // TRADES_PER_MINUTE
+        now = self.milliseconds() // step * step
+        if since is None:
+            since = now - (limit - 1) * step
+        first = -(-since // step) * step
+        count = min(limit, (now - first) // step + 1)
+        if count <= 0:
+            return []
+        ts = first + np.arange(count, dtype=np.int64) * step
+        salt = np.uint64(_symbol_seed(self.seed, symbol))
+        price = price_at(self.seed, symbol, ts) * (1 + 0.0005 * (_mix(ts.astype(np.uint64) ^ salt) - 0.5))
+        amount = 0.01 + _mix(ts.astype(np.uint64) + salt) ** 3
+        return [
+            {"id": str(t), "symbol": symbol, "timestamp": t, "price": p, "amount": a,
+             "side": "buy" if a > 0.1 else "sell"}
+            for t, p, a in zip(ts.tolist(), price.tolist(), amount.tolist())
+        ]
+
+    def fetch_ticker(self, symbol, params=None):
+        return self.fetch_tickers([symbol])[symbol]
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        """L2 book around the synthetic price: levels 5 bps apart, size growing
+        away from the touch, reshuffled every second."""
+        self._call("fetch_order_book")
+        self._check_symbol(symbol)
+        limit = limit or 100
+        now = self.milliseconds()
+        sym_seed = np.uint64(_symbol_seed(self.seed, symbol))
+        mid = float(price_at(self.seed, symbol, now))
+        half_spread = 0.00005 + 0.0002 * float(_mix(np.asarray([sym_seed]))[0])
+        k = np.arange(limit, dtype=np.float64)
+        salt = np.uint64(now // 1000) ^ sym_seed
+        sides = {}
+        for name, sign, offset in (("bids", -1, 1), ("asks", 1, 2)):
+            price = mid * (1 + sign * (half_spread + 0.0005 * k))
+            notional = 5_000 * (1 + 0.1 * k) * (0.5 + _mix(np.arange(limit, dtype=np.uint64) * np.uint64(offset) + salt))
+            sides[name] = np.column_stack([price, notional / price]).tolist()
+        return {"symbol": symbol, "timestamp": now, "nonce": None, **sides}
+
+    # --- Trading (paper fills at the synthetic price) ---
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self._call("create_order")
+        self._check_symbol(symbol)
+        if self._broker is None:
+            from execution import PaperBroker
+            self._broker = PaperBroker(self, balance=self.paper_balance)
+        return self._broker.create_order(symbol, type, side, amount, price, params)
+
+    def fetch_order(self, id, symbol=None, params=None):
+        self._call("fetch_order")
+        if self._broker is None:
+            raise OrderNotFound(f"fake: no order {id}")
+        return self._broker.fetch_order(id, symbol, params)
+
+    def fetch_balance(self, params=None):
+        self._call("fetch_balance")
+        return self._broker.fetch_balance() if self._broker else {"free": {}, "total": {}}
+
+    def fetch_tickers(self, symbols=None, params=None):
+        self._call("fetch_tickers")
+        symbols = symbols or self.symbols
+        now = self.milliseconds()
+        tickers = {}
+        for symbol in symbols:
+            self._check_symbol(symbol)
+            last, prev = price_at(self.seed, symbol, [now, now - 86_400_000])
+            day = synthetic_candles(self.seed, symbol, "1h", now - 86_400_000, 24)
+            base_volume = sum(c[5] for c in day)
+            tickers[symbol] = {
+                "symbol": symbol,
+                "timestamp": now,
+                "last": float(last),
+                "close": float(last),
+                "open": float(prev),
+                "high": max(c[2] for c in day),
+                "low": min(c[3] for c in day),
+                "percentage": float((last / prev - 1) * 100),
+                "baseVolume": base_volume,
+                "quoteVolume": base_volume * float(last),
+            }
+        return tickers
+
+
+# -----------------------------
+# 4. HTTP Server + Client (shared limits across processes)
+# -----------------------------
+def serve(host="127.0.0.1", port=8765, **options):
+    """Serves one FakeExchange over HTTP so several processes hit the same
+    latency, rate limit and error budget."""
+    fake = FakeExchange(**options)
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            url = urllib.parse.urlparse(self.path)
+            q = {k: v[0] for k, v in urllib.parse.parse_qs(url.query).items()}
+            try:
+                if url.path == "/ohlcv":
+                    body = fake.fetch_ohlcv(
+                        q["symbol"], q.get("timeframe", "1m"),
+                        since=int(q["since"]) if "since" in q else None,
+                        limit=int(q["limit"]) if "limit" in q else None,
+                    )
+                elif url.path == "/tickers":
+                    body = fake.fetch_tickers(q["symbols"].split(",") if q.get("symbols") else None)
+                elif url.path == "/trades":
+                    body = fake.fetch_trades(
+                        q["symbol"],
+                        since=int(q["since"]) if "since" in q else None,
+                        limit=int(q["limit"]) if "limit" in q else None,
+                    )
+                elif url.path == "/orderbook":
+                    body = fake.fetch_order_book(q["symbol"], int(q["limit"]) if "limit" in q else None)
+                elif url.path == "/markets":
+                    body = fake.load_markets()
+                else:
+                    self.send_error(404)
+                    return
+                status, retry_after = 200, None
+            except Exception as e:
+                body, status = {"error": type(e).__name__, "message": str(e)}, 429 if isinstance(e, RateLimitExceeded) else 503
+                retry_after = getattr(e, "retry_after", None)
+            payload = json.dumps(body).encode()
+            self.send_response(status)
+            if retry_after:
+                self.send_header("Retry-After", retry_after)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"🧪 Fake exchange on http://{host}:{server.server_port} (seed={fake.seed})")
+    return server
+
+
+class FakeExchangeClient(FakeExchange):
+    """Talks to `serve()` over HTTP; same methods as FakeExchange."""
+
+    id = "fake-http"
+
+    def __init__(self, url, timeout=10):
+        super().__init__()
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+
+    def _get(self, path, **query):
+        query = {k: v for k, v in query.items() if v is not None}
+        url = f"{self.url}{path}?{urllib.parse.urlencode(query)}"
+        self.calls += 1
+        try:
+            with urllib.request.urlopen(url, timeout=self.timeout) as resp:
+                self.last_response_headers = dict(resp.headers)
+                return json.loads(resp.read())
+        except urllib.error.HTTPError as e:
+            self.last_response_headers = dict(e.headers)
+            err = json.loads(e.read() or b"{}")
+            raise ERRORS.get(err.get("error"), NetworkError)(err.get("message", str(e)))
+        except OSError as e:
+            raise NetworkError(str(e))
+
+    def load_markets(self, reload=False):
+        if self.markets is None or reload:
+            self.markets = self._get("/markets")
+            self.symbols = list(self.markets)
+        return self.markets
+
+    def fetch_ohlcv(self, symbol, timeframe="1m", since=None, limit=None, params=None):
+        return self._get("/ohlcv", symbol=symbol, timeframe=timeframe, since=since, limit=limit)
+
+    def fetch_trades(self, symbol, since=None, limit=None, params=None):
+        return self._get("/trades", symbol=symbol, since=since, limit=limit)
+
+    def fetch_tickers(self, symbols=None, params=None):
+        return self._get("/tickers", symbols=",".join(symbols) if symbols else None)
+
+    def fetch_order_book(self, symbol, limit=None, params=None):
+        return self._get("/orderbook", symbol=symbol, limit=limit)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline fake exchange for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=None, help="requests per second")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = serve(args.host, args.port, seed=args.seed, latency=args.latency, jitter=args.jitter,
+                   rate_limit=args.rate_limit, error_rate=args.error_rate)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 Fake exchange stopped.")
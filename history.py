@@ -0,0 +1,147 @@
+import time
+import numpy as np
+from ohlcv_store import BASE_TIMEFRAME, append_candles, candles_to_array, load_candles, load_meta, save_meta
+from rate_limit import call_with_retry
+from resample import TIMEFRAME_MS
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+HISTORY_START = "2017-01-01T00:00:00Z"
+PAGE_LIMIT = 1000
+CHECKPOINT_PAGES = 10   # minimum pages held in memory before being written to the store
+MIN_SYNC_INTERVAL = 60  # seconds; timeframes requested within this window reuse the last sync
+
+_last_sync = {}
+
+
+# -----------------------------
+# 2. Download the Base Timeframe
+# -----------------------------
+class _Checkpointer:
+    """Buffers downloaded chunks and writes them to the store in batches.
+
+    Every write rewrites the whole .npy, so a batch must be at least as big as
+    what is already stored: the buffer doubles the store each time, and a long
+    1m backfill costs a few times its final size in I/O instead of growing
+    quadratically. At least CHECKPOINT_PAGES pages go in each write.
+    """
+
+    def __init__(self, symbol, timeframe, stored=0):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.stored = stored
+        self.pending = []
+        self.pending_rows = 0
+
+    def add(self, chunk):
+        self.pending.append(chunk)
+        self.pending_rows += len(chunk)
+        if self.pending_rows >= max(CHECKPOINT_PAGES * PAGE_LIMIT, self.stored):
+            self.flush()
+
+    def flush(self):
+        if self.pending:
+            # Chunks arrive newest-first during a backfill
+            chunk = np.concatenate(self.pending)
+            merged = append_candles(self.symbol, self.timeframe, chunk[np.argsort(chunk["timestamp"], kind="stable")])
+            self.stored = len(merged)
+            self.pending = []
+            self.pending_rows = 0
+
+
+def _fetch_page(exchange, symbol, timeframe, since=None):
+    candles = call_with_retry(exchange, "fetch_ohlcv", symbol, timeframe, since=since, limit=PAGE_LIMIT)
+    return candles_to_array(candles)
+
+
+def iter_history(exchange, symbol, timeframe=BASE_TIMEFRAME, since_ms=None, key=None):
+    """Downloads missing candles page by page, yielding each page as a typed chunk.
+
+    `symbol` is what the exchange is asked for; the candles are stored under
+    `key` (default: the symbol itself, see ohlcv_store.venue_key).
+
+    Newest data comes first: a catch-up from the last stored candle (which is
+    usually still forming, so it gets refreshed), or the latest page when the
+    store is empty. Older pages are then backfilled newest-to-oldest down to
+    `since_ms` (default HISTORY_START), so a chart can show recent candles as
+    soon as the first page lands. Chunks are checkpointed into the store in
+    growing batches; a sync that dies mid-backfill resumes from its last
+    checkpoint next time.
+    """
+    key = key or symbol
+    ms = TIMEFRAME_MS[timeframe]
+    stop_ms = since_ms if since_ms is not None else exchange.parse8601(HISTORY_START)
+    stored = load_candles(key, timeframe)
+    meta = load_meta(key, timeframe)
+    writer = _Checkpointer(key, timeframe, len(stored))
+
+    try:
+        # 1. Newest candles
+        if len(stored):
+            oldest = int(stored["timestamp"][0])
+            since = int(stored["timestamp"][-1])
+            while True:
+                chunk = _fetch_page(exchange, symbol, timeframe, since=since)
+                if not len(chunk):
+                    break
+                writer.add(chunk)
+                yield chunk
+                since = int(chunk["timestamp"][-1]) + 1
+                if len(chunk) < PAGE_LIMIT:
+                    break
+        else:
+            chunk = _fetch_page(exchange, symbol, timeframe)
+            if not len(chunk):
+                return
+            oldest = int(chunk["timestamp"][0])
+            writer.add(chunk)
+            yield chunk
+
+        # 2. Backfill older pages until `stop_ms` or the start of the exchange's history
+        while oldest - ms >= stop_ms and meta.get("history_start") != oldest:
+            chunk = _fetch_page(exchange, symbol, timeframe, since=max(stop_ms, oldest - PAGE_LIMIT * ms))
+            chunk = chunk[(chunk["timestamp"] < oldest) & (chunk["timestamp"] >= stop_ms)]
+            if not len(chunk):
+                # Nothing older exists (or the exchange ignores `since`); don't ask again
+                meta["history_start"] = oldest
+                save_meta(key, timeframe, meta)
+                break
+            writer.add(chunk)
+            yield chunk
+            oldest = int(chunk["timestamp"][0])
+    finally:
+        writer.flush()
+
+
+def sync_history(exchange, symbol, timeframe=BASE_TIMEFRAME, since_ms=None, key=None):
+    """Runs iter_history to completion and returns the stored candles."""
+    for _ in iter_history(exchange, symbol, timeframe, since_ms, key):
+        pass
+    return load_candles(key or symbol, timeframe)
+
+
+# -----------------------------
+# 3. Throttled Sync
+# -----------------------------
+def sync_recent(exchange, symbol, base_timeframe=BASE_TIMEFRAME, since_ms=None, strict=False, key=None):
+    """sync_history at most once per MIN_SYNC_INTERVAL per (store key, base timeframe).
+
+    Returns True if the exchange was actually called. On failure the stored
+    candles are kept and a warning printed; the error is only raised when
+    there is no local history at all, or always with `strict` (callers that
+    fail over to another exchange themselves, see data_source.py).
+    """
+    key = key or symbol
+    if time.time() - _last_sync.get((key, base_timeframe), 0) <= MIN_SYNC_INTERVAL:
+        return False
+    try:
+        sync_history(exchange, symbol, base_timeframe, since_ms=since_ms, key=key)
+        _last_sync[(key, base_timeframe)] = time.time()
+    except Exception as e:
+        # Serve what is already stored rather than nothing
+        if strict or not len(load_candles(key, base_timeframe)):
+            raise
+        print(f"⚠️ Sync failed for {symbol} ({e}); using stored candles")
+    return True
+
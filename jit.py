@@ -0,0 +1,29 @@
+# -----------------------------
+# Optional Numba Backend
+# -----------------------------
+# Kernels are written as plain loops over arrays. With numba installed they are
+# compiled; without it they run as ordinary Python, and callers feed them lists
+# (see `as_kernel_input`) because indexing a list is much cheaper than indexing
+# a numpy array element by element.
+import numpy as np
+
+try:
+    from numba import njit as _numba_njit
+    HAVE_NUMBA = True
+except ImportError:
+    _numba_njit = None
+    HAVE_NUMBA = False
+
+
+def njit(func=None, **options):
+    """`numba.njit` when available, otherwise a no-op decorator."""
+    if func is None:
+        return lambda f: njit(f, **options)
+    if HAVE_NUMBA:
+        return _numba_njit(cache=True, **options)(func)
+    return func
+
+
+def as_kernel_input(arr, dtype=np.float64):
+    arr = np.ascontiguousarray(arr, dtype=dtype)
+    return arr if HAVE_NUMBA else arr.tolist()
@@ -1,7 +1,12 @@
-import ccxt
+from exchanges import get_exchange
 import pandas as pd
+import os
 import time
 import datetime
+from bot_state import BotState, RollingBands
+from data_source import get_data_source
+from execution import ExecutionEngine, PaperBroker
+from signal_bus import DashboardSink, SignalBus, UnixSocketServer, log_sink, signal_event, webhook_sink
 
 # -----------------------------
 # 1. Configuration
@@ -12,80 +17,129 @@ config = {
     "limit": 100,
     "bb_period": 20,
     "bb_std_dev": 2.0,
+    "exit_band": "middle",  # bb_reversion exit: "middle" (the mean) or "upper" band
     "check_interval": 3600, # Check every 3600 seconds (1 hour)
     "mode": "simulation",   # "simulation" = fake money, "live" = real money
+    "trade_amount": 100,    # quote currency (USDT) spent per buy
+    "paper_balance": 1000,  # starting USDT for simulation mode
+    "fee_rate": 0.001,
+    "state_path": "data/live_bot_state.db",  # snapshot for warm restarts
+    "signal_log": "data/signals.jsonl",
+    "webhook_url": os.environ.get("COINIFY_WEBHOOK_URL"),  # optional POST per signal
+    "signal_socket": None,  # e.g. "/tmp/coinify-signals.sock" to stream to other processes
 }
 
 # -----------------------------
 # 2. Connect to Exchange (Binance)
 # -----------------------------
 # NOTE: For "simulation", we don't need real API keys yet.
-exchange = ccxt.binance() 
+EXECUTION_VENUE = 'binance'
+exchange = get_exchange(EXECUTION_VENUE)
+# Candles come from the venue the orders go to, so the bands are computed on
+# the prices being traded (and never switch quote currency mid-run)
+data_source = get_data_source((EXECUTION_VENUE,), synthetic=False)
+
+def make_broker():
+    """Where orders go: local paper fills in simulation, the real account in live mode."""
+    if config['mode'] == 'live':
+        return get_exchange(EXECUTION_VENUE, apiKey=os.environ['BINANCE_API_KEY'],
+                            secret=os.environ['BINANCE_SECRET'])
+    return PaperBroker(exchange, balance=config['paper_balance'], fee_rate=config['fee_rate'])
 
 def fetch_data(symbol, limit):
     try:
-        bars = exchange.fetch_ohlcv(symbol, timeframe=config['timeframe'], limit=limit)
-        df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        return df
+        # Only candles newer than the local store are downloaded on each check
+        # (stored candles if the venue is down; never synthetic)
+        return data_source.history(symbol, config['timeframe'], limit=limit)
     except Exception as e:
         print(f"❌ Error fetching data: {e}")
         return pd.DataFrame()
 
-def get_signal(df):
-    # Calculate Bollinger Bands
-    df['middle_band'] = df['close'].rolling(window=config['bb_period']).mean()
-    std_dev = df['close'].rolling(window=config['bb_period']).std()
-    df['upper_band'] = df['middle_band'] + (std_dev * config['bb_std_dev'])
-    df['lower_band'] = df['middle_band'] - (std_dev * config['bb_std_dev'])
-    
-    last_row = df.iloc[-1]
-    price = last_row['close']
-    
-    # Logic: "Rubber Band" Strategy
-    if price < last_row['lower_band']:
-        return "buy", price, last_row['lower_band']
-    elif price > last_row['middle_band']:
-        return "sell", price, last_row['middle_band']
-    else:
-        return "hold", price, last_row['middle_band']
-
 # -----------------------------
 # 3. The "Forever" Loop
 # -----------------------------
+def make_bus():
+    """Signal fan-out: local log, dashboards, and optionally a webhook / Unix socket."""
+    bus = SignalBus()
+    bus.subscribe("log", log_sink(config['signal_log']))
+    bus.subscribe("dashboard", DashboardSink())
+    if config['webhook_url']:
+        bus.subscribe("webhook", webhook_sink(config['webhook_url']))
+    if config['signal_socket']:
+        UnixSocketServer(bus, config['signal_socket'])
+    return bus
+
+def act(engine, bus, bands):
+    signal, price, band_level = bands.signal()
+    bus.publish(signal_event(config['symbol'], signal, price, band_level, bands.last_ts))
+    if signal == "buy":
+        print(f"🟢 BUY SIGNAL! Price ${price:.2f} is below lower band ${band_level:.2f}")
+    elif signal == "sell":
+        print(f"🔴 SELL SIGNAL! Price ${price:.2f} reached the {bands.exit_band} band ${band_level:.2f}")
+    else:
+        print(f"💤 Holding. Price ${price:.2f} is inside bands.")
+    # Queued; the order goes out on the execution thread. The client order ID
+    # is tied to the candle, so re-deciding the same candle after a restart is a no-op.
+    engine.submit(config['symbol'], signal, price, bands.last_ts)
+
 def run_bot():
+    started = time.perf_counter()
     print(f"🤖 Live Bot Started in [{config['mode']}] mode...")
     print(f"🌊 Strategy: Bollinger Bands Reversion")
     print("Press Ctrl+C to stop.\n")
 
+    os.makedirs(os.path.dirname(config['state_path']) or ".", exist_ok=True)
+    state = BotState(config['state_path'])
+    engine = ExecutionEngine(make_broker(), trade_amount=config['trade_amount']).start()
+    bus = make_bus()
+
+    # Warm restart: positions, paper balances and sent orders come back from the
+    # snapshot, and so does the indicator window if the band settings match, so
+    # the first decision needs no history fetch at all
+    engine.restore(state.load("execution", {}))
+    saved_bands = state.load("bands")
+    if (saved_bands and saved_bands["period"] == config['bb_period']
+            and saved_bands["std_dev"] == config['bb_std_dev']):
+        bands = RollingBands.from_state(saved_bands)
+        bands.exit_band = config['exit_band']  # the window doesn't depend on it
+        if bands.ready():
+            act(engine, bus, bands)
+            print(f"♻️ Restored state; first decision {(time.perf_counter() - started) * 1000:.1f} ms after start\n")
+    else:
+        bands = RollingBands(config['bb_period'], config['bb_std_dev'], exit_band=config['exit_band'])
+
     while True:
         try:
-            # 1. Get Data
+            # 1. Get Data (the local store only downloads candles it doesn't have)
             print(f"⏳ Checking market at {datetime.datetime.now().strftime('%H:%M:%S')}...")
             df = fetch_data(config['symbol'], config['limit'])
             
             if not df.empty:
-                # 2. Analyze
-                signal, price, band_level = get_signal(df)
-                
+                # 2. Analyze: fold in only candles at/after the last one processed
+                # Epoch ms whatever unit the frame's datetimes carry (ms under pandas 3)
+                ts = df['timestamp'].astype('datetime64[ms]').astype('int64').to_numpy()
+                start = 0 if bands.last_ts is None else ts.searchsorted(bands.last_ts)
+                for t, close in zip(ts[start:].tolist(), df['close'].to_numpy()[start:].tolist()):
+                    bands.update(t, close)
+
                 # 3. Act
-                if signal == "buy":
-                    print(f"🟢 BUY SIGNAL! Price ${price:.2f} is below lower band ${band_level:.2f}")
-                    # If config['mode'] == 'live': exchange.create_market_buy_order(...)
-                    
-                elif signal == "sell":
-                    print(f"🔴 SELL SIGNAL! Price ${price:.2f} reverted to mean ${band_level:.2f}")
-                    # If config['mode'] == 'live': exchange.create_market_sell_order(...)
-                    
-                else:
-                    print(f"💤 Holding. Price ${price:.2f} is inside bands.")
+                if bands.ready():
+                    act(engine, bus, bands)
+                state.save(bands=bands.to_state(), execution=engine.to_state())
             
             # 4. Wait for the next check
             print(f"Sleeping for {config['check_interval']} seconds...\n")
             time.sleep(config['check_interval'])
             
         except KeyboardInterrupt:
+            engine.stop()
+            state.save(bands=bands.to_state(), execution=engine.to_state())
+            state.close()
+            bus.drain()
+            bus.subscribers["dashboard"].handler.flush()
+            bus.close()
             print("\n🛑 Bot stopped by user.")
+            print(f"📊 Orders: {engine.latency_report()}")
             break
         except Exception as e:
             print(f"⚠️ Unexpected Error: {e}")
@@ -0,0 +1,95 @@
+import base64
+import os
+import time
+import urllib.error
+import urllib.request
+import numpy as np
+from ohlcv_store import DATA_DIR, load_candles
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+SPARKLINE_TIMEFRAME = "1h"
+SPARKLINE_CANDLES = 7 * 24   # last 7 days
+SPARKLINE_POINTS = 50
+LOGO_DIR = os.path.join(DATA_DIR, "logos")
+LOGO_URL = "https://raw.githubusercontent.com/spothq/cryptocurrency-icons/master/128/color/{name}.png"
+
+_sparklines = {}     # (symbol, last candle ts, last close, size) -> data URI
+_missing_logos = set()  # names the icon set doesn't have (404)
+_offline_until = 0.0    # after a connection failure, stop trying for a while
+OFFLINE_BACKOFF = 300
+
+
+# -----------------------------
+# 2. Sparklines From the Local Store
+# -----------------------------
+def downsample(values, points=SPARKLINE_POINTS):
+    """Evenly resamples a series to `points` values (linear interpolation)."""
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) <= points:
+        return values
+    return np.interp(np.linspace(0, len(values) - 1, points), np.arange(len(values)), values)
+
+
+def sparkline_svg(values, width=120, height=36):
+    """Inline SVG polyline; green when the series ended higher than it started."""
+    values = downsample(values)
+    lo, hi = values.min(), values.max()
+    span = hi - lo or 1.0
+    xs = np.linspace(1, width - 1, len(values))
+    ys = (height - 2) - (values - lo) / span * (height - 4)
+    path = " ".join(f"{x:.1f},{y:.1f}" for x, y in zip(xs, ys))
+    color = "#16c784" if values[-1] >= values[0] else "#ea3943"
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}"><polyline fill="none" stroke="{color}" '
+            f'stroke-width="1.5" points="{path}"/></svg>')
+
+
+def sparkline_uri(symbol, timeframe=SPARKLINE_TIMEFRAME, candles=SPARKLINE_CANDLES):
+    """7-day sparkline of stored closes as a data: URI (st.image takes it directly).
+
+    Cached per newest candle, so repeated renders don't redraw it. Returns None
+    when the store has no candles for `symbol` yet.
+    """
+    arr = load_candles(symbol, timeframe)[-candles:]
+    if len(arr) < 2:
+        return None
+    key = (symbol, int(arr["timestamp"][-1]), float(arr["close"][-1]), candles)
+    if key not in _sparklines:
+        svg = sparkline_svg(arr["close"])
+        _sparklines[key] = "data:image/svg+xml;base64," + base64.b64encode(svg.encode()).decode()
+    return _sparklines[key]
+
+
+# -----------------------------
+# 3. Local Logo Cache
+# -----------------------------
+def logo_path(name):
+    return os.path.join(LOGO_DIR, f"{name.lower()}.png")
+
+
+def cached_logo(name, timeout=5):
+    """Local copy of the coin's icon, downloaded once; the remote URL if that fails."""
+    path = logo_path(name)
+    if os.path.exists(path):
+        return path
+    url = LOGO_URL.format(name=name.lower())
+    global _offline_until
+    if name in _missing_logos or time.monotonic() < _offline_until:
+        return url
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as resp:
+            data = resp.read()
+        os.makedirs(LOGO_DIR, exist_ok=True)
+        with open(path + ".tmp", "wb") as f:
+            f.write(data)
+        os.replace(path + ".tmp", path)
+        return path
+    except urllib.error.HTTPError:
+        _missing_logos.add(name)
+        return url
+    except OSError:
+        # No network: don't wait out a timeout for every remaining coin
+        _offline_until = time.monotonic() + OFFLINE_BACKOFF
+        return url
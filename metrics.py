@@ -0,0 +1,82 @@
+import numpy as np
+from resample import TIMEFRAME_MS
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+# Crypto trades around the clock, so a year is 365 full days of candles
+YEAR_MS = 365 * 86_400_000
+METRICS = ("total_return", "cagr", "sharpe", "sortino", "max_drawdown", "calmar", "exposure", "profit_factor")
+LOWER_IS_BETTER = {"max_drawdown"}
+
+
+def periods_per_year(timeframe):
+    return YEAR_MS / TIMEFRAME_MS[timeframe]
+
+
+# -----------------------------
+# 2. Vectorized Metrics
+# -----------------------------
+def compute_metrics(equity, periods=periods_per_year("1h")):
+    """Risk/return metrics for one equity curve (1D) or many at once (2D, one run per row).
+
+    Everything is computed with whole-array operations along the time axis, so
+    scoring thousands of parameter sets costs about as much as a few numpy
+    calls. Returns floats for a 1D curve, arrays (one per run) for 2D input.
+
+    - sharpe / sortino: annualized from per-candle returns (risk-free rate 0)
+    - max_drawdown: largest peak-to-trough loss as a positive fraction
+    - exposure: share of candles where equity moved, i.e. a position was open
+    - profit_factor: summed equity gains over summed losses (inf with no losses)
+    """
+    eq = np.atleast_2d(np.asarray(equity, dtype=np.float64))
+    n = eq.shape[1]
+    returns = eq[:, 1:] / eq[:, :-1] - 1.0
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        total_return = eq[:, -1] / eq[:, 0] - 1.0
+        years = max(n - 1, 1) / periods
+        cagr = np.maximum(1.0 + total_return, 0.0) ** (1.0 / years) - 1.0
+
+        mean = returns.mean(axis=1)
+        std = returns.std(axis=1, ddof=1) if n > 2 else np.zeros(len(eq))
+        downside = np.sqrt(np.mean(np.minimum(returns, 0.0) ** 2, axis=1))
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods), 0.0)
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(periods), 0.0)
+
+        peaks = np.maximum.accumulate(eq, axis=1)
+        max_drawdown = np.max(1.0 - eq / peaks, axis=1)
+        calmar = np.where(max_drawdown > 0, cagr / max_drawdown, 0.0)
+
+        changes = np.diff(eq, axis=1)
+        exposure = np.count_nonzero(changes, axis=1) / max(n - 1, 1)
+        gains = np.where(changes > 0, changes, 0.0).sum(axis=1)
+        losses = -np.where(changes < 0, changes, 0.0).sum(axis=1)
+        profit_factor = np.where(losses > 0, gains / losses, np.where(gains > 0, np.inf, 0.0))
+
+    out = {
+        "total_return": total_return, "cagr": cagr, "sharpe": sharpe, "sortino": sortino,
+        "max_drawdown": max_drawdown, "calmar": calmar, "exposure": exposure,
+        "profit_factor": profit_factor,
+    }
+    if np.ndim(equity) == 1:
+        return {k: float(v[0]) for k, v in out.items()}
+    return out
+
+
+# -----------------------------
+# 3. Ranking
+# -----------------------------
+def score(metrics, objective):
+    """Objective values oriented so that higher is always better."""
+    if objective not in METRICS:
+        raise ValueError(f"Unknown objective '{objective}', expected one of {METRICS}")
+    values = np.asarray(metrics[objective], dtype=np.float64)
+    if objective in LOWER_IS_BETTER:
+        values = -values
+    return np.where(np.isnan(values), -np.inf, values)
+
+
+def rank(metrics, objective="sharpe"):
+    """Indices of the runs in `metrics` (2D output of compute_metrics), best first."""
+    return np.argsort(-score(metrics, objective), kind="stable")
@@ -0,0 +1,159 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from metrics import compute_metrics
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+N_SIMS = 10_000
+BLOCK_SIZE = 24        # candles per resampled block (keeps a day of autocorrelation)
+CHUNK_SIZE = 250       # simulations per pool task
+START_BALANCE = 1000.0
+
+
+# -----------------------------
+# 2. Trade Bootstrap (in-process, fully vectorized)
+# -----------------------------
+def bootstrap_trades(trade_returns, n_sims=N_SIMS, start_balance=START_BALANCE, seed=0):
+    """Resamples a strategy's per-trade returns with replacement.
+
+    Each row of the (n_sims x n_trades) sample is one alternative run of
+    trades drawn from the observed outcomes (some repeated, some left out);
+    compounding it gives the final balance and max drawdown such a run
+    would have produced.
+    """
+    trade_returns = np.asarray(trade_returns, dtype=np.float64)
+    if not len(trade_returns):
+        return {"final_balance": np.full(n_sims, start_balance), "max_drawdown": np.zeros(n_sims)}
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(trade_returns), size=(n_sims, len(trade_returns)))
+    equity = start_balance * np.cumprod(1.0 + trade_returns[picks], axis=1)
+    equity = np.hstack([np.full((n_sims, 1), start_balance), equity])
+    return {"final_balance": equity[:, -1], "max_drawdown": compute_metrics(equity)["max_drawdown"]}
+
+
+# -----------------------------
+# 3. Block-Resampled Price Paths (process pool)
+# -----------------------------
+def block_resample(cols, rng, block=BLOCK_SIZE):
+    """One synthetic OHLCV path: blocks of consecutive candles drawn with replacement
+    and chained so each block continues from the previous close. Series no
+    longer than `block` use blocks of n - 1 candles."""
+    close = np.asarray(cols["close"], dtype=np.float64)
+    n = len(close)
+    if n < 2:
+        raise ValueError(f"Block bootstrap needs at least 2 candles, got {n}")
+    block = min(block, n - 1)
+    starts = rng.integers(1, n - block + 1, size=-(-(n - 1) // block))
+    idx = (starts[:, None] + np.arange(block)).ravel()[: n - 1]
+
+    growth = close[idx] / close[idx - 1]
+    new_close = np.empty(n)
+    new_close[0] = close[0]
+    new_close[1:] = close[0] * np.cumprod(growth)
+
+    src = np.r_[0, idx]
+    ref = close[src]
+    return pd.DataFrame({
+        "timestamp": pd.to_datetime(np.asarray(cols["timestamp"]), unit="ms"),
+        "open": np.r_[cols["open"][0], new_close[:-1] * (np.asarray(cols["open"])[idx] / close[idx - 1])],
+        "high": new_close * np.asarray(cols["high"])[src] / ref,
+        "low": new_close * np.asarray(cols["low"])[src] / ref,
+        "close": new_close,
+        "volume": np.asarray(cols["volume"])[src],
+    })
+
+
+def _simulate_chunk(shared, params, seed, count, block):
+    # Runs in a pool worker: the candles are memory-mapped, not pickled
+    from optimizer import run_backtest
+    cols = shared.columns()
+    rng = np.random.default_rng(seed)
+    balances = np.empty(count)
+    curves = np.empty((count, len(shared)))
+    for k in range(count):
+        result = run_backtest(block_resample(cols, rng, block), params, with_metrics=False)
+        balances[k] = result["balance"]
+        curves[k] = result["equity"]
+    return balances, compute_metrics(curves)["max_drawdown"]
+
+
+def bootstrap_blocks(shared, params, n_sims=N_SIMS, block=BLOCK_SIZE, workers=None, seed=0,
+                     chunk_size=CHUNK_SIZE):
+    """Backtests `params` on `n_sims` block-resampled versions of a shared series
+    (see shared_history.share_candles), spread over a process pool."""
+    chunks = [min(chunk_size, n_sims - i) for i in range(0, n_sims, chunk_size)]
+    seeds = np.random.SeedSequence(seed).spawn(len(chunks))
+    with ProcessPoolExecutor(workers or os.cpu_count()) as pool:
+        futures = [pool.submit(_simulate_chunk, shared, params, s, c, block) for s, c in zip(seeds, chunks)]
+        parts = [f.result() for f in futures]
+    return {
+        "final_balance": np.concatenate([p[0] for p in parts]),
+        "max_drawdown": np.concatenate([p[1] for p in parts]),
+    }
+
+
+# -----------------------------
+# 4. Report
+# -----------------------------
+def summarize(results, start_balance=START_BALANCE):
+    balance, drawdown = results["final_balance"], results["max_drawdown"]
+    return {
+        "sims": len(balance),
+        "balance_p5": float(np.percentile(balance, 5)),
+        "balance_p50": float(np.percentile(balance, 50)),
+        "balance_p95": float(np.percentile(balance, 95)),
+        "prob_loss": float(np.mean(balance < start_balance)),
+        "drawdown_p50": float(np.percentile(drawdown, 50)),
+        "drawdown_p95": float(np.percentile(drawdown, 95)),
+    }
+
+
+def print_summary(title, summary):
+    print(f"\n🎲 {title} ({summary['sims']:,} simulations)")
+    print(f"Final Balance  p5 ${summary['balance_p5']:.2f} | median ${summary['balance_p50']:.2f} | "
+          f"p95 ${summary['balance_p95']:.2f}")
+    print(f"Chance of Loss {summary['prob_loss'] * 100:.1f}%")
+    print(f"Max Drawdown   median {summary['drawdown_p50'] * 100:.1f}% | p95 {summary['drawdown_p95'] * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Monte Carlo robustness check of the optimizer's best parameters")
+    parser.add_argument("--sims", type=int, default=N_SIMS)
+    parser.add_argument("--method", choices=["trades", "blocks", "both"], default="both")
+    parser.add_argument("--block", type=int, default=BLOCK_SIZE)
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--symbol", default="BTC/USDT")
+    parser.add_argument("--limit", type=int, default=2000)
+    args = parser.parse_args()
+
+    from backtest_engine import load_results
+    from optimizer import get_shared_data, optimize, run_backtest
+    from shared_history import prune_shared
+    try:
+        best = load_results("optimizer_best")
+    except OSError:
+        best = {}
+    if "strategy" not in (best.get("params") or {}):
+        # Missing, or saved before strategies.py named the strategy it ran
+        optimize()
+        best = load_results("optimizer_best")
+    params = best["params"]
+    print(f"Testing {params}")
+
+    shared = get_shared_data(args.symbol, args.limit)
+    t0 = time.perf_counter()
+    if args.method in ("trades", "both"):
+        result = run_backtest(shared.frame(), params)
+        log = result["trade_log"]
+        returns = log["exit_price"] / log["entry_price"] - 1.0
+        print_summary("Trade bootstrap (resampled with replacement)", summarize(bootstrap_trades(returns, args.sims)))
+    if args.method in ("blocks", "both"):
+        print_summary(f"Block bootstrap ({args.block}-candle blocks)",
+                      summarize(bootstrap_blocks(shared, params, args.sims, args.block, args.workers)))
+    print(f"\n⏱️ {time.perf_counter() - t0:.1f}s")
+    prune_shared()  # the pool is done with this export; drop day-old ones
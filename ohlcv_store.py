@@ -0,0 +1,127 @@
+import json
+import os
+import numpy as np
+import pandas as pd
+
+# -----------------------------
+# 1. Layout of the Local Store
+# -----------------------------
+# One .npy file per (symbol, timeframe) holding a structured array sorted by
+# timestamp. Only the base timeframe is downloaded; everything else is derived.
+# With COINIFY_EXCHANGE set (fake exchange, see exchanges.py) the default moves
+# to data/fake so synthetic candles never mix with real ones.
+DATA_DIR = os.environ.get("COINIFY_DATA_DIR") or (
+    os.path.join("data", "fake") if os.environ.get("COINIFY_EXCHANGE") else "data")
+BASE_TIMEFRAME = "1h"
+
+COLUMNS = ["timestamp", "open", "high", "low", "close", "volume"]
+OHLCV_DTYPE = np.dtype([
+    ("timestamp", "i8"),
+    ("open", "f8"),
+    ("high", "f8"),
+    ("low", "f8"),
+    ("close", "f8"),
+    ("volume", "f8"),
+])
+
+
+def venue_key(exchange_name, symbol):
+    """Store key for candles downloaded from one exchange ("binance:BTC/USDT"), so
+    two venues listing the same pair never write into the same file."""
+    return f"{exchange_name}:{symbol}"
+
+
+def store_path(symbol, timeframe):
+    name = symbol.replace("/", "_").replace(":", "_")
+    return os.path.join(DATA_DIR, f"{name}_{timeframe}.npy")
+
+
+def empty_candles():
+    return np.empty(0, dtype=OHLCV_DTYPE)
+
+
+def candles_to_array(candles):
+    """Converts ccxt's [[ts, o, h, l, c, v], ...] lists into a structured array."""
+    if not candles:
+        return empty_candles()
+    raw = np.asarray(candles, dtype="f8")
+    arr = np.empty(len(raw), dtype=OHLCV_DTYPE)
+    arr["timestamp"] = raw[:, 0].astype("i8")
+    for i, col in enumerate(COLUMNS[1:], start=1):
+        arr[col] = raw[:, i]
+    return arr
+
+
+# -----------------------------
+# 2. Read / Write
+# -----------------------------
+def load_candles(symbol, timeframe):
+    path = store_path(symbol, timeframe)
+    if not os.path.exists(path):
+        return empty_candles()
+    return np.load(path)
+
+
+def save_candles(symbol, timeframe, arr):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    path = store_path(symbol, timeframe)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    # Atomic swap so readers never see a half-written file
+    os.replace(tmp, path)
+
+
+def merge_candles(existing, new, dedupe=True):
+    """Merges `new` into `existing`; rows in `new` win on equal timestamps.
+
+    The common case is a tail update: the last stored candle is usually still
+    forming, so a re-fetch starting at its timestamp overwrites it. Backfilled
+    (older) pages take the slower sort-and-dedupe path.
+
+    With dedupe=False every row is kept (volume/dollar bars can close several
+    times in one millisecond, so a timestamp doesn't identify them).
+    """
+    if not len(new):
+        return existing
+    if not len(existing):
+        return new
+    if not dedupe:
+        both = np.concatenate([existing, new])
+        if new["timestamp"][0] >= existing["timestamp"][-1]:
+            return both
+        return both[np.argsort(both["timestamp"], kind="stable")]
+    if new["timestamp"][0] >= existing["timestamp"][0] and new["timestamp"][-1] >= existing["timestamp"][-1]:
+        cut = np.searchsorted(existing["timestamp"], new["timestamp"][0])
+        return np.concatenate([existing[:cut], new])
+
+    keep = ~np.isin(existing["timestamp"], new["timestamp"])
+    both = np.concatenate([new, existing[keep]])
+    return both[np.argsort(both["timestamp"], kind="stable")]
+
+
+def append_candles(symbol, timeframe, new, dedupe=True):
+    merged = merge_candles(load_candles(symbol, timeframe), new, dedupe)
+    save_candles(symbol, timeframe, merged)
+    return merged
+
+
+def load_meta(symbol, timeframe):
+    """Sync bookkeeping kept next to the candles (e.g. where the exchange's history ends)."""
+    try:
+        with open(store_path(symbol, timeframe) + ".json") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_meta(symbol, timeframe, meta):
+    os.makedirs(DATA_DIR, exist_ok=True)
+    with open(store_path(symbol, timeframe) + ".json", "w") as f:
+        json.dump(meta, f)
+
+
+def to_frame(arr):
+    df = pd.DataFrame({col: arr[col] for col in COLUMNS})
+    df["timestamp"] = pd.to_datetime(df["timestamp"], unit="ms")
+    return df
@@ -1,126 +1,135 @@
-import ccxt
-import pandas as pd
+from data_source import get_data_source
 import numpy as np
-import itertools
+from backtest_engine import SUMMARY_FIELDS, run_backtest as simulate, save_results
+from bars import is_custom_bar, load_bars
+from metrics import compute_metrics, periods_per_year, rank
+from result_cache import ResultCache, closed_candles, dataset_fingerprint, params_key
+from shared_history import share_candles
+from strategies import DEFAULT_STRATEGY, get_strategy
 
 # -----------------------------
 # 1. Fetch Data Once (The Setup)
 # -----------------------------
-def get_data(symbol='BTC/USDT', limit=1000):
+def get_data(symbol='BTC/USDT', limit=1000, timeframe='1h'):
+    # Custom bars (e.g. 'volume-100' from bars.py) are already in the local store
+    if is_custom_bar(timeframe):
+        return load_bars(symbol, timeframe, limit=limit)
     print(f"⬇️ Fetching {limit} candles for {symbol}...")
-    exchange = ccxt.binance()
-    bars = exchange.fetch_ohlcv(symbol, timeframe='1h', limit=limit)
-    df = pd.DataFrame(bars, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
-    df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+    # Synced into the local 1h store from the fastest exchange that answers;
+    # re-runs only download the newest candles. Never synthetic: tuning on
+    # made-up prices would be meaningless. Pinned, so every dataset in one
+    # run (optimizer, Monte Carlo) comes from the same exchange.
+    df = get_data_source(synthetic=False, pin=True).history(symbol, timeframe, limit=limit)
+    print(f"📡 Source: {df.attrs['source']} ({df.attrs['symbol']})")
     return df
 
+def get_shared_data(symbol='BTC/USDT', limit=1000, timeframe='1h'):
+    """Same candles as get_data, as a handle pool workers can map without copying."""
+    df = get_data(symbol, limit, timeframe)
+    return share_candles(df.attrs.get("symbol", symbol), timeframe, limit=limit)
+
 # -----------------------------
 # 2. The Strategy Engine (Fast Version)
 # -----------------------------
-def run_backtest(df, params):
-    # Unpack parameters we are testing
-    fast_len = params['ema_fast']
-    slow_len = params['ema_slow']
-    rsi_len = params['rsi_period']
-    rsi_buy = params['rsi_buy_threshold']  # e.g., 30
-    rsi_sell = params['rsi_sell_threshold'] # e.g., 70
-    
-    # Calculate Indicators
-    # (We use .copy() to avoid SettingWithCopy warnings on the main df)
-    test_df = df.copy()
-    test_df['ema_fast'] = test_df['close'].ewm(span=fast_len).mean()
-    test_df['ema_slow'] = test_df['close'].ewm(span=slow_len).mean()
-    
-    # RSI Calc
-    delta = test_df['close'].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-    avg_gain = gain.rolling(window=rsi_len).mean()
-    avg_loss = loss.rolling(window=rsi_len).mean()
-    rs = avg_gain / (avg_loss + 1e-10)
-    test_df['rsi'] = 100 - (100 / (1 + rs))
-
-    # Simulation Variables
-    balance = 1000
-    position = None
-    entry_price = 0
-    trades = 0
-    wins = 0
-    
-    # Fast Loop (Vectorized logic is harder to read, so we keep your loop style for now)
-    for i in range(slow_len, len(test_df)):
-        row = test_df.iloc[i]
-        price = row['close']
-        
-        # BUY Logic
-        if position is None:
-            if row['ema_fast'] > row['ema_slow'] and row['rsi'] < rsi_sell:
-                position = 'long'
-                entry_price = price
-        
-        # SELL Logic
-        elif position == 'long':
-            # Sell if cross down OR RSI is overheated (optional exit)
-            if row['ema_fast'] < row['ema_slow']:
-                profit = (price - entry_price) / entry_price
-                balance = balance * (1 + profit)
-                trades += 1
-                if profit > 0: wins += 1
-                position = None
+# Rules, indicators and the parameter grid live in strategies.py; params may
+# name the strategy under "strategy" (default ema_rsi). Cached results are
+# keyed by the strategy's name and version.
+def run_backtest(df, params, with_metrics=True, mark_open=True):
+    strategy = get_strategy(params.get("strategy", DEFAULT_STRATEGY))
+    signals = strategy.signals(df, params)
 
-    return {
-        "balance": balance,
-        "trades": trades,
-        "win_rate": (wins/trades * 100) if trades > 0 else 0,
-        "params": params
-    }
+    # Whole balance per trade, exits only on the signal, no fees. An open
+    # position at the end is marked to the last close and counted as a trade;
+    # mark_open=False reproduces the original loop, which ignored it.
+    result = simulate(df, signals, trade_amount=np.inf, stop_loss_pct=1.0,
+                      take_profit_pct=np.inf, fee_rate=0.0, start_balance=1000,
+                      start=strategy.warmup(params), with_metrics=with_metrics, mark_open=mark_open)
+    result["params"] = params
+    return result
 
 # -----------------------------
 # 3. The Grid Search (The "Brain")
 # -----------------------------
-def optimize():
-    # 1. Get Data
-    df = get_data(limit=2000) # <--- Increased to 2000 candles for better reliability
-    
-    # 2. Define Ranges to Test (WIDER RANGE)
-    ema_fast_range = [10, 20, 50]
-    ema_slow_range = [50, 100, 200] # <--- Added big trend lines
-    rsi_buy_range = [30]     
-    rsi_sell_range = [70, 75, 80]
+def optimize(use_cache=True, objective="sharpe", strategy=DEFAULT_STRATEGY, mark_open=True):
+    """Grid search over a strategy's param_space (see strategies.py), ranked by
+    `objective`, any of metrics.METRICS (e.g. "sharpe", "sortino", "calmar",
+    "total_return", "max_drawdown"). `mark_open` as in run_backtest."""
+    strategy = get_strategy(strategy)
+    # Unmarked summaries differ, so they are cached apart
+    version = strategy.key if mark_open else f"{strategy.key}-unmarked"
+    # 1. Get Data: the last 2000 closed candles (the forming one would change
+    # the dataset, and so the cache key, on every run)
+    df = closed_candles(get_data(limit=2001), '1h').iloc[-2000:]
+
+    # Combinations already tested on these exact candles come from the cache
+    dataset = dataset_fingerprint(df, f"{df.attrs.get('symbol', 'BTC/USDT')}_1h")
+    cache = ResultCache() if use_cache else None
+    cached = cache.lookup(dataset, version) if cache else {}
     
-    # Generate all combinations
-    combinations = list(itertools.product(ema_fast_range, ema_slow_range, rsi_buy_range, rsi_sell_range))
-    print(f"🧪 Testing {len(combinations)} different strategies on 2000 hours of data...")
+    # 2. Every valid combination in the strategy's parameter space
+    combinations = [{"strategy": strategy.name, **p} for p in strategy.grid()]
+    print(f"🧪 Testing {len(combinations)} different {strategy.name} strategies on 2000 hours of data...")
     
-    best_result = {"balance": 0}
+    results, fresh, curves = [], [], []
     
-    for combo in combinations:
-        # SKIP invalid combos (e.g. Fast EMA 50 cannot be >= Slow EMA 50)
-        if combo[0] >= combo[1]:
-            continue
-            
-        params = {
-            "ema_fast": combo[0],
-            "ema_slow": combo[1],
-            "rsi_period": 14,
-            "rsi_buy_threshold": combo[2],
-            "rsi_sell_threshold": combo[3]
-        }
-        
-        # Run test
-        result = run_backtest(df, params)
+    for params in combinations:
+        # Run test (unless this exact test already ran)
+        result = cached.get(params_key(params))
+        if result is None or "metrics" not in result:
+            # Scored below in one batch together with the other new runs
+            full = run_backtest(df, params, with_metrics=False, mark_open=mark_open)
+            result = {k: full[k] for k in SUMMARY_FIELDS + ("params",)}
+            fresh.append((params, result))
+            curves.append(full["equity"])
+        results.append(result)
         
         # Print only PROFITABLE results
         if result['balance'] > 1000:
             print(f"✅ Found Profit: ${result['balance']:.2f} | Params: {params}")
-            
-        if result['balance'] > best_result['balance']:
-            best_result = result
+
+    # 3. Score every new equity curve at once (one row per parameter set)
+    if curves:
+        batch = compute_metrics(np.vstack(curves), periods_per_year('1h'))
+        for k, (_, result) in enumerate(fresh):
+            result["metrics"] = {name: float(values[k]) for name, values in batch.items()}
+
+    if cache:
+        cache.put_many(dataset, version, fresh)
+        cache.close()
+        print(f"♻️ {len(fresh)} new backtests, {len(results) - len(fresh)} reused from cache")
+
+    # 4. Rank by the objective
+    if not results:
+        print(f"\n⚠️ No valid {strategy.name} parameter combinations to rank.")
+        return
+    order = rank({name: [r["metrics"][name] for r in results] for name in results[0]["metrics"]}, objective)
+    print(f"\n📋 TOP 5 BY {objective.upper()}:")
+    for k in order[:5]:
+        m = results[k]["metrics"]
+        print(f"  {m[objective]:>8.3f} | Sharpe {m['sharpe']:.2f} | Max DD {m['max_drawdown'] * 100:.1f}% | "
+              f"${results[k]['balance']:.2f} | {results[k]['params']}")
+
+    # A cached winner has no trade log yet; one re-run recreates it
+    best_result = run_backtest(df, results[order[0]]['params'], mark_open=mark_open)
+    m = best_result["metrics"]
 
     print("\n🏆 BEST PARAMETERS FOUND:")
     print(f"Final Balance: ${best_result['balance']:.2f}")
     print(f"Win Rate: {best_result['win_rate']:.2f}%")
+    print(f"Sharpe: {m['sharpe']:.2f} | Sortino: {m['sortino']:.2f} | Max Drawdown: {m['max_drawdown'] * 100:.1f}% | "
+          f"CAGR: {m['cagr'] * 100:.1f}% | Exposure: {m['exposure'] * 100:.0f}% | Profit Factor: {m['profit_factor']:.2f}")
     print(f"Settings: {best_result['params']}")
+    print(f"💾 Trades and equity curve saved to {save_results('optimizer_best', best_result, df['timestamp'])}")
     
 if __name__ == "__main__":
-    optimize()
\ No newline at end of file
+    import argparse
+    from metrics import METRICS
+    from strategies import STRATEGIES
+    parser = argparse.ArgumentParser(description="Grid-search a strategy's parameters")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default=DEFAULT_STRATEGY)
+    parser.add_argument("--objective", choices=METRICS, default="sharpe")
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--unmarked", action="store_true",
+                        help="ignore a position still open at the end (the original optimizer's numbers)")
+    args = parser.parse_args()
+    optimize(not args.no_cache, args.objective, args.strategy, mark_open=not args.unmarked)
\ No newline at end of file
@@ -0,0 +1,269 @@
+import argparse
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+import numpy as np
+from data_source import canonical_symbol, get_data_source
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+BOOK_DEPTH = 100                 # levels per side
+SNAPSHOT_INTERVAL = 30           # seconds between snapshots of each symbol
+METRICS_RING = 2880              # liquidity rows kept per symbol (24h at 30s)
+BOOKS_RING = 240                 # compressed books kept per symbol (2h at 30s)
+DEPTH_BANDS_BP = (10, 50, 100, 200)        # depth within ±0.1% .. ±2% of mid
+SLIPPAGE_SIZES = (1_000, 10_000, 100_000)  # market orders, in quote currency
+
+METRIC_DTYPE = np.dtype(
+    [("timestamp", "i8"), ("mid", "f8"), ("spread_bps", "f8")]
+    + [(f"depth_{bp}bp", "f8") for bp in DEPTH_BANDS_BP]
+    + [(f"{side}_slip_{size}", "f8") for size in SLIPPAGE_SIZES for side in ("buy", "sell")]
+)
+
+
+# -----------------------------
+# 2. Compressed L2 Snapshots
+# -----------------------------
+# Prices are stored as offsets from mid in units of 1e-8 (far below any tick),
+# delta-encoded between levels so the near-constant tick steps compress to
+# almost nothing (int64, so far-out levels can't wrap); sizes stay float32.
+# A 100-level book is ~0.8 KB instead of 3.2 KB.
+_HEADER = struct.Struct("<qdii")  # timestamp, mid, bid levels, ask levels
+_PRICE_UNIT = 1e-8
+
+
+def _levels(side, depth=BOOK_DEPTH):
+    # Some exchanges append a third field (count/timestamp) to each level
+    return np.array([lvl[:2] for lvl in side[:depth]], dtype=np.float64).reshape(-1, 2)
+
+
+def compress_book(book, depth=BOOK_DEPTH):
+    """zlib'ed snapshot of a ccxt order book; None when either side is empty."""
+    bids, asks = _levels(book["bids"], depth), _levels(book["asks"], depth)
+    if not len(bids) or not len(asks):
+        return None
+    mid = (bids[0, 0] + asks[0, 0]) / 2
+    offsets = [np.diff(np.round((side[:, 0] / mid - 1) / _PRICE_UNIT).astype(np.int64), prepend=0)
+               for side in (bids, asks)]
+    body = (np.concatenate(offsets).tobytes()
+            + np.concatenate([bids[:, 1], asks[:, 1]]).astype(np.float32).tobytes())
+    ts = book.get("timestamp") or int(time.time() * 1000)
+    return zlib.compress(_HEADER.pack(int(ts), mid, len(bids), len(asks)) + body, 6)
+
+
+def decompress_book(blob):
+    """(timestamp, bids, asks); each side is an (n, 2) array of price, amount."""
+    raw = zlib.decompress(blob)
+    ts, mid, nb, na = _HEADER.unpack_from(raw)
+    n = nb + na
+    offsets = np.frombuffer(raw, np.int64, n, _HEADER.size)
+    sizes = np.frombuffer(raw, np.float32, n, _HEADER.size + 8 * n).astype(np.float64)
+    prices = mid * (1 + np.concatenate([np.cumsum(offsets[:nb]), np.cumsum(offsets[nb:])]) * _PRICE_UNIT)
+    return ts, np.column_stack([prices[:nb], sizes[:nb]]), np.column_stack([prices[nb:], sizes[nb:]])
+
+
+# -----------------------------
+# 3. Liquidity Metrics
+# -----------------------------
+def slippage_bps(levels, notional, mid):
+    """Average-price slippage vs. mid (bps) of a market order for `notional`
+    quote currency walking `levels` (best first); NaN if the book is too thin."""
+    value = levels[:, 0] * levels[:, 1]
+    filled = np.cumsum(value)
+    k = int(np.searchsorted(filled, notional))
+    if k >= len(levels):
+        return np.nan
+    qty = levels[:k, 1].sum() + (notional - (filled[k - 1] if k else 0.0)) / levels[k, 0]
+    return abs(notional / qty / mid - 1) * 1e4
+
+
+def book_metrics(bids, asks, timestamp=0):
+    """One METRIC_DTYPE row: spread, two-sided depth within each band, and the
+    slippage of buying (walking asks) and selling (walking bids) each size."""
+    row = np.zeros((), dtype=METRIC_DTYPE)
+    mid = (bids[0, 0] + asks[0, 0]) / 2
+    row["timestamp"] = timestamp
+    row["mid"] = mid
+    row["spread_bps"] = (asks[0, 0] - bids[0, 0]) / mid * 1e4
+    for bp in DEPTH_BANDS_BP:
+        band = bp / 1e4
+        near_bids = bids[bids[:, 0] >= mid * (1 - band)]
+        near_asks = asks[asks[:, 0] <= mid * (1 + band)]
+        row[f"depth_{bp}bp"] = (near_bids[:, 0] * near_bids[:, 1]).sum() + (near_asks[:, 0] * near_asks[:, 1]).sum()
+    for size in SLIPPAGE_SIZES:
+        row[f"buy_slip_{size}"] = slippage_bps(asks, size, mid)
+        row[f"sell_slip_{size}"] = slippage_bps(bids, size, mid)
+    return row
+
+
+# -----------------------------
+# 4. Bounded History per Symbol
+# -----------------------------
+class BookRing:
+    """The last METRICS_RING liquidity rows (preallocated) and BOOKS_RING
+    compressed books of one symbol; memory stays flat however long it runs."""
+
+    def __init__(self, metrics_capacity=METRICS_RING, books_capacity=BOOKS_RING):
+        self.rows = np.zeros(metrics_capacity, dtype=METRIC_DTYPE)
+        self.books = deque(maxlen=books_capacity)
+        self.count = 0  # rows ever appended
+
+    def append(self, row, blob):
+        self.rows[self.count % len(self.rows)] = row
+        self.count += 1
+        self.books.append(blob)
+
+    def metrics(self):
+        """Stored rows, oldest first."""
+        if self.count <= len(self.rows):
+            return self.rows[:self.count].copy()
+        k = self.count % len(self.rows)
+        return np.concatenate([self.rows[k:], self.rows[:k]])
+
+    def latest(self):
+        return self.rows[(self.count - 1) % len(self.rows)] if self.count else None
+
+    def nbytes(self):
+        return self.rows.nbytes + sum(len(b) for b in self.books)
+
+
+# -----------------------------
+# 5. Scheduled Recorder
+# -----------------------------
+class BookRecorder:
+    """Snapshots the order books of `symbols` every `interval` seconds.
+
+    Books come through the data source (fastest exchange, failover), are
+    compressed into each symbol's BookRing and reduced to liquidity metrics
+    for the market tables. `estimate_slippage` turns the stored books into
+    fill costs for backtests.
+    """
+
+    def __init__(self, symbols, source=None, interval=SNAPSHOT_INTERVAL, depth=BOOK_DEPTH,
+                 metrics_capacity=METRICS_RING, books_capacity=BOOKS_RING):
+        self.symbols = [canonical_symbol(s) for s in symbols]
+        self.source = source or get_data_source()
+        self.interval = interval
+        self.depth = depth
+        self.metrics_capacity = metrics_capacity
+        self.books_capacity = books_capacity
+        self.rings = {s: BookRing(metrics_capacity, books_capacity) for s in self.symbols}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def record(self, symbols=None):
+        """Takes one snapshot per symbol now; returns how many were stored."""
+        stored = 0
+        for symbol in symbols or self.symbols:
+            symbol = canonical_symbol(symbol)
+            try:
+                book = self.source.fetch_order_book(symbol, self.depth)
+            except Exception as e:
+                print(f"⚠️ Order book for {symbol} unavailable ({e})")
+                continue
+            blob = compress_book(book, self.depth)
+            if blob is None:
+                continue
+            ts, bids, asks = decompress_book(blob)
+            with self._lock:
+                if symbol not in self.rings:
+                    self.rings[symbol] = BookRing(self.metrics_capacity, self.books_capacity)
+                self.rings[symbol].append(book_metrics(bids, asks, ts), blob)
+            stored += 1
+        return stored
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.record()
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # --- Reading ---
+    def latest(self, symbol):
+        """Newest metrics row of `symbol` as a dict, or None."""
+        with self._lock:
+            ring = self.rings.get(canonical_symbol(symbol))
+            row = ring.latest() if ring else None
+        return None if row is None else {name: row[name].item() for name in METRIC_DTYPE.names}
+
+    def history(self, symbol):
+        with self._lock:
+            ring = self.rings.get(canonical_symbol(symbol))
+            return ring.metrics() if ring else np.zeros(0, dtype=METRIC_DTYPE)
+
+    def books(self, symbol):
+        """Stored snapshots as (timestamp, bids, asks), oldest first."""
+        with self._lock:
+            ring = self.rings.get(canonical_symbol(symbol))
+            blobs = list(ring.books) if ring else []
+        return [decompress_book(b) for b in blobs]
+
+    def estimate_slippage(self, symbol, notional, side="buy"):
+        """Median slippage (bps) of a `notional` market order over the stored
+        books, or from one fresh snapshot when none are stored yet."""
+        books = self.books(symbol)
+        if not books:
+            self.record([symbol])
+            books = self.books(symbol)
+        samples = [slippage_bps(asks if side == "buy" else bids, notional, (bids[0, 0] + asks[0, 0]) / 2)
+                   for _, bids, asks in books]
+        samples = [s for s in samples if not np.isnan(s)]
+        return float(np.median(samples)) if samples else np.nan
+
+    def nbytes(self):
+        with self._lock:
+            return sum(ring.nbytes() for ring in self.rings.values())
+
+
+def fill_cost_pct(symbol, notional, recorder=None, source=None):
+    """Per-fill slippage as a fraction (for backtest_engine's `slippage_pct`),
+    averaged over buying and selling; 0.0 when no book can be had."""
+    recorder = recorder or BookRecorder([symbol], source)
+    bps = np.nanmean([recorder.estimate_slippage(symbol, notional, side) for side in ("buy", "sell")])
+    return 0.0 if np.isnan(bps) else float(bps) / 1e4
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record order-book snapshots and print liquidity metrics")
+    parser.add_argument("symbols", nargs="+")
+    parser.add_argument("--snapshots", type=int, default=3)
+    parser.add_argument("--interval", type=float, default=SNAPSHOT_INTERVAL)
+    parser.add_argument("--depth", type=int, default=BOOK_DEPTH)
+    args = parser.parse_args()
+
+    recorder = BookRecorder(args.symbols, get_data_source(enableRateLimit=True), args.interval, args.depth)
+    for k in range(args.snapshots):
+        if k:
+            time.sleep(args.interval)
+        t0 = time.perf_counter()
+        recorder.record()
+        print(f"📸 Snapshot {k + 1}/{args.snapshots} in {(time.perf_counter() - t0) * 1000:.0f} ms")
+    for symbol in recorder.symbols:
+        m = recorder.latest(symbol)
+        if m is None:
+            continue
+        print(f"\n📚 {symbol} mid ${m['mid']:,.2f} | spread {m['spread_bps']:.2f} bps")
+        print("   depth  " + " | ".join(f"±{bp / 100:g}% ${m[f'depth_{bp}bp']:,.0f}" for bp in DEPTH_BANDS_BP))
+        print("   slip   " + " | ".join(f"${size:,}: buy {m[f'buy_slip_{size}']:.1f} / sell {m[f'sell_slip_{size}']:.1f} bps"
+                                        for size in SLIPPAGE_SIZES))
+    snapshots = sum(len(r.books) for r in recorder.rings.values())
+    compressed = sum(len(b) for r in recorder.rings.values() for b in r.books)
+    print(f"\n💾 {snapshots} books: {compressed / 1024:.1f} KB compressed vs "
+          f"~{snapshots * args.depth * 2 * 16 / 1024:.0f} KB as float64 | "
+          f"ring buffers {recorder.nbytes() / 1024:.0f} KB total")
@@ -0,0 +1,81 @@
+import ast
+import os
+import subprocess
+import sys
+
+# -----------------------------
+# 1. What We Measure
+# -----------------------------
+# Each group is imported in a fresh interpreter with `python -X importtime`,
+# so the numbers are true cold-start costs (nothing shared between groups).
+HOME_PAGE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Coinify.py")
+
+
+def top_level_imports(path):
+    """Modules a script imports at module level, in order (lazy imports inside
+    functions don't count: they aren't paid at startup)."""
+    with open(path) as f:
+        tree = ast.parse(f.read(), path)
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and not node.level:
+            names = [node.module]
+        else:
+            continue
+        modules += [name for name in names if name not in modules]
+    return modules
+
+
+STARTUP_GROUPS = {
+    "old top-level imports": ["streamlit", "ccxt", "pandas", "plotly.graph_objects"],
+    "home page": top_level_imports(HOME_PAGE),
+    "analysis page (plotly)": ["plotly.graph_objects"],
+    "exchange catalog (ccxt)": ["ccxt"],
+}
+
+
+def profile_imports(modules):
+    """Returns [(cumulative_us, module), ...] for every import triggered by `modules`."""
+    code = "; ".join(f"import {m}" for m in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        entries.append((int(cumulative), name.strip()))
+    return entries
+
+
+# -----------------------------
+# 2. Report
+# -----------------------------
+def report(groups=STARTUP_GROUPS, top=8):
+    for label, modules in groups.items():
+        try:
+            entries = profile_imports(modules)
+        except RuntimeError as e:
+            print(f"⚠️ {label}: {e}\n")
+            continue
+
+        # Top-level entries (no leading indent) add up to the wall-clock import cost
+        total = sum(us for us, name in entries if name in modules)
+        print(f"⏱️ {label}: {total / 1000:.0f} ms  ({', '.join(modules)})")
+        for us, name in sorted(entries, reverse=True)[:top]:
+            print(f"   {us / 1000:8.1f} ms  {name}")
+        print()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        report({"custom": sys.argv[1:]})
+    else:
+        report()
@@ -0,0 +1,92 @@
+import numpy as np
+from ohlcv_store import BASE_TIMEFRAME, empty_candles, load_candles, merge_candles, save_candles
+from resample import TIMEFRAME_MS, bucket_start, resample_ohlcv
+
+# -----------------------------
+# 1. Levels
+# -----------------------------
+# Each level is stored next to the base candles and built from the level
+# below it (1h -> 4h -> 1d -> 1w); every bucket nests inside the next one.
+PYRAMID_LEVELS = ("1h", "4h", "1d", "1w")
+MAX_POINTS = 1500  # candles per chart before switching to a coarser level
+
+
+def level_name(base_timeframe, timeframe):
+    """Store key of a derived level, e.g. "4h_from_1h" (kept apart from downloaded series)."""
+    return timeframe if timeframe == base_timeframe else f"{timeframe}_from_{base_timeframe}"
+
+
+def pyramid_levels(base_timeframe=BASE_TIMEFRAME, levels=PYRAMID_LEVELS):
+    """The levels at or above the base, finest first."""
+    base_ms = TIMEFRAME_MS[base_timeframe]
+    return [tf for tf in levels if TIMEFRAME_MS[tf] >= base_ms]
+
+
+# -----------------------------
+# 2. Incremental Build
+# -----------------------------
+def _extend_level(finer, stored, timeframe):
+    """Re-aggregates `finer` from the last stored bucket onwards and merges it in."""
+    if not len(finer):
+        return stored, False
+    if not len(stored) or bucket_start(finer["timestamp"][:1], timeframe)[0] < stored["timestamp"][0]:
+        # First build, or older candles were backfilled underneath
+        return resample_ohlcv(finer, timeframe), True
+    i = np.searchsorted(finer["timestamp"], stored["timestamp"][-1])
+    tail = resample_ohlcv(finer[i:], timeframe)
+    if len(tail) == 1 and tail.tobytes() == stored[-1:].tobytes():
+        return stored, False
+    return merge_candles(stored, tail), True
+
+
+def update_pyramid(symbol, base_timeframe=BASE_TIMEFRAME, levels=PYRAMID_LEVELS):
+    """Brings every derived level of `symbol` up to date with its base candles.
+
+    Only the newest bucket of each level is recomputed (from the level below),
+    so a new base candle costs a handful of rows per level, not a full pass.
+    Returns {timeframe: candles}.
+    """
+    chain = pyramid_levels(base_timeframe, levels)
+    out = {base_timeframe: load_candles(symbol, base_timeframe)}
+    finer = out[base_timeframe]
+    for timeframe in chain:
+        if timeframe == base_timeframe:
+            continue
+        name = level_name(base_timeframe, timeframe)
+        arr, changed = _extend_level(finer, load_candles(symbol, name), timeframe)
+        if changed:
+            save_candles(symbol, name, arr)
+        out[timeframe] = finer = arr
+    return out
+
+
+# -----------------------------
+# 3. Reading a Zoom Window
+# -----------------------------
+def pick_level(start_ms, end_ms, base_timeframe=BASE_TIMEFRAME, levels=PYRAMID_LEVELS, max_points=MAX_POINTS):
+    """Finest level that shows [start_ms, end_ms] in at most `max_points` candles."""
+    chain = pyramid_levels(base_timeframe, levels)
+    for timeframe in chain:
+        if (end_ms - start_ms) / TIMEFRAME_MS[timeframe] <= max_points:
+            return timeframe
+    return chain[-1]
+
+
+def load_window(symbol, start_ms=None, end_ms=None, base_timeframe=BASE_TIMEFRAME, levels=PYRAMID_LEVELS,
+                max_points=MAX_POINTS, warmup=0):
+    """Candles covering [start_ms, end_ms] from the level that fits the zoom.
+
+    `warmup` extra candles before `start_ms` are included for indicators.
+    Returns (timeframe, candles); both bounds default to the stored range.
+    """
+    base = load_candles(symbol, base_timeframe)
+    if not len(base):
+        return base_timeframe, empty_candles()
+    start_ms = base["timestamp"][0] if start_ms is None else start_ms
+    end_ms = base["timestamp"][-1] if end_ms is None else end_ms
+
+    timeframe = pick_level(start_ms, end_ms, base_timeframe, levels, max_points)
+    arr = base if timeframe == base_timeframe else load_candles(symbol, level_name(base_timeframe, timeframe))
+    lo, hi = np.searchsorted(arr["timestamp"], [start_ms, end_ms], side="right")
+    lo = max(lo - 1 - warmup, 0)  # include the bucket containing start_ms
+    return timeframe, arr[lo:hi]
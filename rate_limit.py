@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+DEFAULT_RATE = 10.0          # requests/s when the exchange doesn't say
+MIN_RATE = 0.2
+RECOVERY_STEP = 0.05         # fraction of the max rate regained per success
+BINANCE_WEIGHT_LIMIT = 6000  # request weight per minute
+
+# Matched by class name so ccxt doesn't have to be imported here
+RETRYABLE_ERRORS = {"NetworkError", "RateLimitExceeded", "DDoSProtection",
+                    "RequestTimeout", "ExchangeNotAvailable", "OnMaintenance"}
+RATE_LIMIT_ERRORS = {"RateLimitExceeded", "DDoSProtection"}
+
+
+def is_error(error, names):
+    return any(cls.__name__ in names for cls in type(error).__mro__)
+
+
+def parse_retry_after(value):
+    """Seconds from a Retry-After header (delta-seconds or an HTTP date), or None."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(exchange):
+    """Retry-After of the exchange's last response; ccxt stores the headers
+    in `last_response_headers` before it raises for the status code."""
+    headers = getattr(exchange, "last_response_headers", None) or {}
+    return parse_retry_after({k.lower(): v for k, v in headers.items()}.get("retry-after"))
+
+
+# -----------------------------
+# 2. Adaptive Token Bucket
+# -----------------------------
+class TokenBucket:
+    """Token bucket whose rate adapts to the exchange.
+
+    Rate-limit errors halve the rate and pause it for the exchange's
+    Retry-After; successes creep it back up to `max_rate`. Response headers
+    that report remaining quota slow it down before the exchange starts
+    rejecting requests.
+    """
+
+    def __init__(self, rate=DEFAULT_RATE, capacity=None):
+        self.max_rate = rate
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.paused_until = 0.0
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0:
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def on_success(self, headers=None):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_STEP)
+            if headers:
+                self._apply_headers(headers)
+
+    def on_rate_limited(self, retry_after=None):
+        with self._lock:
+            self.rate = max(MIN_RATE, self.rate / 2)
+            self.tokens = 0
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+    def _apply_headers(self, headers):
+        h = {k.lower(): v for k, v in headers.items()}
+        try:
+            wait = parse_retry_after(h.get("retry-after"))
+            if wait:
+                self.paused_until = max(self.paused_until, time.monotonic() + wait)
+            used = h.get("x-mbx-used-weight-1m")
+            if used is not None and int(used) > 0.8 * BINANCE_WEIGHT_LIMIT:
+                self.rate = max(MIN_RATE, self.rate / 2)
+            remaining = h.get("x-ratelimit-remaining")
+            if remaining is not None and int(remaining) <= 1:
+                reset = float(h.get("x-ratelimit-reset", 1))
+                self.paused_until = time.monotonic() + min(reset, 60)
+        except ValueError:
+            pass
+
+
+_limiters = {}
+
+
+def get_limiter(exchange):
+    """One shared bucket per exchange id, seeded from ccxt's `rateLimit` (ms/request).
+
+    The bucket replaces ccxt's own throttle, which is switched off on every
+    exchange that goes through here so calls aren't delayed twice.
+    """
+    key = getattr(exchange, "id", type(exchange).__name__)
+    if key not in _limiters:
+        ms = getattr(exchange, "rateLimit", None)
+        _limiters[key] = TokenBucket(1000 / ms if ms else DEFAULT_RATE)
+    if getattr(exchange, "enableRateLimit", False):
+        exchange.enableRateLimit = False
+    return _limiters[key]
+
+
+# -----------------------------
+# 3. Retry With Jittered Backoff
+# -----------------------------
+def call_with_retry(exchange, method, *args, retries=5, base_delay=0.5, max_delay=30, **kwargs):
+    """Calls `exchange.<method>` through its rate limiter, retrying transient errors.
+
+    Backoff is exponential with full jitter so parallel callers don't retry in
+    lockstep; a rate-limit error waits at least as long as its Retry-After.
+    Non-transient errors (bad symbol, auth, ...) are raised at once.
+    """
+    limiter = get_limiter(exchange)
+    for attempt in range(retries + 1):
+        limiter.acquire()
+        try:
+            result = getattr(exchange, method)(*args, **kwargs)
+        except Exception as e:
+            if not is_error(e, RETRYABLE_ERRORS):
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * 2 ** attempt))
+            if is_error(e, RATE_LIMIT_ERRORS):
+                wait = retry_after(exchange)
+                limiter.on_rate_limited(retry_after=wait)
+                delay = max(delay, wait or 0.0)
+            if attempt == retries:
+                raise
+            print(f"⚠️ {method} failed ({type(e).__name__}), retry {attempt + 1}/{retries} in {delay:.1f}s")
+            time.sleep(delay)
+            continue
+        limiter.on_success(getattr(exchange, "last_response_headers", None))
+        return result
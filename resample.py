@@ -0,0 +1,96 @@
+import numpy as np
+from ohlcv_store import BASE_TIMEFRAME, empty_candles, load_candles
+
+# -----------------------------
+# 1. Timeframe Math
+# -----------------------------
+TIMEFRAME_MS = {
+    "1m": 60_000,
+    "5m": 5 * 60_000,
+    "15m": 15 * 60_000,
+    "30m": 30 * 60_000,
+    "1h": 3_600_000,
+    "4h": 4 * 3_600_000,
+    "1d": 86_400_000,
+    "1w": 7 * 86_400_000,
+}
+
+# The epoch fell on a Thursday; exchanges open weekly candles on Monday
+WEEK_OFFSET_MS = 4 * 86_400_000
+
+
+def bucket_start(timestamps, timeframe):
+    ms = TIMEFRAME_MS[timeframe]
+    offset = WEEK_OFFSET_MS if timeframe == "1w" else 0
+    return (timestamps - offset) // ms * ms + offset
+
+
+# -----------------------------
+# 2. The Resampler Kernel
+# -----------------------------
+def resample_ohlcv(arr, timeframe):
+    """Aggregates sorted base candles into `timeframe` candles in one vectorized pass."""
+    if not len(arr):
+        return empty_candles()
+
+    buckets = bucket_start(arr["timestamp"], timeframe)
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:] - 1, len(arr) - 1]
+
+    out = np.empty(len(starts), dtype=arr.dtype)
+    out["timestamp"] = buckets[starts]
+    out["open"] = arr["open"][starts]
+    out["high"] = np.maximum.reduceat(arr["high"], starts)
+    out["low"] = np.minimum.reduceat(arr["low"], starts)
+    out["close"] = arr["close"][ends]
+    out["volume"] = np.add.reduceat(arr["volume"], starts)
+    return out
+
+
+class Resampler:
+    """Keeps derived candles for one timeframe and only redoes the newest bucket.
+
+    Every call to `update` gets the full (sorted) base series, but only the rows
+    from the start of the last derived bucket onwards are re-aggregated, so a new
+    base candle costs O(candles per bucket) instead of a full recompute.
+    """
+
+    def __init__(self, timeframe):
+        self.timeframe = timeframe
+        self.bars = empty_candles()
+
+    def update(self, base):
+        if not len(self.bars):
+            self.bars = resample_ohlcv(base, self.timeframe)
+            return self.bars
+
+        if len(base) and bucket_start(base["timestamp"][:1], self.timeframe)[0] < self.bars["timestamp"][0]:
+            # Older candles were backfilled into the base; rebuild from scratch
+            self.bars = resample_ohlcv(base, self.timeframe)
+            return self.bars
+
+        last_start = self.bars["timestamp"][-1]
+        i = np.searchsorted(base["timestamp"], last_start)
+        tail = resample_ohlcv(base[i:], self.timeframe)
+        self.bars = np.concatenate([self.bars[:-1], tail])
+        return self.bars
+
+
+# -----------------------------
+# 3. Cached Access
+# -----------------------------
+_resamplers = {}
+
+
+def get_candles(symbol, timeframe, base_timeframe=BASE_TIMEFRAME):
+    """Returns `timeframe` candles for `symbol`, derived locally from the base store."""
+    base = load_candles(symbol, base_timeframe)
+    if timeframe == base_timeframe:
+        return base
+    if TIMEFRAME_MS[timeframe] < TIMEFRAME_MS[base_timeframe]:
+        raise ValueError(f"Cannot derive {timeframe} candles from a {base_timeframe} base")
+
+    key = (symbol, timeframe, base_timeframe)
+    if key not in _resamplers:
+        _resamplers[key] = Resampler(timeframe)
+    return _resamplers[key].update(base)
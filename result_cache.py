@@ -0,0 +1,93 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import numpy as np
+from ohlcv_store import DATA_DIR
+from resample import TIMEFRAME_MS
+
+# -----------------------------
+# 1. Cache Keys
+# -----------------------------
+# A result is reusable when the candles, the strategy code and the parameters
+# are all unchanged. Strategies carry a version string that is bumped whenever
+# their rules change, which invalidates everything computed with the old rules.
+# Only closed candles go into a key: the forming one changes on every fetch,
+# and a key that includes it would never be seen twice.
+CACHE_PATH = os.path.join(DATA_DIR, "backtest_cache.db")
+FINGERPRINT_COLUMNS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+def _timestamps_ms(df):
+    return df["timestamp"].to_numpy().astype("datetime64[ms]").astype(np.int64)
+
+
+def closed_candles(df, timeframe, now_ms=None):
+    """`df` without the candle that is still forming. Custom bars (no fixed
+    timeframe) are only stored once complete and come back unchanged."""
+    if timeframe not in TIMEFRAME_MS or not len(df):
+        return df
+    now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+    ends = _timestamps_ms(df) + TIMEFRAME_MS[timeframe]
+    return df.iloc[:int(np.searchsorted(ends, now_ms, side="right"))]
+
+
+def dataset_fingerprint(df, series=""):
+    """Key of a candle range: store key, first and last timestamp and count,
+    plus a sha1 of the OHLCV values in case stored candles were revised.
+    Pass closed candles only (see closed_candles)."""
+    if not len(df):
+        return f"{series}|empty"
+    ts = _timestamps_ms(df)
+    h = hashlib.sha1()
+    for col in FINGERPRINT_COLUMNS:
+        if col in df:
+            values = ts if col == "timestamp" else df[col].to_numpy()
+            h.update(col.encode())
+            h.update(np.ascontiguousarray(values).tobytes())
+    return f"{series}|{ts[0]}|{ts[-1]}|{len(df)}|{h.hexdigest()[:16]}"
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True, default=float)
+
+
+# -----------------------------
+# 2. SQLite Result Store
+# -----------------------------
+class ResultCache:
+    """Backtest summaries keyed by (dataset fingerprint, strategy version, params)."""
+
+    def __init__(self, path=CACHE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " dataset TEXT, strategy TEXT, params TEXT, summary TEXT, created REAL,"
+            " PRIMARY KEY (dataset, strategy, params))"
+        )
+
+    def lookup(self, dataset, strategy):
+        """Every cached result for one dataset/strategy as {params_key: summary}.
+
+        One query up front instead of one per grid point.
+        """
+        rows = self.conn.execute(
+            "SELECT params, summary FROM results WHERE dataset = ? AND strategy = ?",
+            (dataset, strategy),
+        )
+        return {params: json.loads(summary) for params, summary in rows}
+
+    def put_many(self, dataset, strategy, results):
+        """Stores (params, summary) pairs in a single transaction."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO results (dataset, strategy, params, summary, created) VALUES (?, ?, ?, ?, ?)",
+                [(dataset, strategy, params_key(p), json.dumps(s, default=float), now) for p, s in results],
+            )
+
+    def close(self):
+        self.conn.close()
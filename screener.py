@@ -0,0 +1,201 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from history import sync_recent
+from ohlcv_store import load_candles, venue_key
+from rate_limit import call_with_retry
+from resample import TIMEFRAME_MS, bucket_start, get_candles
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+SCREEN_TIMEFRAME = "1d"
+SCREEN_LENGTH = 250      # candles per symbol: SMA200 plus some slack
+MAX_SYMBOLS = 500
+SYNC_WORKERS = 8         # parallel downloads during warm-up (they share the rate limiter)
+RSI_PERIOD = 14
+BB_PERIOD = 20
+BB_STD = 2.0
+
+_markets = {}
+
+
+# -----------------------------
+# 2. Universe + Bulk Tickers
+# -----------------------------
+def load_universe(exchange, quote="USDT", max_symbols=MAX_SYMBOLS):
+    """Active spot pairs quoted in `quote`. load_markets runs once per exchange."""
+    key = getattr(exchange, "id", type(exchange).__name__)
+    if key not in _markets:
+        _markets[key] = call_with_retry(exchange, "load_markets")
+    symbols = [
+        m["symbol"] for m in _markets[key].values()
+        if m.get("quote") == quote and m.get("active", True) is not False and m.get("spot", True)
+    ]
+    return sorted(symbols)[:max_symbols]
+
+
+def fetch_tickers_bulk(exchange, symbols):
+    """All tickers in one request where the exchange allows it, else every ticker it has."""
+    try:
+        tickers = call_with_retry(exchange, "fetch_tickers", symbols)
+    except Exception:
+        tickers = call_with_retry(exchange, "fetch_tickers")
+    return {s: tickers[s] for s in symbols if s in tickers}
+
+
+# -----------------------------
+# 3. Local History as a (symbols x time) Matrix
+# -----------------------------
+def store_keys(exchange, symbols):
+    """Where each pair's candles from this exchange live (same keys as data_source)."""
+    name = getattr(exchange, "id", type(exchange).__name__)
+    return [venue_key(name, s) for s in symbols]
+
+
+def warm_up(exchange, symbols, timeframe=SCREEN_TIMEFRAME, length=SCREEN_LENGTH):
+    """Downloads history for symbols whose store is missing a completed candle.
+
+    The first run fetches `length` candles per pair; after that a symbol is only
+    touched once per candle, and the forming candle comes from the tickers.
+    """
+    ms = TIMEFRAME_MS[timeframe]
+    now = int(time.time() * 1000)
+    previous_open = now // ms * ms - ms
+    stale = [s for s in symbols
+             if not len(arr := load_candles(store_keys(exchange, [s])[0], timeframe))
+             or arr["timestamp"][-1] < previous_open]
+    if stale:
+        print(f"⬇️ Syncing {len(stale)} of {len(symbols)} pairs...")
+        since_ms = now - (length + 1) * ms
+
+        def sync(symbol):
+            try:
+                sync_recent(exchange, symbol, timeframe, since_ms, key=store_keys(exchange, [symbol])[0])
+            except Exception as e:
+                print(f"⚠️ {symbol}: {e}")
+
+        with ThreadPoolExecutor(SYNC_WORKERS) as pool:
+            list(pool.map(sync, stale))
+    return stale
+
+
+def close_matrix(symbols, timeframe=SCREEN_TIMEFRAME, length=SCREEN_LENGTH, base_timeframe=None, end_ms=None):
+    """Closes aligned on one time grid: row per symbol, `length` columns, NaN where missing.
+
+    The grid ends at the candle containing `end_ms` (default: the newest stored one).
+    """
+    ms = TIMEFRAME_MS[timeframe]
+    series = [get_candles(s, timeframe, base_timeframe or timeframe) for s in symbols]
+    if end_ms is None:
+        end_ms = max((arr["timestamp"][-1] for arr in series if len(arr)), default=0)
+    grid = bucket_start(np.int64(end_ms), timeframe) - ms * np.arange(length - 1, -1, -1, dtype=np.int64)
+    closes = np.full((len(symbols), length), np.nan)
+    for row, arr in enumerate(series):
+        lo, hi = np.searchsorted(arr["timestamp"], [grid[0], grid[-1]], side="left")
+        tail = arr[lo:hi + 1]
+        cols = np.searchsorted(grid, tail["timestamp"])
+        ok = (cols < length) & (grid[np.minimum(cols, length - 1)] == tail["timestamp"])
+        closes[row, cols[ok]] = tail["close"][ok]
+    return closes, grid
+
+
+# -----------------------------
+# 4. Vectorized Indicators
+# -----------------------------
+def wilder_rsi(closes, period=RSI_PERIOD):
+    """RSI at the last column for every row, same smoothing as Coinify.add_indicators."""
+    delta = np.diff(closes, axis=1)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    missing = np.isnan(delta)
+    alpha = 1.0 / period
+    avg_gain = np.full(len(closes), np.nan)
+    avg_loss = np.full(len(closes), np.nan)
+    # One pass over time, vectorized across symbols; series start wherever their data does
+    for t in range(delta.shape[1]):
+        fresh = np.isnan(avg_gain) & ~missing[:, t]
+        avg_gain = np.where(fresh, gain[:, t], avg_gain * (1 - alpha) + gain[:, t] * alpha)
+        avg_loss = np.where(fresh, loss[:, t], avg_loss * (1 - alpha) + loss[:, t] * alpha)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def indicators(closes):
+    last = closes[:, -1]
+    window = closes[:, -BB_PERIOD:]
+    middle = window.mean(axis=1)
+    std = window.std(axis=1, ddof=1)
+    return {
+        "close": last,
+        "rsi": wilder_rsi(closes),
+        "sma200": closes[:, -200:].mean(axis=1),
+        "upper": middle + BB_STD * std,
+        "lower": middle - BB_STD * std,
+    }
+
+
+FILTERS = {
+    "rsi_oversold": ("RSI < 30", lambda ind: ind["rsi"] < 30),
+    "above_sma200": ("Close > SMA200", lambda ind: ind["close"] > ind["sma200"]),
+    "bb_breakout_up": ("Close > upper band", lambda ind: ind["close"] > ind["upper"]),
+    "bb_breakout_down": ("Close < lower band", lambda ind: ind["close"] < ind["lower"]),
+}
+
+
+# -----------------------------
+# 5. The Screen
+# -----------------------------
+def screen(exchange, filters=("rsi_oversold",), quote="USDT", timeframe=SCREEN_TIMEFRAME,
+           max_symbols=MAX_SYMBOLS, sync=True):
+    """Evaluates `filters` (keys of FILTERS, all must pass) across the exchange's pairs.
+
+    Returns a DataFrame with one row per matching pair plus every indicator and
+    filter column, sorted by 24h quote volume.
+    """
+    symbols = load_universe(exchange, quote, max_symbols)
+    if sync:
+        warm_up(exchange, symbols, timeframe)
+    tickers = fetch_tickers_bulk(exchange, symbols)
+
+    # The last column is the forming candle; its close is the live ticker price
+    closes, _ = close_matrix(store_keys(exchange, symbols), timeframe, end_ms=int(time.time() * 1000))
+    last = np.array([tickers.get(s, {}).get("last") or np.nan for s in symbols], dtype=np.float64)
+    closes[:, -1] = np.where(np.isnan(last), closes[:, -1], last)
+
+    ind = indicators(closes)
+    df = pd.DataFrame({
+        "Symbol": symbols,
+        "Price": ind["close"],
+        "Change": [tickers.get(s, {}).get("percentage") for s in symbols],
+        "Volume": [tickers.get(s, {}).get("quoteVolume") for s in symbols],
+        "RSI": ind["rsi"],
+        "SMA200": ind["sma200"],
+        "Upper": ind["upper"],
+        "Lower": ind["lower"],
+    })
+    mask = np.ones(len(symbols), dtype=bool)
+    for name in filters:
+        passed = FILTERS[name][1](ind)
+        df[name] = passed
+        mask &= passed
+    return df[mask].sort_values("Volume", ascending=False, na_position="last").reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screen every pair on an exchange")
+    parser.add_argument("--exchange", default="binance")
+    parser.add_argument("--quote", default="USDT")
+    parser.add_argument("--timeframe", default=SCREEN_TIMEFRAME)
+    parser.add_argument("--max", type=int, default=MAX_SYMBOLS)
+    parser.add_argument("--filters", nargs="+", default=["rsi_oversold"], choices=list(FILTERS))
+    args = parser.parse_args()
+
+    from exchanges import get_exchange
+    exchange = get_exchange(args.exchange, enableRateLimit=True)
+    t0 = time.perf_counter()
+    result = screen(exchange, args.filters, args.quote, args.timeframe, args.max)
+    print(result.to_string())
+    print(f"⏱️ {len(result)} matches in {time.perf_counter() - t0:.2f}s")
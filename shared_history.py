@@ -0,0 +1,111 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from ohlcv_store import BASE_TIMEFRAME, COLUMNS, DATA_DIR
+from resample import get_candles
+
+# -----------------------------
+# 1. Columnar Export
+# -----------------------------
+# The store keeps one row-oriented structured array per series, whose column
+# views are strided. For sharing, each column is written once as its own
+# contiguous .npy file so every process can map it read-only with no copy.
+# Each export lives in a directory named after its content (length + a digest
+# of the first/last rows, since the store only ever rewrites its tail), so a
+# re-export never mutates files another process has mapped. Exports are never
+# deleted while exporting; prune_shared removes old ones once nothing can
+# still be about to map them.
+SHARED_DIR = os.path.join(DATA_DIR, "shared")
+STALE_AFTER = 24 * 3600  # seconds before an export that is no longer newest may go
+
+
+def _series_key(symbol, timeframe):
+    return f"{symbol.replace('/', '_').replace(':', '_')}_{timeframe}"
+
+
+def share_candles(symbol, timeframe, base_timeframe=BASE_TIMEFRAME, limit=None):
+    """Exports stored candles as per-column files and returns a picklable handle."""
+    arr = get_candles(symbol, timeframe, base_timeframe)
+    if limit is not None:
+        arr = arr[-limit:]
+
+    key = _series_key(symbol, timeframe)
+    digest = hashlib.sha1(arr[:1].tobytes() + arr[-1:].tobytes()).hexdigest()[:12]
+    version = f"{key}_{len(arr)}_{digest}"
+    directory = os.path.join(SHARED_DIR, version)
+
+    if not os.path.isdir(directory):
+        # Private temp dir per exporter; two processes exporting the same
+        # version race on the rename, and the loser just discards its copy
+        os.makedirs(SHARED_DIR, exist_ok=True)
+        tmp = tempfile.mkdtemp(prefix=version + ".", suffix=".tmp", dir=SHARED_DIR)
+        try:
+            for col in COLUMNS:
+                np.save(os.path.join(tmp, f"{col}.npy"), np.ascontiguousarray(arr[col]))
+            os.rename(tmp, directory)
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+            if not os.path.isdir(directory):
+                raise
+
+    return SharedCandles(directory)
+
+
+def prune_shared(older_than=STALE_AFTER):
+    """Deletes exports (and abandoned temp dirs) untouched for `older_than`
+    seconds, keeping the newest export of every series; returns how many went.
+    Processes that still map a deleted export keep their pages until they exit."""
+    if not os.path.isdir(SHARED_DIR):
+        return 0
+    cutoff = time.time() - older_than
+    entries = sorted(((os.path.getmtime(os.path.join(SHARED_DIR, name)), name)
+                      for name in os.listdir(SHARED_DIR)), reverse=True)
+    newest, removed = set(), 0
+    for mtime, name in entries:
+        if not name.endswith(".tmp"):
+            key = name.rsplit("_", 2)[0]
+            if key not in newest:
+                newest.add(key)
+                continue
+        if mtime < cutoff:
+            shutil.rmtree(os.path.join(SHARED_DIR, name), ignore_errors=True)
+            removed += 1
+    return removed
+
+
+# -----------------------------
+# 2. Attaching From Any Process
+# -----------------------------
+class SharedCandles:
+    """Handle to an exported series. Only the path is pickled, so sending it to
+    pool workers is free; each worker maps the same page-cache pages."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self._columns = None
+
+    def __getstate__(self):
+        return {"directory": self.directory, "_columns": None}
+
+    def columns(self):
+        """Read-only memory-mapped arrays keyed by column name."""
+        if self._columns is None:
+            self._columns = {
+                col: np.load(os.path.join(self.directory, f"{col}.npy"), mmap_mode="r")
+                for col in COLUMNS
+            }
+        return self._columns
+
+    def __len__(self):
+        return len(self.columns()["close"])
+
+    def frame(self):
+        """DataFrame over the mapped columns (only the timestamp column is converted)."""
+        cols = self.columns()
+        data = {col: cols[col] for col in COLUMNS[1:]}
+        data["timestamp"] = pd.to_datetime(cols["timestamp"], unit="ms")
+        return pd.DataFrame(data, columns=COLUMNS, copy=False)
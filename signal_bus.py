@@ -0,0 +1,283 @@
+import argparse
+import collections
+import json
+import os
+import queue
+import socket
+import threading
+import time
+import urllib.request
+from snapshot import load_snapshot, save_snapshot
+
+# -----------------------------
+# 1. Settings
+# -----------------------------
+QUEUE_SIZE = 1000           # events buffered per subscriber
+DASHBOARD_SNAPSHOT = "signals"
+DASHBOARD_KEEP = 200        # most recent events the dashboards show
+DASHBOARD_EVERY = 1.0       # seconds between dashboard snapshot writes
+
+
+def signal_event(symbol, signal, price, level=None, ts=None):
+    """One signal as a plain JSON-able dict (what every sink and transport sees)."""
+    return {
+        "symbol": symbol,
+        "signal": signal,
+        "price": float(price),
+        "level": None if level is None else float(level),
+        "ts": int(ts) if ts is not None else int(time.time() * 1000),
+    }
+
+
+# -----------------------------
+# 2. The Bus
+# -----------------------------
+class Subscriber:
+    """A handler fed from its own bounded queue on its own thread.
+
+    When the queue is full the oldest event is dropped (and counted), so a slow
+    or dead sink loses history instead of blocking the publisher.
+    """
+
+    def __init__(self, name, handler, maxsize=QUEUE_SIZE):
+        self.name = name
+        self.handler = handler
+        self.queue = queue.Queue(maxsize)
+        self.delivered = 0
+        self.dropped = 0
+        self.errors = 0
+        self._thread = threading.Thread(target=self._run, name=f"signal-{name}", daemon=True)
+        self._thread.start()
+
+    def offer(self, event):
+        while True:
+            try:
+                self.queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            try:
+                if event is None:
+                    return
+                self.handler(event)
+                self.delivered += 1
+            except Exception as e:
+                self.errors += 1
+                print(f"⚠️ Signal sink '{self.name}' failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def close(self, timeout=5):
+        self.offer(None)
+        self._thread.join(timeout)
+
+    def stats(self):
+        return {"delivered": self.delivered, "dropped": self.dropped,
+                "errors": self.errors, "queued": self.queue.qsize()}
+
+
+class SignalBus:
+    """Publishes signal events to any number of subscribers.
+
+    `publish` only enqueues, so evaluating signals never waits on a sink.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.published = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, name, handler, maxsize=QUEUE_SIZE):
+        sub = Subscriber(name, handler, maxsize)
+        with self._lock:
+            self.subscribers[name] = sub
+        return sub
+
+    def unsubscribe(self, name):
+        with self._lock:
+            sub = self.subscribers.pop(name, None)
+        if sub:
+            sub.close()
+
+    def publish(self, event):
+        with self._lock:
+            subs = list(self.subscribers.values())
+        for sub in subs:
+            sub.offer(event)
+        self.published += 1
+
+    def drain(self):
+        """Blocks until every subscriber has handled what was queued so far."""
+        for sub in list(self.subscribers.values()):
+            sub.queue.join()
+
+    def close(self):
+        for name in list(self.subscribers):
+            self.unsubscribe(name)
+
+    def stats(self):
+        return {"published": self.published,
+                **{name: sub.stats() for name, sub in self.subscribers.items()}}
+
+
+# -----------------------------
+# 3. Sinks
+# -----------------------------
+def log_sink(path):
+    """Appends one JSON line per event."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    f = open(path, "a", buffering=1)
+
+    def handle(event):
+        f.write(json.dumps(event) + "\n")
+    return handle
+
+
+def webhook_sink(url, timeout=5):
+    """POSTs each event as JSON (Slack/Discord-style incoming webhooks, custom endpoints)."""
+    def handle(event):
+        req = urllib.request.Request(url, data=json.dumps(event).encode(),
+                                     headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            resp.read()
+    return handle
+
+
+class DashboardSink:
+    """Keeps the latest events in a snapshot file the Streamlit pages read.
+
+    Writes are throttled to one per `every` seconds; `recent_signals` reads it.
+    """
+
+    def __init__(self, name=DASHBOARD_SNAPSHOT, keep=DASHBOARD_KEEP, every=DASHBOARD_EVERY):
+        self.name = name
+        self.every = every
+        rows, _ = load_snapshot(name)
+        self.events = collections.deque(rows or [], maxlen=keep)
+        self._last_write = 0.0
+
+    def __call__(self, event):
+        self.events.append(event)
+        if time.monotonic() - self._last_write >= self.every:
+            self.flush()
+
+    def flush(self):
+        save_snapshot(self.name, list(self.events))
+        self._last_write = time.monotonic()
+
+
+def recent_signals(name=DASHBOARD_SNAPSHOT):
+    """Newest-first events written by DashboardSink (empty if there are none)."""
+    rows, _ = load_snapshot(name)
+    return list(reversed(rows or []))
+
+
+# -----------------------------
+# 4. Unix-Socket Transport
+# -----------------------------
+class UnixSocketServer:
+    """Re-publishes the bus to other processes as newline-delimited JSON.
+
+    Every connected client becomes a bus subscriber with its own bounded queue,
+    so a reader that stops reading only loses its own events.
+    """
+
+    def __init__(self, bus, path, maxsize=QUEUE_SIZE):
+        self.bus = bus
+        self.path = path
+        self.maxsize = maxsize
+        if os.path.exists(path):
+            os.unlink(path)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        self.sock.listen()
+        self._clients = 0
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self._clients += 1
+            name = f"unix-{self._clients}"
+            f = conn.makefile("w", buffering=1 << 16)
+
+            def send(event, f=f, name=name):
+                try:
+                    f.write(json.dumps(event) + "\n")
+                    sub = self.bus.subscribers.get(name)
+                    if sub is None or sub.queue.empty():
+                        f.flush()  # batch writes while events are backed up
+                except OSError:
+                    # Client went away; unsubscribe from another thread (we run on the sink's)
+                    threading.Thread(target=self.bus.unsubscribe, args=(name,), daemon=True).start()
+            self.bus.subscribe(name, send, self.maxsize)
+
+    def close(self):
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+def iter_unix_signals(path):
+    """Client side of UnixSocketServer: yields events until the server goes away."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(path)
+        for line in sock.makefile("r"):
+            yield json.loads(line)
+
+
+# -----------------------------
+# 5. Throughput Benchmark
+# -----------------------------
+def benchmark(events=100_000, subscribers=4, symbols=200):
+    """Publishes `events` through an in-process bus to no-op sinks and reports events/s."""
+    bus = SignalBus()
+    for i in range(subscribers):
+        bus.subscribe(f"bench-{i}", lambda event: None, maxsize=events)
+    batch = [signal_event(f"SYN{i % symbols}/USDT", "hold", 100.0 + i, ts=i) for i in range(events)]
+
+    t0 = time.perf_counter()
+    for event in batch:
+        bus.publish(event)
+    publish_s = time.perf_counter() - t0
+    bus.drain()
+    total_s = time.perf_counter() - t0
+    stats = bus.stats()
+    bus.close()
+
+    return {
+        "events": events,
+        "subscribers": subscribers,
+        "publish_per_s": round(events / publish_s),
+        "delivered_per_s": round(events * subscribers / total_s),
+        "dropped": sum(s["dropped"] for k, s in stats.items() if k != "published"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Signal bus tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    bench = sub.add_parser("bench", help="measure in-process throughput")
+    bench.add_argument("--events", type=int, default=100_000)
+    bench.add_argument("--subscribers", type=int, default=4)
+    listen = sub.add_parser("listen", help="print events from a bus socket")
+    listen.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "bench":
+        print(benchmark(args.events, args.subscribers))
+    else:
+        for event in iter_unix_signals(args.path):
+            print(event)
@@ -0,0 +1,42 @@
+import numpy as np
+
+# -----------------------------
+# 1. Signal Codes
+# -----------------------------
+# Signals are int8 arrays (one entry per candle) so they can be computed for a
+# whole frame at once and handed straight to the backtest engine.
+SELL, HOLD, BUY = -1, 0, 1
+SIGNAL_NAMES = {SELL: "sell", HOLD: "hold", BUY: "buy"}
+
+
+def _values(col):
+    # Accepts Series, arrays, or the scalars found in a single row
+    return np.atleast_1d(np.asarray(col, dtype=np.float64))
+
+
+# -----------------------------
+# 2. Strategy Rules (Vectorized)
+# -----------------------------
+def ema_rsi_signals(frame, rsi_overbought=70, rsi_oversold=30):
+    """EMA trend + RSI filter: buy on fast > slow unless overbought, sell on
+    fast < slow unless oversold. Needs ema_fast / ema_slow / rsi columns."""
+    fast = _values(frame["ema_fast"])
+    slow = _values(frame["ema_slow"])
+    rsi = _values(frame["rsi"])
+
+    signals = np.zeros(len(fast), dtype=np.int8)
+    signals[(fast < slow) & (rsi > rsi_oversold)] = SELL
+    signals[(fast > slow) & (rsi < rsi_overbought)] = BUY
+    return signals
+
+
+def band_signals(close, lower, upper):
+    """Band reversion: buy below `lower`, sell above `upper`.
+
+    Pass the middle band as `upper` to exit on the mean-reversion instead.
+    """
+    close = _values(close)
+    signals = np.zeros(len(close), dtype=np.int8)
+    signals[close > _values(upper)] = SELL
+    signals[close < _values(lower)] = BUY
+    return signals
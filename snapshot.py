@@ -0,0 +1,79 @@
+import json
+import os
+import threading
+import time
+
+# -----------------------------
+# 1. Snapshot Files
+# -----------------------------
+# Kept dependency-free so the home pages can paint before ccxt/plotly load.
+# Same default as ohlcv_store.DATA_DIR (data/fake under COINIFY_EXCHANGE).
+SNAPSHOT_DIR = os.environ.get("COINIFY_DATA_DIR") or (
+    os.path.join("data", "fake") if os.environ.get("COINIFY_EXCHANGE") else "data")
+
+
+def snapshot_path(name):
+    return os.path.join(SNAPSHOT_DIR, f"{name}_snapshot.json")
+
+
+def save_snapshot(name, rows):
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    path = snapshot_path(name)
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump({"saved_at": time.time(), "rows": rows}, f)
+    os.replace(tmp, path)
+
+
+def load_snapshot(name):
+    """Returns (rows, saved_at), or (None, None) if there is no readable snapshot."""
+    try:
+        with open(snapshot_path(name)) as f:
+            snap = json.load(f)
+        return snap["rows"], snap["saved_at"]
+    except (OSError, ValueError, KeyError):
+        return None, None
+
+
+# -----------------------------
+# 2. Stale-While-Refresh
+# -----------------------------
+class SnapshotRefresher:
+    """Serves the last saved rows instantly and refreshes stale ones in the background.
+
+    Only the very first run (no snapshot on disk yet) waits for `fetch`.
+    """
+
+    def __init__(self, name, fetch, max_age=60):
+        self.name = name
+        self.fetch = fetch
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._refreshing = False
+
+    def refresh(self):
+        rows = self.fetch()
+        if rows:
+            save_snapshot(self.name, rows)
+        return rows
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        finally:
+            self._refreshing = False
+
+    def refresh_async(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, daemon=True).start()
+
+    def get(self):
+        rows, saved_at = load_snapshot(self.name)
+        if rows is None:
+            return self.refresh()
+        if time.time() - saved_at > self.max_age:
+            self.refresh_async()
+        return rows
@@ -0,0 +1,207 @@
+import abc
+import itertools
+import numpy as np
+import pandas as pd
+from jit import HAVE_NUMBA, njit
+from signals import BUY, SELL, band_signals, ema_rsi_signals
+
+# -----------------------------
+# 1. Shared Indicators
+# -----------------------------
+def ema(close, span):
+    return pd.Series(close, dtype=np.float64).ewm(span=span).mean().to_numpy()
+
+
+def rolling_rsi(close, period):
+    """RSI from simple rolling averages of gains/losses (the bots' definition)."""
+    delta = pd.Series(close, dtype=np.float64).diff()
+    gain = delta.clip(lower=0).fillna(0)
+    loss = -delta.clip(upper=0).fillna(0)
+    rs = gain.rolling(window=period).mean() / (loss.rolling(window=period).mean() + 1e-10)
+    return (100 - (100 / (1 + rs))).to_numpy()
+
+
+def bollinger(close, period, std_dev):
+    close = pd.Series(close, dtype=np.float64)
+    middle = close.rolling(window=period).mean()
+    std = close.rolling(window=period).std()
+    return ((middle - std * std_dev).to_numpy(), middle.to_numpy(), (middle + std * std_dev).to_numpy())
+
+
+# -----------------------------
+# 2. Signal Kernels
+# -----------------------------
+# Each rule exists twice: a loop compiled by numba when it is installed, and
+# the vectorized version from signals.py otherwise (a plain-Python loop would
+# be far slower than numpy). Both return the same int8 array.
+@njit
+def _ema_rsi_loop(fast, slow, rsi, overbought, oversold):
+    out = np.zeros(len(fast), dtype=np.int8)
+    for i in range(len(fast)):
+        if fast[i] > slow[i] and rsi[i] < overbought:
+            out[i] = BUY
+        elif fast[i] < slow[i] and rsi[i] > oversold:
+            out[i] = SELL
+    return out
+
+
+def _ema_rsi_numpy(fast, slow, rsi, overbought, oversold):
+    return ema_rsi_signals({"ema_fast": fast, "ema_slow": slow, "rsi": rsi}, overbought, oversold)
+
+
+@njit
+def _band_loop(close, lower, upper):
+    out = np.zeros(len(close), dtype=np.int8)
+    for i in range(len(close)):
+        if close[i] < lower[i]:
+            out[i] = BUY
+        elif close[i] > upper[i]:
+            out[i] = SELL
+    return out
+
+
+ema_rsi_kernel = _ema_rsi_loop if HAVE_NUMBA else _ema_rsi_numpy
+band_kernel = _band_loop if HAVE_NUMBA else band_signals
+
+
+def _arr(values):
+    return np.ascontiguousarray(np.atleast_1d(np.asarray(values, dtype=np.float64)))
+
+
+# -----------------------------
+# 3. Strategy Interface
+# -----------------------------
+class Strategy(abc.ABC):
+    """A trading rule the optimizer, backtester, bots and dashboards share.
+
+    Subclasses declare `defaults` (every parameter), `param_space` (the
+    optimizer's grid) and `columns` (indicator names), and implement
+    `indicators(close, params) -> {name: array}` plus `kernel(ind, params)`,
+    which turns those arrays (and "close") into int8 SELL/HOLD/BUY signals;
+    a subclass missing either can't be instantiated.
+    Bump `version` whenever the rules change so cached results are dropped.
+    """
+
+    name = None
+    version = 1
+    defaults = {}
+    param_space = {}
+    columns = ()
+
+    @property
+    def key(self):
+        return f"{self.name}-{self.version}"
+
+    def resolve(self, params=None):
+        """Defaults overlaid with the known keys of `params` (extra keys are ignored)."""
+        params = params or {}
+        return {k: params.get(k, v) for k, v in self.defaults.items()}
+
+    def valid(self, params):
+        return True
+
+    def warmup(self, params):
+        """Candles before the indicators are meaningful; backtests start here."""
+        return 0
+
+    def grid(self):
+        """Every valid parameter combination in `param_space`."""
+        space = {**{k: [v] for k, v in self.defaults.items()}, **self.param_space}
+        for combo in itertools.product(*space.values()):
+            params = dict(zip(space, combo))
+            if self.valid(params):
+                yield params
+
+    @abc.abstractmethod
+    def indicators(self, close, params):
+        ...
+
+    @abc.abstractmethod
+    def kernel(self, ind, params):
+        ...
+
+    def add_indicators(self, df, params=None):
+        """Writes the indicator columns into `df` (for charts and row-wise callers)."""
+        ind = self.indicators(df["close"], self.resolve(params))
+        for col in self.columns:
+            df[col] = ind[col]
+        return df
+
+    def signals(self, df, params=None):
+        """Signals for every candle of a frame with a `close` column."""
+        params = self.resolve(params)
+        return self.kernel({"close": df["close"], **self.indicators(df["close"], params)}, params)
+
+
+class EmaRsi(Strategy):
+    """EMA trend + RSI filter: long while fast > slow unless overbought, out on
+    fast < slow unless oversold (rsi_oversold=-inf: always exit on the cross)."""
+
+    name = "ema_rsi"
+    version = 3
+    defaults = {"ema_fast": 9, "ema_slow": 21, "rsi_period": 14, "rsi_overbought": 70, "rsi_oversold": 30}
+    param_space = {
+        "ema_fast": [10, 20, 50],
+        "ema_slow": [50, 100, 200],
+        "rsi_period": [14],
+        "rsi_overbought": [70, 75, 80],
+        "rsi_oversold": [-np.inf],
+    }
+    columns = ("ema_fast", "ema_slow", "rsi")
+
+    def valid(self, params):
+        return params["ema_fast"] < params["ema_slow"]
+
+    def warmup(self, params):
+        return self.resolve(params)["ema_slow"]
+
+    def indicators(self, close, params):
+        return {
+            "ema_fast": ema(close, params["ema_fast"]),
+            "ema_slow": ema(close, params["ema_slow"]),
+            "rsi": rolling_rsi(close, params["rsi_period"]),
+        }
+
+    def kernel(self, ind, params):
+        return ema_rsi_kernel(_arr(ind["ema_fast"]), _arr(ind["ema_slow"]), _arr(ind["rsi"]),
+                              float(params["rsi_overbought"]), float(params["rsi_oversold"]))
+
+
+class BollingerReversion(Strategy):
+    """"Rubber band": buy below the lower band, sell back at the middle band
+    (exit_band="middle", the live bot) or above the upper one ("upper")."""
+
+    name = "bb_reversion"
+    version = 1
+    defaults = {"bb_period": 20, "bb_std_dev": 2.0, "exit_band": "middle"}
+    param_space = {
+        "bb_period": [14, 20, 30],
+        "bb_std_dev": [1.5, 2.0, 2.5],
+        "exit_band": ["middle", "upper"],
+    }
+    columns = ("lower", "middle", "upper")
+
+    def warmup(self, params):
+        return self.resolve(params)["bb_period"]
+
+    def indicators(self, close, params):
+        lower, middle, upper = bollinger(close, params["bb_period"], params["bb_std_dev"])
+        return {"lower": lower, "middle": middle, "upper": upper}
+
+    def kernel(self, ind, params):
+        exit_level = ind["upper"] if params["exit_band"] == "upper" else ind["middle"]
+        return band_kernel(_arr(ind["close"]), _arr(ind["lower"]), _arr(exit_level))
+
+
+# -----------------------------
+# 4. Registry
+# -----------------------------
+STRATEGIES = {s.name: s for s in (EmaRsi(), BollingerReversion())}
+DEFAULT_STRATEGY = "ema_rsi"
+
+
+def get_strategy(name=DEFAULT_STRATEGY):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown strategy {name!r}; choose from {sorted(STRATEGIES)}") from None
@@ -0,0 +1,23 @@
+import os
+import sys
+import tempfile
+
+# The modules live flat in the repo root and read their settings at import
+# time: point them at the offline fake exchange and a throwaway store first
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ["COINIFY_EXCHANGE"] = "fake"
+os.environ.setdefault("COINIFY_DATA_DIR", tempfile.mkdtemp(prefix="coinify-tests."))
+
+import pytest  # noqa: E402
+from fake_exchange import synthetic_candles  # noqa: E402
+from ohlcv_store import candles_to_array  # noqa: E402
+
+# 2024-01-01 00:00 UTC, a Monday
+START_MS = 1_704_067_200_000
+
+
+@pytest.fixture
+def hourly():
+    """Deterministic 1h candles from the fake exchange's price path (~6 weeks)."""
+    return candles_to_array(synthetic_candles(42, "BTC/USDT", "1h", START_MS, 1000))
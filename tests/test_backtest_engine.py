@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest_engine import (EXIT_END_OF_DATA, EXIT_SIGNAL, EXIT_STOP_LOSS, EXIT_TAKE_PROFIT,
+                             run_backtest)
+from signals import BUY, HOLD, SELL
+
+
+def _bars(rows):
+    """rows of (open, high, low, close)"""
+    return pd.DataFrame(rows, columns=["open", "high", "low", "close"])
+
+
+def _run(rows, signals, **kwargs):
+    options = dict(trade_amount=1000.0, stop_loss_pct=0.02, take_profit_pct=0.04,
+                   fee_rate=0.0, start_balance=1000.0, start=0)
+    options.update(kwargs)
+    return run_backtest(_bars(rows), np.array(signals, dtype=np.int8), **options)
+
+
+def _only_trade(result):
+    log = result["trade_log"]
+    assert result["trades"] == 1
+    return log["exit_idx"][0], log["exit_price"][0], log["exit_reason"][0]
+
+
+def test_stop_loss_fills_at_the_stop():
+    # Entry at 100: stop 98, take 104
+    result = _run([(100, 100, 100, 100), (99, 99.5, 97, 99)], [BUY, HOLD])
+    assert _only_trade(result) == (1, pytest.approx(98.0), EXIT_STOP_LOSS)
+    assert result["balance"] == pytest.approx(980.0)
+
+
+def test_take_profit_fills_at_the_target():
+    result = _run([(100, 100, 100, 100), (101, 105, 100.5, 103)], [BUY, HOLD])
+    assert _only_trade(result) == (1, pytest.approx(104.0), EXIT_TAKE_PROFIT)
+    assert result["balance"] == pytest.approx(1040.0)
+
+
+def test_bar_touching_both_levels_assumes_the_stop():
+    result = _run([(100, 100, 100, 100), (100, 106, 97, 101)], [BUY, HOLD])
+    assert _only_trade(result)[1:] == (pytest.approx(98.0), EXIT_STOP_LOSS)
+
+
+def test_gap_through_the_stop_fills_at_the_open():
+    result = _run([(100, 100, 100, 100), (95, 96, 94, 95.5)], [BUY, HOLD])
+    assert _only_trade(result)[1:] == (pytest.approx(95.0), EXIT_STOP_LOSS)
+
+
+def test_gap_through_the_target_fills_at_the_open():
+    result = _run([(100, 100, 100, 100), (107, 108, 106, 107)], [BUY, HOLD])
+    assert _only_trade(result)[1:] == (pytest.approx(107.0), EXIT_TAKE_PROFIT)
+
+
+def test_sell_signal_exits_at_the_close():
+    result = _run([(100, 100, 100, 100), (100, 101, 99, 101), (101, 102, 100, 102)],
+                  [BUY, HOLD, SELL])
+    assert _only_trade(result) == (2, pytest.approx(102.0), EXIT_SIGNAL)
+
+
+def test_fees_and_slippage_on_both_sides():
+    result = _run([(100, 100, 100, 100), (100, 101, 99, 101)], [BUY, SELL],
+                  fee_rate=0.001, slippage_pct=0.001)
+    qty = 1000 * 0.999 / (100 * 1.001)
+    assert result["balance"] == pytest.approx(qty * 101 * 0.999 * 0.999)
+
+
+def test_open_position_is_marked_at_the_end():
+    rows = [(100, 100, 100, 100), (100, 101, 99, 101)]
+    marked = _run(rows, [BUY, HOLD])
+    assert _only_trade(marked) == (1, pytest.approx(101.0), EXIT_END_OF_DATA)
+    assert marked["balance"] == pytest.approx(1010.0)
+
+    unmarked = _run(rows, [BUY, HOLD], mark_open=False)
+    assert unmarked["trades"] == 0
+    assert unmarked["balance"] == pytest.approx(1000.0)
+    np.testing.assert_allclose(unmarked["equity"], marked["equity"])
+
+
+def test_equity_curve_is_marked_to_market():
+    result = _run([(100, 100, 100, 100), (100, 101, 99, 101), (101, 102, 100, 99)],
+                  [HOLD, BUY, HOLD], start=1)
+    np.testing.assert_allclose(result["equity"], [1000.0, 1000.0, 1000 / 101 * 99])
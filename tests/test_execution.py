@@ -0,0 +1,92 @@
+import pytest
+import execution
+from execution import ORDER_RETRIES, ExecutionEngine, client_order_id
+from fake_exchange import BadSymbol, FakeExchange, NetworkError
+
+
+class FlakyExchange(FakeExchange):
+    """Fake exchange whose next create_order calls fail in scripted ways:
+    "lost" fills the order but loses the response, "reject" fails before
+    the order reaches the book."""
+
+    def __init__(self, script, **options):
+        super().__init__(**options)
+        self.script = list(script)
+        self.creates = 0
+
+    def create_order(self, symbol, type, side, amount, price=None, params=None):
+        self.creates += 1
+        fault = self.script.pop(0) if self.script else None
+        if fault == "reject":
+            raise NetworkError("connection reset before the order was sent")
+        order = super().create_order(symbol, type, side, amount, price, params)
+        if fault == "lost":
+            raise NetworkError("read timed out after the order was accepted")
+        return order
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(execution.time, "sleep", lambda seconds: None)
+
+
+def _place(exchange, side="buy"):
+    # Calls the worker-thread half directly; the engine's loop never starts
+    engine = ExecutionEngine(exchange)
+    cid = client_order_id("BTC/USDT", side, 1_700_000_000_000)
+    try:
+        return cid, engine._place_order("BTC/USDT", side, 0.001, cid)
+    finally:
+        engine._loop.close()
+
+
+def _orders(exchange):
+    return exchange._broker.orders if exchange._broker else {}
+
+
+def test_lost_ack_is_found_not_resubmitted():
+    exchange = FlakyExchange(["lost"])
+    cid, order = _place(exchange)
+    assert exchange.creates == 1
+    assert order["clientOrderId"] == cid
+    assert list(_orders(exchange)) == [cid]
+
+
+def test_rejected_order_is_resubmitted_once_confirmed_missing():
+    exchange = FlakyExchange(["reject", "reject"])
+    cid, order = _place(exchange)
+    assert exchange.creates == 3
+    assert order["clientOrderId"] == cid
+    assert len(_orders(exchange)) == 1
+
+
+def test_gives_up_after_the_retry_budget():
+    exchange = FlakyExchange(["reject"] * (ORDER_RETRIES + 1))
+    with pytest.raises(NetworkError):
+        _place(exchange)
+    assert exchange.creates == ORDER_RETRIES + 1
+    assert not _orders(exchange)
+
+
+def test_non_transient_errors_are_not_retried():
+    class Delisted(FlakyExchange):
+        def create_order(self, *args, **kwargs):
+            self.creates += 1
+            raise BadSymbol("market closed")
+
+    exchange = Delisted([])
+    with pytest.raises(BadSymbol):
+        _place(exchange)
+    assert exchange.creates == 1
+
+
+def test_same_signal_is_submitted_once():
+    engine = ExecutionEngine(FakeExchange()).start()
+    try:
+        first = engine.submit("BTC/USDT", "buy", 67_000.0, 1_700_000_000_000)
+        assert engine.submit("BTC/USDT", "buy", 67_000.0, 1_700_000_000_000) is None
+    finally:
+        engine.stop()
+    assert first in engine.book.orders
+    assert engine.book.is_long("BTC/USDT")
+    assert len(engine.broker._broker.orders) == 1
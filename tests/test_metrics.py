@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+import pytest
+from backtest_engine import run_backtest
+from metrics import METRICS, compute_metrics, periods_per_year, rank
+from strategies import get_strategy
+
+
+@pytest.fixture
+def curves(hourly):
+    """Equity curves of a few strategy runs on fake-exchange candles, plus edge cases."""
+    df = pd.DataFrame(hourly)
+    strategy = get_strategy("ema_rsi")
+    rows = []
+    for params in list(strategy.grid())[:6]:
+        signals = strategy.signals(df, params)
+        rows.append(run_backtest(df, signals, start=strategy.warmup(params), with_metrics=False)["equity"])
+    n = len(hourly)
+    rows.append(np.full(n, 1000.0))                  # never traded
+    rows.append(np.linspace(1000.0, 1500.0, n))      # no losing candle
+    rows.append(np.linspace(1000.0, 100.0, n))       # only losses
+    return np.vstack(rows)
+
+
+def test_batch_matches_single_curves(curves):
+    periods = periods_per_year("1h")
+    batch = compute_metrics(curves, periods)
+    assert set(batch) == set(METRICS)
+    assert np.all(batch["exposure"][:6] > 0)  # the strategy runs did trade
+    for k, curve in enumerate(curves):
+        single = compute_metrics(curve, periods)
+        for name in METRICS:
+            assert isinstance(single[name], float)
+            np.testing.assert_allclose(single[name], batch[name][k], rtol=1e-12, err_msg=name)
+
+
+def test_edge_cases(curves):
+    flat, rising, falling = (compute_metrics(c) for c in curves[-3:])
+    assert flat["sharpe"] == 0.0 and flat["max_drawdown"] == 0.0 and flat["exposure"] == 0.0
+    assert rising["profit_factor"] == np.inf and rising["max_drawdown"] == 0.0
+    assert falling["profit_factor"] == 0.0
+    assert falling["max_drawdown"] == pytest.approx(0.9)
+
+
+def test_rank_orients_lower_is_better():
+    metrics = {"sharpe": [1.0, np.nan, 3.0], "max_drawdown": [0.3, 0.1, 0.2]}
+    assert list(rank(metrics, "sharpe")) == [2, 0, 1]
+    assert list(rank(metrics, "max_drawdown")) == [1, 2, 0]
+    with pytest.raises(ValueError):
+        rank(metrics, "alpha")
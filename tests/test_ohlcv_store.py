@@ -0,0 +1,55 @@
+import numpy as np
+from ohlcv_store import append_candles, load_candles, merge_candles
+
+
+def _marked(arr, value):
+    out = arr.copy()
+    out["volume"] = value
+    return out
+
+
+def test_tail_overlap_replaces_forming_candle(hourly):
+    existing, new = hourly[:100], _marked(hourly[99:150], -1.0)
+    merged = merge_candles(existing, new)
+    np.testing.assert_array_equal(merged["timestamp"], hourly["timestamp"][:150])
+    assert np.all(merged["volume"][99:] == -1.0)
+    np.testing.assert_array_equal(merged[:99], hourly[:99])
+
+
+def test_backfill_overlap_new_rows_win(hourly):
+    existing, new = hourly[100:200], _marked(hourly[50:120], -1.0)
+    merged = merge_candles(existing, new)
+    np.testing.assert_array_equal(merged["timestamp"], hourly["timestamp"][50:200])
+    assert np.all(merged["volume"][:70] == -1.0)
+    np.testing.assert_array_equal(merged[70:], hourly[120:200])
+
+
+def test_page_inside_existing_range(hourly):
+    existing, new = hourly[:200], _marked(hourly[80:90], -1.0)
+    merged = merge_candles(existing, new)
+    np.testing.assert_array_equal(merged["timestamp"], hourly["timestamp"][:200])
+    assert np.count_nonzero(merged["volume"] == -1.0) == 10
+
+
+def test_empty_sides(hourly):
+    np.testing.assert_array_equal(merge_candles(hourly[:0], hourly[:5]), hourly[:5])
+    np.testing.assert_array_equal(merge_candles(hourly[:5], hourly[:0]), hourly[:5])
+
+
+def test_bars_sharing_a_millisecond_are_kept(hourly):
+    # Volume/dollar bars can close several times in one millisecond
+    existing = hourly[:3].copy()
+    new = hourly[2:5].copy()
+    new["timestamp"][1] = new["timestamp"][0]
+    merged = merge_candles(existing, new, dedupe=False)
+    assert len(merged) == 6
+    assert np.all(np.diff(merged["timestamp"]) >= 0)
+    older = merge_candles(hourly[3:6], hourly[:4], dedupe=False)
+    assert len(older) == 7
+    assert np.all(np.diff(older["timestamp"]) >= 0)
+
+
+def test_append_round_trip(hourly):
+    append_candles("test:MERGE/USDT", "1h", hourly[:300])
+    append_candles("test:MERGE/USDT", "1h", hourly[250:])
+    np.testing.assert_array_equal(load_candles("test:MERGE/USDT", "1h"), hourly)
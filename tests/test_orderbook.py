@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from fake_exchange import FakeExchange
+from orderbook import _PRICE_UNIT, compress_book, decompress_book
+
+
+def _assert_round_trip(book):
+    ts, bids, asks = decompress_book(compress_book(book))
+    assert ts == book["timestamp"]
+    # Prices are kept to 1e-8 of mid, whatever their distance from it
+    mid = (book["bids"][0][0] + book["asks"][0][0]) / 2
+    for side, levels in (("bids", bids), ("asks", asks)):
+        expected = np.array([lvl[:2] for lvl in book[side]], dtype=np.float64)
+        np.testing.assert_allclose(levels[:, 0], expected[:, 0], rtol=0, atol=mid * _PRICE_UNIT)
+        np.testing.assert_allclose(levels[:, 1], expected[:, 1], rtol=1e-6)
+
+
+@pytest.mark.parametrize("symbol", ["BTC/USDT", "XRP/USDT", "SYN007/USDT"])
+def test_fake_exchange_books_round_trip(symbol):
+    book = FakeExchange().fetch_order_book(symbol, 100)
+    _assert_round_trip(book)
+    assert len(compress_book(book)) < 1200  # ~0.8 KB vs 3.2 KB of raw float64 levels
+
+
+def test_levels_far_from_mid_do_not_wrap():
+    book = {"timestamp": 1, "bids": [[100, 1], [99, 2], [0.5, 7]],
+            "asks": [[101, 1], [5000, 3], [5001, 1], [5002, 2]]}
+    _assert_round_trip(book)
+
+
+def test_extra_level_fields_are_ignored():
+    book = {"timestamp": 1, "bids": [[100, 1, 3], [99, 2, 1]], "asks": [[101, 1, 5]]}
+    _assert_round_trip(book)
+
+
+def test_empty_side_is_not_stored():
+    assert compress_book({"timestamp": 1, "bids": [], "asks": [[101, 1]]}) is None
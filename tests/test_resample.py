@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from conftest import START_MS
+from resample import TIMEFRAME_MS, Resampler, bucket_start, resample_ohlcv
+
+MONDAY = 0
+
+
+def _weekday(ms):
+    return ((np.asarray(ms) // 86_400_000) + 3) % 7  # the epoch was a Thursday
+
+
+@pytest.mark.parametrize("timeframe", ["4h", "1d", "1w"])
+def test_resample_aggregates_each_bucket(hourly, timeframe):
+    out = resample_ohlcv(hourly, timeframe)
+    for bar in out:
+        rows = hourly[bucket_start(hourly["timestamp"], timeframe) == bar["timestamp"]]
+        assert bar["open"] == rows["open"][0]
+        assert bar["close"] == rows["close"][-1]
+        assert bar["high"] == rows["high"].max()
+        assert bar["low"] == rows["low"].min()
+        assert bar["volume"] == pytest.approx(rows["volume"].sum())
+    assert np.all(np.diff(out["timestamp"]) == TIMEFRAME_MS[timeframe])
+
+
+def test_weeks_open_on_monday(hourly):
+    weeks = resample_ohlcv(hourly, "1w")
+    assert np.all(_weekday(weeks["timestamp"]) == MONDAY)
+    assert np.all(weeks["timestamp"] % 86_400_000 == 0)
+    # Sunday 23:00 and the following Monday 00:00 land in different weeks
+    sunday_last_hour = START_MS + 7 * 86_400_000 - 3_600_000
+    buckets = bucket_start(np.array([sunday_last_hour, sunday_last_hour + 3_600_000]), "1w")
+    assert buckets.tolist() == [START_MS, START_MS + TIMEFRAME_MS["1w"]]
+
+
+@pytest.mark.parametrize("timeframe", ["4h", "1d", "1w"])
+def test_incremental_matches_full(hourly, timeframe):
+    resampler = Resampler(timeframe)
+    resampler.update(hourly[:50])
+    for n in range(51, len(hourly) + 1):
+        # The newest candle is first seen while still forming, then closed
+        forming = hourly[:n].copy()
+        forming["close"][-1] = forming["open"][-1]
+        forming["high"][-1] = forming["low"][-1] = forming["open"][-1]
+        resampler.update(forming)
+        out = resampler.update(hourly[:n])
+    np.testing.assert_array_equal(out, resample_ohlcv(hourly, timeframe))
+
+
+def test_backfill_rebuilds(hourly):
+    resampler = Resampler("1d")
+    resampler.update(hourly[500:])
+    out = resampler.update(hourly)
+    np.testing.assert_array_equal(out, resample_ohlcv(hourly, "1d"))
+
+
+def test_empty_input():
+    assert len(resample_ohlcv(np.empty(0, dtype=[("timestamp", "i8")]), "1d")) == 0
@@ -1,8 +1,10 @@
-import random
-import datetime
-import pandas as pd
-import numpy as np
-import ccxt
+from bars import is_custom_bar, load_bars
+from backtest_engine import EXIT_REASONS, run_backtest, save_results
+from data_source import get_data_source
+from metrics import periods_per_year
+from orderbook import fill_cost_pct
+from signals import SIGNAL_NAMES
+from strategies import get_strategy
 
 # -----------------------------
 # 1. Configuration (The Ingredients)
@@ -11,87 +13,99 @@ config = {
     "mode": "backtest",
     "use_mock_data": False,
     "symbol": "BTC/USDT",
+    "timeframe": "1h",   # or a custom bar name from bars.py, e.g. "volume-100"
     "trade_amount": 100,
     "stop_loss_pct": 0.02,
     "take_profit_pct": 0.04,
+    "fee_rate": 0.001,   # 0.1% per fill (taker fee)
+    "slippage_pct": 0.0,  # per fill, or "book" to estimate it from the live order book
     "ema_fast": 9,       # <--- The bot was missing this!
     "ema_slow": 21,      # <--- And this!
     "rsi_period": 14,
     "rsi_overbought": 70,
     "rsi_oversold": 30,
+    "strategy": "ema_rsi",       # any name in strategies.STRATEGIES; its params are read from this dict
+    "print_trades": True,        # per-trade console output (slow for long runs)
+    "results_name": "trading_bot",  # trades + equity curve -> data/backtests/<name>.npz
 }
 
 # -----------------------------
 # 2. Data Helper
 # -----------------------------
 def get_historical_data(symbol, timeframe='1h', limit=300):
-    try:
-        exchange = ccxt.binance()
-        bars = exchange.fetch_ohlcv(symbol, timeframe=timeframe, limit=limit)
-        df = pd.DataFrame(bars, columns=['timestamp','open','high','low','close','volume'])
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        df['close'] = df['close'].astype(float)
-        return df
-    except:
-        print("⚠️ Binance connection failed. Using fake data for testing.")
-        dates = pd.date_range(end=datetime.datetime.now(), periods=limit, freq='h')
-        return pd.DataFrame({'timestamp': dates, 'close': [30000 + i*10 for i in range(limit)]})
+    # Custom bars built by bars.py (e.g. timeframe='dollar-1000000') come from the local store
+    if is_custom_bar(timeframe):
+        return load_bars(symbol, timeframe, limit=limit)
+    # Fastest exchange that answers, else stored candles, else synthetic prices
+    df = get_data_source().history(symbol, timeframe, limit=limit)
+    if df.attrs["source"] == "synthetic":
+        print("⚠️ No exchange or stored data. Using synthetic data for testing.")
+    return df
 
 # -----------------------------
 # 3. Strategy Logic
 # -----------------------------
 def add_indicators(df, config):
-    df['ema_fast'] = df['close'].ewm(span=config["ema_fast"]).mean()
-    df['ema_slow'] = df['close'].ewm(span=config["ema_slow"]).mean()
-    
-    # RSI Calculation
-    delta = df['close'].diff()
-    gain = delta.clip(lower=0).fillna(0)
-    loss = -delta.clip(upper=0).fillna(0)
-    avg_gain = gain.rolling(window=config["rsi_period"]).mean()
-    avg_loss = loss.rolling(window=config["rsi_period"]).mean()
-    rs = avg_gain / (avg_loss + 1e-10)
-    df['rsi'] = 100 - (100 / (1 + rs))
-    return df
+    return get_strategy(config["strategy"]).add_indicators(df, config)
+
+def generate_signals(df, config):
+    """Signals for every candle as an int8 array (BUY=1, SELL=-1, HOLD=0)."""
+    strategy = get_strategy(config["strategy"])
+    # Same kernel as the optimizer and live bot, over the columns add_indicators wrote
+    inputs = {col: df[col] for col in ("close",) + strategy.columns}
+    return strategy.kernel(inputs, strategy.resolve(config))
 
 def generate_signal(row, config):
-    if row['ema_fast'] > row['ema_slow'] and row['rsi'] < config["rsi_overbought"]:
-        return "buy"
-    elif row['ema_fast'] < row['ema_slow'] and row['rsi'] > config["rsi_oversold"]:
-        return "sell"
-    return "hold"
+    # Kept for callers that work one row at a time
+    return SIGNAL_NAMES[int(generate_signals(row, config)[0])]
 
 # -----------------------------
 # 4. The Backtest Loop
 # -----------------------------
 def backtest(config):
     print("\n🚀 Starting backtest...")
-    df = get_historical_data(config["symbol"], limit=500)
+    df = get_historical_data(config["symbol"], config["timeframe"], limit=500)
     df = add_indicators(df, config)
 
-    balance = 1000
-    position = None 
-    entry_price = 0
-    trades = []
-    
-    for i in range(1, len(df)):
-        row = df.iloc[i]
-        signal = generate_signal(row, config)
+    slippage = config["slippage_pct"]
+    if slippage == "book":
+        # What a market order of trade_amount costs in the current book
+        slippage = fill_cost_pct(config["symbol"], config["trade_amount"])
+        print(f"📚 Order-book slippage: {slippage * 1e4:.2f} bps per fill")
+
+    result = run_backtest(
+        df, generate_signals(df, config),
+        trade_amount=config["trade_amount"],
+        stop_loss_pct=config["stop_loss_pct"],
+        take_profit_pct=config["take_profit_pct"],
+        fee_rate=config["fee_rate"],
+        slippage_pct=slippage,
+        # Custom bars have no fixed duration; annualize those as hourly
+        periods=periods_per_year("1h" if is_custom_bar(config["timeframe"]) else config["timeframe"]),
+    )
 
-        if position is None and signal == "buy":
-            position = 'long'
-            entry_price = row['close']
-            print(f"[{i}] 🟢 BUY  @ {row['close']:.2f}")
+    if config["print_trades"]:
+        log = result["trade_log"]
+        for k in range(result["trades"]):
+            entry, exit_ = log["entry_idx"][k], log["exit_idx"][k]
+            print(f"[{entry}] 🟢 BUY  @ {log['entry_price'][k]:.2f}")
+            print(f"[{exit_}] 🔴 SELL @ {log['exit_price'][k]:.2f} | P/L: ${log['pnl'][k]:.2f} "
+                  f"({EXIT_REASONS[log['exit_reason'][k]]})")
 
-        elif position == 'long' and signal == "sell":
-            profit = (row['close'] - entry_price) / entry_price
-            balance += balance * profit
-            outcome = "WIN" if profit > 0 else "LOSS"
-            trades.append(outcome)
-            print(f"[{i}] 🔴 SELL @ {row['close']:.2f} | P/L: {profit*100:.2f}% | Bal: ${balance:.0f}")
-            position = None
+    if config["results_name"]:
+        params = {k: config[k] for k in ("symbol", "timeframe", "trade_amount", "stop_loss_pct",
+                                         "take_profit_pct", "fee_rate", "strategy")}
+        params["slippage_pct"] = slippage
+        params.update(get_strategy(config["strategy"]).resolve(config))
+        path = save_results(config["results_name"], result, df["timestamp"], params)
+        print(f"💾 Trades and equity curve saved to {path}")
 
-    print(f"\n✅ Final Balance: ${balance:.2f}")
+    print(f"\n✅ Final Balance: ${result['balance']:.2f} | Trades: {result['trades']} | Win Rate: {result['win_rate']:.1f}%")
+    m = result.get("metrics")
+    if m:
+        print(f"📐 Sharpe: {m['sharpe']:.2f} | Sortino: {m['sortino']:.2f} | Max Drawdown: {m['max_drawdown'] * 100:.1f}% | "
+              f"Exposure: {m['exposure'] * 100:.0f}% | Profit Factor: {m['profit_factor']:.2f}")
+    return result
 
 if __name__ == "__main__":
     backtest(config)
\ No newline at end of file